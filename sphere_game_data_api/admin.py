@@ -1,3 +1,19 @@
 from django.contrib import admin
 
-# Register your models here.
+from sphere_game_data_api.models import GameColor
+
+
+@admin.register(GameColor)
+class GameColorAdmin(admin.ModelAdmin):
+    """
+    The only way colour names enter the GameColor dictionary. Stored rows hold
+    the codes, so a colour can't be renamed or deleted once added.
+    """
+    list_display = ('id', 'name')
+    search_fields = ('name',)
+
+    def get_readonly_fields(self, request, obj=None):
+        return ('name',) if obj is not None else ()
+
+    def has_delete_permission(self, request, obj=None):
+        return False
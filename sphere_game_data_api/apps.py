@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SphereGameDataApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sphere_game_data_api'
+
+    def ready(self):
+        from sphere_game_data_api import checks, signals  # noqa: F401
@@ -0,0 +1,326 @@
+import array
+import datetime
+import gzip
+import heapq
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from sphere_game_data_api.models import GameData
+from sphere_game_data_api.pagination import keyset_values
+from sphere_game_data_api.renderers import JSON_FIELDS, READ_FIELDS, output_timezone, render_json, to_row
+from sphere_game_data_api.response_cache import bump_data_version
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional; archives are written as gzip NDJSON without it
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = '.manifest.json'
+DATETIME_FIELDS = ('created_at', 'event_at')
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def archive_dir():
+    return getattr(settings, 'GAME_DATA_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive'))
+
+
+class NdjsonArchive:
+    """gzip NDJSON, one event per line in the export representation"""
+    suffix = '.ndjson.gz'
+
+    def __init__(self, path):
+        self.path = path
+
+    def open_writer(self):
+        self.file = gzip.open(self.path, 'wb')
+        self.tz = output_timezone()
+
+    def write(self, values_rows):
+        for values in values_rows:
+            row = to_row(values, self.tz)
+            self.file.write(render_json(row, (row,)) + b'\n')
+
+    def close(self):
+        self.file.close()
+
+    def rows(self):
+        with gzip.open(self.path, 'rb') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+class ParquetArchive:
+    """Parquet (zstd), one column per field; JSON fields are stored as JSON text"""
+    suffix = '.parquet'
+
+    @staticmethod
+    def schema():
+        timestamp = pyarrow.timestamp('us', tz='UTC')
+        types = {'id': pyarrow.int64(), 'game_level': pyarrow.int64(), 'retry_count': pyarrow.int64()}
+        types.update({field: timestamp for field in DATETIME_FIELDS})
+        return pyarrow.schema([(field, types.get(field, pyarrow.string())) for field in READ_FIELDS])
+
+    def __init__(self, path):
+        if pyarrow is None:
+            raise ArchiveError('The parquet format needs pyarrow (pip install pyarrow)')
+        self.path = path
+
+    def open_writer(self):
+        self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema(), compression='zstd')
+
+    def write(self, values_rows):
+        columns = list(zip(*values_rows))
+        arrays = {}
+        for index, field in enumerate(READ_FIELDS):
+            column = columns[index]
+            if field in JSON_FIELDS:
+                column = [json.dumps(value, ensure_ascii=False) for value in column]
+            elif field == 'event_id':
+                column = [None if value is None else str(value) for value in column]
+            arrays[field] = column
+        self.writer.write_table(pyarrow.table(arrays, schema=self.schema()))
+
+    def close(self):
+        self.writer.close()
+
+    def rows(self):
+        tz = output_timezone()
+        json_indexes = [READ_FIELDS.index(field) for field in JSON_FIELDS]
+        for batch in pyarrow.parquet.ParquetFile(self.path).iter_batches():
+            for record in batch.to_pylist():
+                values = [record[field] for field in READ_FIELDS]
+                for index in json_indexes:
+                    values[index] = json.loads(values[index])
+                yield to_row(values, tz)
+
+
+ARCHIVE_FORMATS = {
+    'ndjson': NdjsonArchive,
+    'parquet': ParquetArchive,
+}
+
+
+def default_archive_format():
+    return 'parquet' if pyarrow is not None else 'ndjson'
+
+
+def _delete_rows(ids, versions):
+    """
+    Delete the rows in `ids` whose version is still the dumped one, in one
+    transaction with those rows locked. Returns (deleted, ids of rows that
+    changed since they were dumped).
+    """
+    dumped = dict(zip(ids, versions))
+    table = connection.ops.quote_name(GameData._meta.db_table)
+    with transaction.atomic():
+        current = GameData.objects.select_for_update().filter(id__in=ids).values_list('id', 'version')
+        unchanged, changed = [], []
+        for pk, version in current:
+            (unchanged if version == dumped[pk] else changed).append(pk)
+        if not unchanged:
+            return 0, changed
+        placeholders = ', '.join(['%s'] * len(unchanged))
+        with connection.cursor() as cursor:
+            # Raw DELETE: QuerySet.delete() would load every row to send post_delete
+            cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', unchanged)
+            return cursor.rowcount, changed
+
+
+def _delete_batch(manifest, ids, versions):
+    deleted, changed = _delete_rows(ids, versions)
+    manifest['deleted'] += deleted
+    manifest['superseded_ids'].extend(changed)
+
+
+def archive_game_data(cutoff, directory=None, archive_format=None, chunk_size=2000, delete_batch_size=1000,
+                      delete=True):
+    """
+    Move events with event_at before `cutoff` into one archive file:
+    - Rows are read in (event_at, id) order in keyset pages and written in
+      chunks, so memory stays flat
+    - The file is read back and its row count checked against what was
+      written before anything is deleted; a manifest is written next to it
+    - Rows are then deleted by the ids read back from the file, in batches of
+      `delete_batch_size` (one short transaction each, with the batch's rows
+      locked), and only while their version is still the dumped one. Rows that
+      arrive meanwhile aren't in the file and aren't deleted; rows updated after
+      they were dumped are kept, listed in the manifest as `superseded_ids` so
+      their stale archived copy is skipped on read, and left for another run
+      (the command runs one right away) to archive their current version.
+    The dumped versions are kept in memory, 8 bytes per row. Rollup tables keep
+    counting archived events. Returns the manifest, or None if there was nothing
+    to archive.
+    """
+    directory = directory or archive_dir()
+    archive_format = archive_format or default_archive_format()
+    queryset = GameData.objects.filter(event_at__lt=cutoff).order_by('event_at', 'id')
+    expected = queryset.count()
+    if not expected:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    archive_class = ARCHIVE_FORMATS[archive_format]
+    now = datetime.datetime.now(datetime.timezone.utc)
+    name = f'game-data-before-{cutoff:%Y%m%dT%H%M%SZ}-{now:%Y%m%dT%H%M%S%fZ}{archive_class.suffix}'
+    path = os.path.join(directory, name)
+    partial = archive_class(path + '.partial')
+
+    written, first_event_at, last_event_at = 0, None, None
+    event_at_index = READ_FIELDS.index('event_at')
+    versions = array.array('q')  # In file order
+    partial.open_writer()
+    try:
+        chunk = []
+        for *values, version in keyset_values(queryset, (*READ_FIELDS, 'version'), chunk_size):
+            chunk.append(values)
+            versions.append(version)
+            if len(chunk) >= chunk_size:
+                partial.write(chunk)
+                written += len(chunk)
+                first_event_at = first_event_at or chunk[0][event_at_index]
+                last_event_at, chunk = chunk[-1][event_at_index], []
+        if chunk:
+            partial.write(chunk)
+            written += len(chunk)
+            first_event_at = first_event_at or chunk[0][event_at_index]
+            last_event_at = chunk[-1][event_at_index]
+    finally:
+        partial.close()
+
+    read_back = sum(1 for _ in partial.rows())
+    if read_back != written:
+        os.remove(partial.path)
+        raise ArchiveError(f'{name}: wrote {written} rows but read back {read_back}; nothing was deleted')
+    if written != expected:
+        logger.warning(f"Archive {name}: {expected} rows matched the cutoff but {written} were read")
+    os.replace(partial.path, path)
+
+    manifest = {
+        'file': name,
+        'format': archive_format,
+        'rows': written,
+        'cutoff': cutoff.isoformat(),
+        'first_event_at': first_event_at.isoformat(),
+        'last_event_at': last_event_at.isoformat(),
+        'created_at': now.isoformat(),
+        'deleted': 0,
+        'superseded_ids': [],
+    }
+    manifest_path = path + MANIFEST_SUFFIX
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if delete:
+        ids, start = [], 0
+        for row in archive_class(path).rows():
+            ids.append(row['id'])
+            if len(ids) >= delete_batch_size:
+                _delete_batch(manifest, ids, versions[start:start + len(ids)])
+                start, ids = start + len(ids), []
+        if ids:
+            _delete_batch(manifest, ids, versions[start:start + len(ids)])
+        bump_data_version()
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def list_archives(directory=None):
+    """Manifests of the archives in `directory`, oldest cutoff first"""
+    directory = directory or archive_dir()
+    if not os.path.isdir(directory):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(MANIFEST_SUFFIX):
+            with open(os.path.join(directory, name)) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def _matches(row, filters):
+    # The ORM lookups built by GameDataFilterBackend, applied to an archived row
+    for lookup, expected in filters.items():
+        field, _, operator = lookup.partition('__')
+        value = row[field]
+        if field in DATETIME_FIELDS:
+            value = parse_datetime(value)
+        if operator == '':
+            matched = value == expected
+        elif operator == 'in':
+            matched = value in expected
+        elif operator == 'gte':
+            matched = value >= expected
+        elif operator == 'lte':
+            matched = value <= expected
+        elif operator == 'lt':
+            matched = value < expected
+        else:
+            raise ValueError(f'Unsupported archive filter: {lookup}')
+        if not matched:
+            return False
+    return True
+
+
+def _open_archive(directory, manifest):
+    return ARCHIVE_FORMATS[manifest['format']](os.path.join(directory, manifest['file']))
+
+
+def _rows_left_in_table(manifest):
+    # Written with --keep, or interrupted before its deletes finished (the manifest is updated after them)
+    return manifest['deleted'] + len(manifest.get('superseded_ids', ())) < manifest['rows']
+
+
+def _shadowed_ids(directory, manifests):
+    """
+    {file: ids archived again by a later run} for the archives whose rows were
+    left in the table. Those rows were archived again; the newest copy wins.
+    Only archives from the oldest such one on are read.
+    """
+    by_age = sorted(manifests, key=lambda manifest: manifest['created_at'])
+    left = [index for index, manifest in enumerate(by_age) if _rows_left_in_table(manifest)]
+    shadowed, newer = {}, set()
+    for index in range(len(by_age) - 1, left[0] - 1 if left else len(by_age), -1):
+        manifest = by_age[index]
+        if index in left:
+            shadowed[manifest['file']] = frozenset(newer)
+        newer.update(row['id'] for row in _open_archive(directory, manifest).rows())
+    return shadowed
+
+
+def _current_rows(archive, skipped, filters):
+    return (row for row in archive.rows() if row['id'] not in skipped and _matches(row, filters))
+
+
+def archived_rows(filters, directory=None):
+    """
+    Archived events matching `filters` (GameDataFilterBackend.get_filter_kwargs),
+    as export rows in (event_at, id) order across all archives, each event once.
+    Only archives whose event_at range overlaps the event_at filters are opened
+    for their rows (see _shadowed_ids for when others are read for their ids).
+    """
+    directory = directory or archive_dir()
+    after, before = filters.get('event_at__gte'), filters.get('event_at__lt')
+    manifests = list_archives(directory)
+    shadowed = _shadowed_ids(directory, manifests)
+    sources = []
+    for manifest in manifests:
+        if after is not None and parse_datetime(manifest['last_event_at']) < after:
+            continue
+        if before is not None and parse_datetime(manifest['first_event_at']) >= before:
+            continue
+        # Rows updated after they were dumped were kept in the table; their copy here is stale
+        skipped = frozenset(manifest.get('superseded_ids', ())) | shadowed.get(manifest['file'], frozenset())
+        sources.append(_current_rows(_open_archive(directory, manifest), skipped, filters))
+    return heapq.merge(*sources, key=lambda row: (parse_datetime(row['event_at']), row['id']))
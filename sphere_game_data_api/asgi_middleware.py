@@ -0,0 +1,74 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.middleware import clickjacking, common, csrf, security
+from django.utils.deprecation import MiddlewareMixin
+
+
+class InlineHooksMixin:
+    """
+    For MiddlewareMixin middleware whose process_request / process_response only
+    look at the request and response. Under ASGI, MiddlewareMixin runs each hook
+    in a worker thread, two thread hops per middleware per request; these run
+    them on the event loop instead. Under WSGI nothing changes.
+    """
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, 'process_request'):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            response = self.process_response(request, response)
+        return response
+
+
+class SecurityMiddleware(InlineHooksMixin, security.SecurityMiddleware):
+    pass
+
+
+class CommonMiddleware(InlineHooksMixin, common.CommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(InlineHooksMixin, csrf.CsrfViewMiddleware):
+    async def __acall__(self, request):
+        # With CSRF_USE_SESSIONS the secret is read from the session, which may hit the database
+        if settings.CSRF_USE_SESSIONS:
+            return await MiddlewareMixin.__acall__(self, request)
+        return await super().__acall__(request)
+
+
+class AuthenticationMiddleware(InlineHooksMixin, auth.AuthenticationMiddleware):
+    # request.user is lazy: the session and user are only loaded when a view reads it
+    pass
+
+
+class XFrameOptionsMiddleware(InlineHooksMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
+
+
+class SessionMiddleware(sessions.SessionMiddleware):
+    """Sets up the lazy session on the event loop; saves it in a worker thread, only if it was used"""
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        response = await self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is not None and (session.accessed or settings.SESSION_SAVE_EVERY_REQUEST):
+            return await sync_to_async(self.process_response, thread_sensitive=True)(request, response)
+        return self.process_response(request, response)
+
+
+class MessageMiddleware(messages.MessageMiddleware):
+    """Message storage is set up on the event loop; stored in a worker thread, only if messages were used"""
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        response = await self.get_response(request)
+        storage = getattr(request, '_messages', None)
+        if storage is not None and (storage.used or storage.added_new):
+            return await sync_to_async(self.process_response, thread_sensitive=True)(request, response)
+        return self.process_response(request, response)
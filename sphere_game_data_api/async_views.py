@@ -0,0 +1,204 @@
+import json
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import Throttled
+from rest_framework.renderers import JSONRenderer
+
+from sphere_game_data_api.renderers import fast_reads_enabled, render_instance
+from sphere_game_data_api.serializers import GameDataSerializer
+from sphere_game_data_api.spool import get_spool, to_payload, write_behind_enabled
+from sphere_game_data_api.throttling import IngestRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def ingest_executor():
+    """
+    Worker threads for the async views' blocking work. Under ASGIHandler,
+    sync_to_async() would start a new thread for every request, and with it a
+    new database connection (a TCP + TLS handshake with the remote database);
+    these threads live on and keep their connection, like WSGI worker threads.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'GAME_DATA_ASYNC_INGEST_WORKERS', 8),
+                thread_name_prefix='game-data-ingest',
+            )
+        return _executor
+
+
+def in_ingest_worker(function):
+    """
+    `function` as an awaitable running on ingest_executor(). Connections are
+    checked before and after each call, as request_started / request_finished do
+    for a WSGI worker, so CONN_MAX_AGE and CONN_HEALTH_CHECKS still apply.
+    """
+    def run(*args):
+        close_old_connections()
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False, executor=ingest_executor())
+
+
+def json_response(data, status):
+    # Same bytes as the DRF views, which render with JSONRenderer
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def error_response(details, status=400, message='Bad Request - Please check your input data'):
+    # Same shape as custom_exception_handler
+    return json_response(
+        {'error': True, 'status_code': status, 'message': message, 'details': details},
+        status=status
+    )
+
+
+def check_ingest_throttle(request, view):
+    # Same limit (and 429 response) as the DRF ingestion views
+    throttle = IngestRateThrottle()
+    if throttle.allow_request(request, view):
+        return None
+    wait = throttle.wait()
+    response = error_response({'detail': Throttled(wait).detail}, status=429, message='Too many requests')
+    if wait is not None:
+        response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def parse_json_body(request):
+    try:
+        return json.loads(request.body or b'null'), None
+    except ValueError as e:
+        return None, error_response(f'JSON parse error - {e}')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class GameDataAsyncCreateView(View):
+    """
+    ASGI-native ingestion of a single event (Anyone can create).
+    The throttle check, validation, the database (or spool) write and rendering
+    all block, so they run together on an ingest worker thread (in_ingest_worker):
+    one hop off the event loop per request, which keeps serving other requests
+    meanwhile. Same request and response contract as GameDataListCreateView.post.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        return await in_ingest_worker(self.ingest)(request)
+
+    def ingest(self, request):
+        throttled = check_ingest_throttle(request, self)
+        if throttled is not None:
+            return throttled
+
+        data, error = parse_json_body(request)
+        if error is not None:
+            return error
+
+        serializer = GameDataSerializer(data=data)
+        if not serializer.is_valid():
+            return error_response(serializer.errors)
+
+        if write_behind_enabled():
+            payload = to_payload(serializer.validated_data)
+            get_spool().enqueue([payload])
+            return json_response({'queued': True, 'event_id': payload['event_id']}, status=202)
+
+        try:
+            serializer.save()
+        except Exception as e:
+            logger.error(f"Error creating game data: {e}")
+            return json_response(
+                {'error': True, 'message': 'Failed to create game data', 'details': str(e)},
+                status=400
+            )
+        status = 201 if serializer.created else 200
+        if fast_reads_enabled():
+            return HttpResponse(render_instance(serializer.instance), status=status, content_type='application/json')
+        return json_response(serializer.data, status=status)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class GameDataAsyncBatchCreateView(View):
+    """
+    ASGI-native batch ingestion (Anyone can create), in one hop to an ingest
+    worker thread like GameDataAsyncCreateView. Same request and response contract as
+    GameDataBatchCreateView.post.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        return await in_ingest_worker(self.ingest)(request)
+
+    def ingest(self, request):
+        throttled = check_ingest_throttle(request, self)
+        if throttled is not None:
+            return throttled
+
+        data, error = parse_json_body(request)
+        if error is not None:
+            return error
+
+        serializer = GameDataSerializer(
+            data=data,
+            many=True,
+            max_length=getattr(settings, 'GAME_DATA_BATCH_MAX_SIZE', 5000),
+        )
+        if not serializer.is_valid():
+            return error_response(serializer.errors)
+        item_errors = serializer.item_errors
+
+        if not serializer.validated_data:
+            return json_response(
+                {'created': 0, 'failed': len(item_errors), 'duplicates': 0, 'ids': [], 'errors': item_errors},
+                status=400
+            )
+
+        if write_behind_enabled():
+            payloads = [to_payload(attrs) for attrs in serializer.validated_data]
+            get_spool().enqueue(payloads)
+            return json_response(
+                {
+                    'queued': len(payloads),
+                    'failed': len(item_errors),
+                    'event_ids': [payload['event_id'] for payload in payloads],
+                    'errors': item_errors,
+                },
+                status=202
+            )
+
+        try:
+            instances = serializer.save()
+        except Exception as e:
+            logger.error(f"Error creating game data batch: {e}")
+            return json_response(
+                {'error': True, 'message': 'Failed to create game data batch', 'details': str(e)},
+                status=400
+            )
+
+        return json_response(
+            {
+                'created': serializer.created_count,
+                'failed': len(item_errors),
+                'duplicates': len(instances) - serializer.created_count,
+                'ids': [instance.pk for instance in instances],
+                'errors': item_errors,
+            },
+            status=201 if serializer.created_count else 200
+        )
@@ -0,0 +1,116 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenCache:
+    """
+    Resolved tokens, as (user, token) pairs:
+    - an in-process LRU with a TTL, so a hit costs no query at all
+    - optionally a shared Django cache (TOKEN_AUTH_CACHE_ALIAS) behind it, so other
+      processes can reuse a lookup and see invalidations
+    Invalidation is driven by signals (see signals.py); other processes' in-process
+    entries expire after TOKEN_AUTH_CACHE_TTL at the latest.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 1024)
+
+    @property
+    def shared_cache(self):
+        alias = getattr(settings, 'TOKEN_AUTH_CACHE_ALIAS', None)
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def shared_key(key):
+        # Never use the raw token as a cache key
+        return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            value = shared_cache.get(self.shared_key(key))
+            if value is not None:
+                self._store(key, value)
+                return value
+        return None
+
+    def set(self, key, value):
+        self._store(key, value)
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            shared_cache.set(self.shared_key(key), value, self.ttl)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            shared_cache.delete(self.shared_key(key))
+
+    def delete_user(self, user_id):
+        keys = set(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+        with self._lock:
+            keys.update(
+                key for key, (_, (user, _)) in self._entries.items() if user.pk == user_id
+            )
+        for key in keys:
+            self.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that skips the Token + User query when the token was
+    resolved recently. Inactive users and unknown tokens are never cached.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, (user, token))
+            return user, token
+
+        user, token = cached
+        # Hand out a copy, so nothing a request does to its user leaks into the cache
+        return copy.copy(user), token
@@ -0,0 +1,151 @@
+import asyncio
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(scenario, latencies, errors, elapsed, **extra):
+    """Latency percentiles (ms) and throughput for one scenario run"""
+    ordered = sorted(latencies)
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'scenario': scenario,
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': ms(percentile(ordered, 0.50)),
+        'p95_ms': ms(percentile(ordered, 0.95)),
+        'p99_ms': ms(percentile(ordered, 0.99)),
+        **extra,
+    }
+
+
+def run_threaded(request, total, concurrency):
+    """
+    Call `request(index)` `total` times from `concurrency` threads, like a WSGI
+    server with that many workers. `request` returns True on success.
+    Returns (latencies, errors, elapsed).
+    """
+    def timed(index):
+        start = time.perf_counter()
+        ok = request(index)
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - start
+    return [latency for latency, _ in results], sum(1 for _, ok in results if not ok), elapsed
+
+
+def run_concurrent(request, total, concurrency):
+    """
+    Await `request(index)` `total` times with at most `concurrency` in flight on
+    one event loop, each in its own ThreadSensitiveContext like under ASGIHandler.
+    Returns (latencies, errors, elapsed).
+    """
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(index):
+            async with semaphore:
+                async with ThreadSensitiveContext():
+                    start = time.perf_counter()
+                    ok = await request(index)
+                    return time.perf_counter() - start, ok
+
+        return await asyncio.gather(*(timed(index) for index in range(total)))
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    return [latency for latency, _ in results], sum(1 for _, ok in results if not ok), elapsed
+
+
+@contextmanager
+def simulated_db_latency(seconds):
+    """Add `seconds` of round-trip time to every query, on every thread's connection"""
+    if not seconds:
+        yield
+        return
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install)
+    current = connections['default']
+    current.execute_wrappers.append(delay)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        current.execute_wrappers.remove(delay)
+
+
+@contextmanager
+def benchmark_environment(keepdb=False):
+    """
+    Run against a throwaway test database (never the configured one), with
+    throttling disabled so the numbers measure the views and not the limiter.
+    SQLite gets a file database, since threads can't share an in-memory one.
+    """
+    connection = connections['default']
+    temp_dir = None
+    if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+        temp_dir = tempfile.mkdtemp()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(temp_dir, 'benchmark.sqlite3')
+
+    # django.test's clients don't close connections between requests; keep them
+    # persistent on the threads that do (ingest workers) too, as in production
+    conn_max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+    connection.settings_dict['CONN_MAX_AGE'] = None
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        # Throttles without a rate allow every request
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        if temp_dir is not None:
+            connection.settings_dict['TEST']['NAME'] = None
+            for name in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+
+class ThreadLocalClients(threading.local):
+    """One django.test.Client per worker thread"""
+
+    def __init__(self, factory):
+        self.client = factory()
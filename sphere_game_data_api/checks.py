@@ -0,0 +1,19 @@
+from django.core.checks import Error, Tags, register
+
+from sphere_game_data_api.response_cache import response_cache_alias, response_cache_is_shared, response_cache_timeout
+
+
+@register(Tags.caches)
+def check_response_cache_is_shared(app_configs, **kwargs):
+    """Cached pages are invalidated through a data version in the cache, which every process has to see"""
+    if not response_cache_timeout() or response_cache_is_shared():
+        return []
+    return [
+        Error(
+            f"GAME_DATA_RESPONSE_CACHE_TIMEOUT is set but the '{response_cache_alias()}' cache is local to each "
+            "process, so workers would serve pages another worker has invalidated.",
+            hint="Set REDIS_URL (or point GAME_DATA_RESPONSE_CACHE_ALIAS at a shared cache), "
+                 "or set GAME_DATA_RESPONSE_CACHE_TIMEOUT=0.",
+            id='sphere_game_data_api.E001',
+        )
+    ]
@@ -0,0 +1,70 @@
+import threading
+from collections import Counter
+
+from django.db import connections
+
+
+class ConnectionStats:
+    """
+    Process-wide counts of database connections opened and requests served,
+    fed by the connection_created / request_finished signals (see signals.py).
+    With persistent connections most requests reuse one, so `opened` stays far
+    below `requests`; with DB_POOL every checkout from the pool counts as opened
+    and the pool's own statistics show the physical connections.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.opened = Counter()
+
+    def connection_opened(self, alias):
+        with self._lock:
+            self.opened[alias] += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self):
+        with self._lock:
+            return self.requests, dict(self.opened)
+
+
+connection_stats = ConnectionStats()
+
+
+def reuse_ratio(opened, requests):
+    # Share of requests that didn't have to open a connection
+    if not requests:
+        return None
+    return round(max(0.0, 1 - opened / requests), 4)
+
+
+def connection_report():
+    """
+    Connection settings and reuse per database alias:
+    - conn_max_age / health_checks / pooled: how connections are kept
+    - connections_opened / reuse_ratio: since this process started
+    - pool: psycopg pool statistics, when DB_POOL is on
+    """
+    requests, opened = connection_stats.snapshot()
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        pool = getattr(connection, 'pool', None)
+        databases[alias] = {
+            'vendor': connection.vendor,
+            'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+            'pooled': pool is not None,
+            'connections_opened': opened.get(alias, 0),
+            'reuse_ratio': reuse_ratio(opened.get(alias, 0), requests),
+            'pool': pool.get_stats() if pool is not None else None,
+        }
+    return {'requests': requests, 'databases': databases}
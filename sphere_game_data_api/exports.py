@@ -0,0 +1,38 @@
+import csv
+import json
+
+from sphere_game_data_api.pagination import keyset_values
+from sphere_game_data_api.renderers import JSON_FIELDS, READ_FIELDS, output_timezone, render_json, to_row
+
+EXPORT_FIELDS = READ_FIELDS
+
+
+class Echo:
+    """File-like object that hands back whatever is written to it, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size):
+    """
+    Yield one dict per row, in EXPORT_FIELDS order, as the API represents it.
+    Rows are read in keyset pages of `chunk_size`, so memory stays flat.
+    """
+    tz = output_timezone()
+    for values in keyset_values(queryset, EXPORT_FIELDS, chunk_size):
+        yield to_row(values, tz)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield render_json(row, (row,)) + b'\n'
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        for field in JSON_FIELDS:
+            row[field] = json.dumps(row[field], ensure_ascii=False, separators=(',', ':'))
+        yield writer.writerow(row.values())
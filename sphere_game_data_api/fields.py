@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+# First byte of a stored value
+JSON_TAG = 0  # UTF-8 JSON, for anything that isn't a list of colour names
+CODES_8_TAG = 1  # One byte per GameColor code
+CODES_16_TAG = 2  # Two bytes (big-endian) per code, once codes pass 255
+
+
+def packed_colors_enabled():
+    return getattr(settings, 'GAME_DATA_PACKED_COLORS', True)
+
+
+class ColorDictionary:
+    """
+    name <-> code cache of the GameColor table of one database. Encoding never
+    adds names: the table holds the palette seeded by migration 0017 plus the
+    colours admitted through the admin, and a list with any other name is stored
+    as JSON. The whole table is loaded in one query, at most every
+    GAME_DATA_COLOR_DICTIONARY_TTL seconds for unknown names, so colours admitted
+    in another process are picked up; an unknown code (only ever written by
+    another process) reloads it right away.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.codes = {}
+        self.names = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def model(self):
+        return apps.get_model('sphere_game_data_api', 'GameColor')
+
+    def clear(self):
+        with self.lock:
+            self.codes, self.names, self.loaded_at = {}, {}, None
+
+    def load(self):
+        rows = list(self.model().objects.using(self.alias).values_list('name', 'id'))
+        with self.lock:
+            self.codes = dict(rows)
+            self.names = {code: name for name, code in rows}
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self):
+        ttl = getattr(settings, 'GAME_DATA_COLOR_DICTIONARY_TTL', 60)
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= ttl
+
+    def code(self, name):
+        """The code of `name`, or None when it isn't in the dictionary"""
+        code = self.codes.get(name)
+        if code is None and self.is_stale():
+            self.load()
+            code = self.codes.get(name)
+        return code
+
+    def name(self, code):
+        name = self.names.get(code)
+        if name is None:
+            self.load()
+            name = self.names.get(code)
+            if name is None:
+                raise ValueError(f'Unknown game colour code {code}')
+        return name
+
+
+_dictionaries = {}
+
+
+def color_dictionary(alias):
+    dictionary = _dictionaries.get(alias)
+    if dictionary is None:
+        dictionary = _dictionaries.setdefault(alias, ColorDictionary(alias))
+    return dictionary
+
+
+def clear_color_dictionaries():
+    for dictionary in _dictionaries.values():
+        dictionary.clear()
+
+
+def encode_colors(value, alias):
+    """
+    Pack a list of colour names into GameColor codes behind a tag byte; any other
+    JSON value (or a list with a name that isn't in GameColor) is stored as JSON
+    text. Only reads GameColor, so lookups on a colour field never write.
+    """
+    if packed_colors_enabled() and isinstance(value, list) and all(isinstance(name, str) for name in value):
+        dictionary = color_dictionary(alias)
+        codes = [dictionary.code(name) for name in value]
+        if None not in codes:
+            if all(code < 256 for code in codes):
+                return bytes([CODES_8_TAG, *codes])
+            return bytes([CODES_16_TAG]) + b''.join(code.to_bytes(2, 'big') for code in codes)
+    return bytes([JSON_TAG]) + json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def decode_colors(data, alias):
+    data = bytes(data)  # memoryview on PostgreSQL
+    tag, payload = data[0], data[1:]
+    if tag == JSON_TAG:
+        return json.loads(payload)
+    dictionary = color_dictionary(alias)
+    if tag == CODES_8_TAG:
+        return [dictionary.name(code) for code in payload]
+    if tag == CODES_16_TAG:
+        return [dictionary.name(int.from_bytes(payload[i:i + 2], 'big')) for i in range(0, len(payload), 2)]
+    raise ValueError(f'Unknown game colour encoding {tag}')
+
+
+class ColorListField(models.BinaryField):
+    """
+    A JSON value, normally a list of colour names, stored compactly: each name is
+    replaced by its small integer code in the GameColor table and the codes are
+    packed into bytes (see encode_colors). Reads give back the list unchanged.
+
+    The bytes stored for a list depend on the colours admitted when it was
+    written (a name admitted later turns a JSON-stored list into codes), so
+    equal lists aren't always equal in the database. Lookups other than
+    isnull are refused rather than silently missing rows; compare the lists
+    in Python instead. distinct() on these columns has the same caveat.
+    """
+    allowed_lookups = frozenset({'isnull'})
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop('editable', None)
+        if not self.editable:
+            kwargs['editable'] = False
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return decode_colors(value, connection.alias)
+
+    def to_python(self, value):
+        return value
+
+    def get_lookup(self, lookup_name):
+        if lookup_name not in self.allowed_lookups:
+            return None  # FieldError: Unsupported lookup
+        return super().get_lookup(lookup_name)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None:
+            return None
+        if not isinstance(value, (bytes, bytearray, memoryview)):
+            # Encoding only reads GameColor
+            value = encode_colors(value, connection.alias)
+        return connection.Database.Binary(value)
+
+    def value_to_string(self, obj):
+        # As JSONField: fixtures and dumpdata carry the JSON value itself
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{'form_class': forms.JSONField, **kwargs})
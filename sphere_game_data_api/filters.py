@@ -0,0 +1,97 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class GameDataFilterBackend(BaseFilterBackend):
+    """
+    Query-string filters for game data, mapped onto the indexed columns:
+    - event_at_after / event_at_before: event_at range (after is inclusive, before is exclusive)
+    - game_level_min / game_level_max: inclusive game_level range
+    - event_type, event_category, game_mode, game_level: exact match, or comma-separated values (IN)
+    - session_id, ip_address, player_id: exact match
+    Invalid values raise a 400 instead of being silently ignored.
+    """
+
+    # query param -> (ORM lookup, DRF field used to parse the value, description)
+    range_filters = {
+        'event_at_after': ('event_at__gte', serializers.DateTimeField, 'Only events at or after this ISO 8601 datetime'),
+        'event_at_before': ('event_at__lt', serializers.DateTimeField, 'Only events before this ISO 8601 datetime'),
+        'game_level_min': ('game_level__gte', serializers.IntegerField, 'Only events at or above this game level'),
+        'game_level_max': ('game_level__lte', serializers.IntegerField, 'Only events at or below this game level'),
+    }
+    in_filters = {
+        'event_type': ('event_type', serializers.CharField, 'Event type, or several comma-separated event types'),
+        'event_category': ('event_category', serializers.CharField, 'Event category, or several comma-separated categories'),
+        'game_mode': ('game_mode', serializers.CharField, 'Game mode, or several comma-separated modes'),
+        'game_level': ('game_level', serializers.IntegerField, 'Game level, or several comma-separated levels'),
+    }
+    exact_filters = {
+        'session_id': ('session_id', serializers.CharField, 'Session identifier'),
+        'ip_address': ('ip_address', serializers.IPAddressField, 'Player IP address (IPv4 or IPv6)'),
+        'player_id': ('player_id', serializers.CharField, 'Player identifier'),
+    }
+
+    schema_types = {
+        serializers.DateTimeField: {'type': 'string', 'format': 'date-time'},
+        serializers.IntegerField: {'type': 'integer'},
+    }
+
+    def get_filter_kwargs(self, query_params):
+        filters = {}
+        errors = {}
+
+        for param, (lookup, field_class, _) in self.range_filters.items():
+            value = query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                filters[lookup] = field_class().run_validation(value)
+            except serializers.ValidationError as exc:
+                errors[param] = exc.detail
+
+        for param, (lookup, field_class, _) in self.in_filters.items():
+            value = query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                values = [
+                    field_class().run_validation(item.strip())
+                    for item in value.split(',') if item.strip()
+                ]
+            except serializers.ValidationError as exc:
+                errors[param] = exc.detail
+                continue
+            if len(values) == 1:
+                filters[lookup] = values[0]
+            elif values:
+                filters[f'{lookup}__in'] = values
+
+        for param, (lookup, field_class, _) in self.exact_filters.items():
+            value = query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                filters[lookup] = field_class().run_validation(value)
+            except serializers.ValidationError as exc:
+                errors[param] = exc.detail
+
+        if errors:
+            raise ValidationError(errors)
+        return filters
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.filter(**self.get_filter_kwargs(request.query_params))
+
+    def get_schema_operation_parameters(self, view):
+        parameters = []
+        for filters in (self.range_filters, self.in_filters, self.exact_filters):
+            for param, (_, field_class, description) in filters.items():
+                parameters.append({
+                    'name': param,
+                    'required': False,
+                    'in': 'query',
+                    'description': description,
+                    'schema': self.schema_types.get(field_class, {'type': 'string'}),
+                })
+        return parameters
@@ -0,0 +1,179 @@
+import datetime
+import re
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from sphere_game_data_api.models import GameData
+
+
+def audit_requests(sample):
+    """
+    (name, url, query params) of the GET requests the API serves against GameData,
+    with filter values taken from `sample`, a stored row
+    """
+    time_range = {
+        'event_at_after': (sample.event_at - datetime.timedelta(days=7)).isoformat(),
+        'event_at_before': sample.event_at.isoformat(),
+    }
+    list_url = reverse('game-data-list-create')
+    export_url = reverse('game-data-export')
+    stats_url = reverse('game-data-stats')
+    return [
+        ('list', list_url, {}),
+        ('list next page', list_url, {'page_size': 10}),
+        ('list event_at range', list_url, time_range),
+        ('list event_type', list_url, {'event_type': sample.event_type}),
+        ('list event_category', list_url, {'event_category': sample.event_category}),
+        ('list event_type+category', list_url, {'event_type': sample.event_type, 'event_category': sample.event_category}),
+        ('list session_id', list_url, {'session_id': sample.session_id}),
+        ('list ip_address', list_url, {'ip_address': sample.ip_address}),
+        ('list game_level', list_url, {'game_level': sample.game_level}),
+        ('list game_level range', list_url, {'game_level_min': sample.game_level, 'game_level_max': sample.game_level + 5}),
+        ('list game_mode+level', list_url, {'game_mode': sample.game_mode, 'game_level': sample.game_level}),
+        ('list player_id', list_url, {'player_id': sample.player_id}),
+        ('retrieve', reverse('game-data-rud', kwargs={'pk': sample.pk}), {}),
+        ('export event_at range', export_url, time_range),
+        ('export session_id', export_url, {'session_id': sample.session_id}),
+        ('stats', stats_url, {}),
+        ('stats event_at range', stats_url, time_range),
+        ('stats game_mode', stats_url, {'game_mode': sample.game_mode}),
+        ('session replay', reverse('game-session', kwargs={'session_id': sample.session_id}), {}),
+    ]
+
+
+def audit_querysets(sample):
+    """(name, queryset) of the lookups ingestion issues"""
+    return [
+        ('ingest event_id lookup', GameData.objects.filter(event_id=sample.event_id or uuid.UUID(int=0))),
+    ]
+
+
+def _game_data_selects(queries, table):
+    return [
+        query['sql'] for query in queries
+        if table in query['sql'] and query['sql'].lstrip().upper().startswith('SELECT')
+    ]
+
+
+def captured_selects(client, url, params, table):
+    """The SELECTs on `table` a GET request runs; streamed responses are only started"""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+        if response.streaming:
+            next(iter(response.streaming_content), None)
+            response.close()
+    return _game_data_selects(context.captured_queries, table)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def table_indexes(table):
+    """{index name: columns} of `table`, including the primary key and unique indexes"""
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+        if connection.vendor == 'sqlite':
+            # Unique constraints are introspected unnamed; plans use SQLite's own index names
+            cursor.execute(f'PRAGMA index_list({qn(table)})')
+            for name in [row[1] for row in cursor.fetchall() if row[1].startswith('sqlite_autoindex_')]:
+                cursor.execute(f'PRAGMA index_info({qn(name)})')
+                columns = [row[2] for row in cursor.fetchall()]
+                for key, info in list(constraints.items()):
+                    if key.startswith('__unnamed_constraint_') and info['columns'] == columns:
+                        constraints[name] = constraints.pop(key)
+    return {
+        name: {'columns': info['columns'], 'primary_key': info['primary_key'], 'unique': info['unique']}
+        for name, info in constraints.items()
+        if info['index'] or info['primary_key'] or info['unique']
+    }
+
+
+def index_statistics(table):
+    """{index name: (size in bytes, scans since the statistics were reset)}, where the database tells"""
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT indexrelname, pg_relation_size(indexrelid), idx_scan '
+                    'FROM pg_stat_user_indexes WHERE relname = %s',
+                    [table]
+                )
+                return {name: (size, scans) for name, size, scans in cursor.fetchall()}
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    'SELECT dbstat.name, SUM(dbstat.pgsize) FROM dbstat '
+                    'JOIN sqlite_master ON sqlite_master.name = dbstat.name '
+                    'WHERE sqlite_master.tbl_name = %s GROUP BY dbstat.name',
+                    [table]
+                )
+                return {name: (size, None) for name, size in cursor.fetchall()}
+    except DatabaseError:  # e.g. SQLite built without the dbstat table
+        pass
+    return {}
+
+
+def uses_index(plan, name, info):
+    if info['primary_key'] and re.search(r'PRIMARY KEY|_pkey\b', plan):
+        return True
+    return re.search(rf'\b{re.escape(name)}\b', plan) is not None
+
+
+def audit_indexes():
+    """
+    EXPLAIN every GameData query the audited requests issue and match the plans
+    against the table's indexes. Returns {'queries': [...], 'indexes': [...]}:
+    - queries: name, the SQL run, plans and the indexes they use
+    - indexes: columns, size, scans and which audited queries use them
+    Reads only; needs at least one stored row for realistic filter values.
+    """
+    table = GameData._meta.db_table
+    sample = GameData.objects.order_by('-id').first()
+    if sample is None:
+        return None
+
+    indexes = table_indexes(table)
+    client = APIClient()
+    client.force_authenticate(User(username='index-audit', is_staff=True, is_superuser=True))
+    rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+    queries = []
+    with override_settings(REST_FRAMEWORK=rest_framework, GAME_DATA_RESPONSE_CACHE_TIMEOUT=0):
+        audited = [
+            (name, captured_selects(client, url, params, table)) for name, url, params in audit_requests(sample)
+        ]
+    for name, queryset in audit_querysets(sample):
+        with CaptureQueriesContext(connection) as context:
+            list(queryset)
+        audited.append((name, _game_data_selects(context.captured_queries, table)))
+
+    for name, selects in audited:
+        plans = [explain(sql) for sql in selects]
+        used = sorted({
+            index for index, info in indexes.items()
+            if any(uses_index(plan, index, info) for plan in plans)
+        })
+        queries.append({'name': name, 'sql': selects, 'plans': plans, 'indexes': used})
+
+    statistics = index_statistics(table)
+    report = []
+    for index, info in sorted(indexes.items()):
+        size, scans = statistics.get(index, (None, None))
+        report.append({
+            'name': index,
+            'columns': info['columns'],
+            'unique': info['unique'] or info['primary_key'],
+            'size_bytes': size,
+            'scans': scans,
+            'used_by': [query['name'] for query in queries if index in query['indexes']],
+        })
+    return {'database': connection.vendor, 'queries': queries, 'indexes': report}
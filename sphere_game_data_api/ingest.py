@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from sphere_game_data_api.models import GameData
+from sphere_game_data_api.response_cache import bump_data_version
+from sphere_game_data_api.rollups import record_game_data
+
+
+def bulk_create_batch_size():
+    return getattr(settings, 'GAME_DATA_BULK_CREATE_BATCH_SIZE', 500)
+
+
+def insert_game_data(instances):
+    """Insert new GameData rows and fold them into the rollups, in one transaction"""
+    with transaction.atomic():
+        instances = GameData.objects.bulk_create(instances, batch_size=bulk_create_batch_size())
+        record_game_data(instances)
+    if instances:
+        bump_data_version()
+    return instances
+
+
+def _stored_event_ids(event_ids, batch_size):
+    stored = set()
+    for start in range(0, len(event_ids), batch_size):
+        stored.update(
+            GameData.objects.filter(event_id__in=event_ids[start:start + batch_size])
+            .values_list('event_id', flat=True)
+        )
+    return stored
+
+
+def insert_game_data_idempotent(instances):
+    """
+    Insert GameData rows that carry an event_id, skipping event_ids that are
+    already stored (or repeated in `instances`). An event_id stored by a
+    concurrent request between the lookup and the insert makes the insert fail
+    on the unique constraint; it is then retried without the event_ids stored
+    meanwhile, so only rows this call inserted are folded into the rollups.
+    Returns the instances that were inserted.
+    """
+    batch_size = bulk_create_batch_size()
+    event_ids = [instance.event_id for instance in instances]
+
+    with transaction.atomic():
+        while True:
+            seen = _stored_event_ids(event_ids, batch_size)
+            new_instances = []
+            for instance in instances:
+                if instance.event_id in seen:
+                    continue
+                seen.add(instance.event_id)
+                new_instances.append(instance)
+            try:
+                with transaction.atomic():
+                    GameData.objects.bulk_create(new_instances, batch_size=batch_size)
+                break
+            except IntegrityError:
+                if not _stored_event_ids([instance.event_id for instance in new_instances], batch_size):
+                    raise  # Not an event_id stored meanwhile
+                for instance in new_instances:  # Earlier bulk_create batches may have set them
+                    instance.pk = None
+                    instance._state.adding = True
+        record_game_data(new_instances)
+    if new_instances:
+        bump_data_version()
+    return new_instances
+
+
+def insert_game_data_batch(instances):
+    """
+    Insert a batch in which some instances carry a client-supplied event_id.
+    Returns (rows, created): `rows` lines up with `instances` and holds the stored
+    row for each item (the original row for a duplicate event_id), `created` is
+    the number of rows actually inserted.
+    """
+    keyed = [instance for instance in instances if instance.event_id is not None]
+    unkeyed = [instance for instance in instances if instance.event_id is None]
+
+    with transaction.atomic():
+        inserted = insert_game_data(unkeyed)
+        inserted_keyed = insert_game_data_idempotent(keyed)
+
+    stored = {}
+    event_ids = list({instance.event_id for instance in keyed})
+    batch_size = bulk_create_batch_size()
+    for start in range(0, len(event_ids), batch_size):
+        for row in GameData.objects.filter(event_id__in=event_ids[start:start + batch_size]):
+            stored[row.event_id] = row
+
+    inserted_iter = iter(inserted)
+    rows = [
+        stored[instance.event_id] if instance.event_id is not None else next(inserted_iter)
+        for instance in instances
+    ]
+    return rows, len(inserted) + len(inserted_keyed)
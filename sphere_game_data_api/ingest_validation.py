@@ -0,0 +1,201 @@
+import ipaddress
+import uuid
+
+from django.conf import settings
+from django.core.validators import (
+    MaxLengthValidator,
+    MaxValueValidator,
+    MinValueValidator,
+    ProhibitNullCharactersValidator,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+from rest_framework.validators import ProhibitSurrogateCharactersValidator
+
+# Returned by a field check when the value needs the full DRF field (usually for its error)
+FALLBACK = object()
+
+CHAR_VALIDATORS = (MaxLengthValidator, ProhibitNullCharactersValidator, ProhibitSurrogateCharactersValidator)
+INTEGER_VALIDATORS = (MaxValueValidator, MinValueValidator)
+JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def fast_validation_enabled():
+    return getattr(settings, 'GAME_DATA_FAST_VALIDATION', True)
+
+
+def _clean_text(value, field):
+    # CharField.run_validation: trim, blank check, then max length / NUL / surrogate validators
+    if type(value) is not str:
+        return FALLBACK
+    if field.trim_whitespace:
+        value = value.strip()
+    if not value:
+        return '' if field.allow_blank else FALLBACK
+    if field.max_length is not None and len(value) > field.max_length:
+        return FALLBACK
+    if '\x00' in value:
+        return FALLBACK
+    if not value.isascii():
+        try:
+            value.encode('utf-8')
+        except UnicodeEncodeError:  # Surrogates
+            return FALLBACK
+    return value
+
+
+def _json_native(value):
+    kind = type(value)
+    if kind is list:
+        return all(type(item) is str or _json_native(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and _json_native(item) for key, item in value.items())
+    return kind in JSON_SCALARS
+
+
+def _text_check(field):
+    if (
+        field.min_length is not None
+        or not all(isinstance(validator, CHAR_VALIDATORS) for validator in field.validators)
+    ):
+        return None
+    return lambda value: _clean_text(value, field)
+
+
+def _ip_address_check(field):
+    if field.protocol not in ('both', 'ipv4') or field.max_length is not None or field.min_length is not None:
+        return None
+
+    def check(value):
+        # IPv4 in canonical form only; IPv6 is normalized by the DRF field
+        if type(value) is not str or ':' in value:
+            return FALLBACK
+        value = value.strip() if field.trim_whitespace else value
+        try:
+            if str(ipaddress.IPv4Address(value)) != value:
+                return FALLBACK
+        except ValueError:
+            return FALLBACK
+        return value
+    return check
+
+
+def _integer_check(field):
+    if not all(isinstance(validator, INTEGER_VALIDATORS) for validator in field.validators):
+        return None
+    min_value, max_value = field.min_value, field.max_value
+
+    def check(value):
+        if type(value) is not int:  # Not bool, and numeric strings are left to the DRF field
+            return FALLBACK
+        if (min_value is not None and value < min_value) or (max_value is not None and value > max_value):
+            return FALLBACK
+        return value
+    return check
+
+
+def _datetime_check(field):
+    input_formats = getattr(field, 'input_formats', api_settings.DATETIME_INPUT_FORMATS)
+    if [input_format.lower() for input_format in input_formats] != [ISO_8601] or hasattr(field, 'timezone'):
+        return None
+
+    def check(value):
+        if type(value) is not str or not settings.USE_TZ:
+            return FALLBACK
+        try:
+            parsed = parse_datetime(value)
+            # Naive datetimes are made aware by the DRF field
+            if parsed is None or parsed.tzinfo is None:
+                return FALLBACK
+            return parsed.astimezone(timezone.get_current_timezone())
+        except (ValueError, OverflowError):
+            return FALLBACK
+    return check
+
+
+def _uuid_check(field):
+    def check(value):
+        if type(value) is not str:
+            return FALLBACK
+        try:
+            return uuid.UUID(hex=value)
+        except ValueError:
+            return FALLBACK
+    return check
+
+
+def _json_check(field):
+    if field.binary or field.encoder is not None:
+        return None
+    return lambda value: value if _json_native(value) else FALLBACK
+
+
+FIELD_CHECKS = {
+    serializers.CharField: _text_check,
+    serializers.IPAddressField: _ip_address_check,
+    serializers.IntegerField: _integer_check,
+    serializers.DateTimeField: _datetime_check,
+    serializers.UUIDField: _uuid_check,
+    serializers.JSONField: _json_check,
+}
+
+
+def compile_event_validator(serializer_class):
+    """
+    Build `validate(data)` for new events, from the serializer's writable fields:
+    - Returns the same validated data as serializer_class().run_validation(data)
+      for well-formed events, without building or running the DRF field stack
+    - Returns None for anything else (missing or invalid fields, numeric strings,
+      IPv6, naive datetimes, ...); callers then run the serializer, which produces
+      the usual error messages
+    Returns None instead of a function if the serializer has a field, default or
+    validator this can't reproduce exactly.
+    """
+    serializer = serializer_class()
+    if (
+        serializer.get_validators()
+        or serializer_class.validate is not serializers.Serializer.validate
+    ):
+        return None
+
+    checks = []
+    for name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        build_check = FIELD_CHECKS.get(type(field))
+        if (
+            build_check is None
+            or field.source != name
+            or field.default is not empty
+            or hasattr(serializer, f'validate_{name}')
+        ):
+            return None
+        check = build_check(field)
+        if check is None:
+            return None
+        checks.append((name, field.required, field.allow_null, check))
+
+    def validate(data):
+        if type(data) is not dict:
+            return None
+        attrs = {}
+        for name, required, allow_null, check in checks:
+            value = data.get(name, empty)
+            if value is empty:
+                if required:
+                    return None
+                continue
+            if value is None:
+                if not allow_null:
+                    return None
+            else:
+                value = check(value)
+                if value is FALLBACK:
+                    return None
+            attrs[name] = value
+        return attrs
+
+    return validate
@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from sphere_game_data_api.db_connections import connection_stats
+
+# Timings of the request being handled; contextvars follow it into sync_to_async threads
+current_timings = ContextVar('game_data_request_timings', default=None)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def metrics_enabled():
+    return getattr(settings, 'GAME_DATA_METRICS_ENABLED', True)
+
+
+class RequestTimings:
+    __slots__ = ('started', 'db_seconds', 'queries', 'serialize_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.serialize_seconds = 0.0
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper adding each query's time to the current request, if any"""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_query_timer(connection):
+    # Installed once per connection (see signals.py) rather than per request, so
+    # concurrent async requests can't pick up each other's wrapper
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@contextmanager
+def timed_serialization():
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_seconds += time.perf_counter() - started
+
+
+def _format_labels(names, values, extra=''):
+    labels = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    if extra:
+        labels = f'{labels},{extra}' if labels else extra
+    return '{' + labels + '}' if labels else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus histogram with fixed buckets, keyed by label values"""
+
+    def __init__(self, name, documentation, buckets, labels):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            # [count per bucket..., +Inf count, sum]
+            series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), series):
+                cumulative += count
+                le = f'le="{bound if bound == "+Inf" else _format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    Per-process request metrics by view (URL name) and method. Updates take one
+    lock and a bisect per histogram, so recording costs a few microseconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        labels = ('view', 'method')
+        with self._lock:
+            self.responses = Counter('game_data_http_responses_total', 'Responses by status code', (*labels, 'status'))
+            self.histograms = (
+                Histogram('game_data_http_request_duration_seconds', 'Wall time until the response', SECONDS_BUCKETS, labels),
+                Histogram('game_data_http_request_db_seconds', 'Time spent executing queries', SECONDS_BUCKETS, labels),
+                Histogram('game_data_http_request_queries', 'Queries executed', QUERY_BUCKETS, labels),
+                Histogram('game_data_http_request_serialize_seconds', 'Time spent rendering the body', SECONDS_BUCKETS, labels),
+                Histogram('game_data_http_response_size_bytes', 'Body size of non-streamed responses', SIZE_BUCKETS, labels),
+            )
+
+    def record(self, view, method, status, total, timings, size):
+        key = (view, method)
+        duration, db, queries, serialize, sizes = self.histograms
+        with self._lock:
+            self.responses.inc((view, method, str(status)))
+            duration.observe(key, total)
+            db.observe(key, timings.db_seconds)
+            queries.observe(key, timings.queries)
+            serialize.observe(key, timings.serialize_seconds)
+            if size is not None:
+                sizes.observe(key, size)
+
+    def render(self):
+        with self._lock:
+            lines = self.responses.render()
+            for histogram in self.histograms:
+                lines.extend(histogram.render())
+        requests, opened = connection_stats.snapshot()
+        lines.append('# HELP game_data_db_connections_opened_total Database connections opened')
+        lines.append('# TYPE game_data_db_connections_opened_total counter')
+        lines.extend(f'game_data_db_connections_opened_total{{alias="{alias}"}} {count}' for alias, count in sorted(opened.items()))
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+def server_timing(total, timings):
+    return (
+        f'total;dur={total * 1000:.1f}, '
+        f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries", '
+        f'serialize;dur={timings.serialize_seconds * 1000:.1f}'
+    )
+
+
+class RequestTimingMiddleware:
+    """
+    Records wall time, DB time and query count, serialization time and response
+    size for every request (see RequestMetrics), and adds them to the response
+    as a Server-Timing header. Sync and async capable; goes first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not metrics_enabled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        if not metrics_enabled():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; count that as serialization
+        render = response.render
+
+        def timed_render():
+            with timed_serialization():
+                return render()
+
+        response.render = timed_render
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        request_metrics.record(view, request.method, response.status_code, total, timings, size)
+        if getattr(settings, 'GAME_DATA_SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(total, timings)
+        return response
@@ -0,0 +1,84 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sphere_game_data_api.archive import ARCHIVE_FORMATS, ArchiveError, archive_game_data, default_archive_format
+
+# Further runs, right after the first, for events updated while they were being archived
+REARCHIVE_ATTEMPTS = 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Move game data older than a cutoff (by event_at) into a compressed archive file, '
+        'verify it and delete the archived rows in bounded batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=getattr(settings, 'GAME_DATA_ARCHIVE_AFTER_DAYS', 180),
+            help='Archive events whose event_at is more than this many days ago (default: GAME_DATA_ARCHIVE_AFTER_DAYS)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(ARCHIVE_FORMATS),
+            default=None,
+            help='Archive file format (default: parquet when pyarrow is installed, otherwise ndjson)'
+        )
+        parser.add_argument(
+            '--directory',
+            default=None,
+            help='Directory the archives are written to (default: GAME_DATA_ARCHIVE_DIR)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per keyset query and written per chunk (default: 2000)'
+        )
+        parser.add_argument(
+            '--delete-batch-size',
+            type=int,
+            default=1000,
+            help='Archived rows deleted per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Write and verify the archive, but keep the rows in the database'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=options['older_than_days'])
+        for attempt in range(REARCHIVE_ATTEMPTS + 1):
+            try:
+                manifest = archive_game_data(
+                    cutoff,
+                    directory=options['directory'],
+                    archive_format=options['format'] or default_archive_format(),
+                    chunk_size=options['chunk_size'],
+                    delete_batch_size=options['delete_batch_size'],
+                    delete=not options['keep'],
+                )
+            except ArchiveError as e:
+                raise CommandError(str(e))
+
+            if manifest is None:
+                if not attempt:
+                    self.stdout.write(self.style.SUCCESS(f'No events before {cutoff:%Y-%m-%d %H:%M:%S}Z to archive'))
+                return
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Archived {manifest['rows']} events ({manifest['first_event_at']} to {manifest['last_event_at']}) "
+                    f"to {manifest['file']}, deleted {manifest['deleted']}"
+                )
+            )
+            superseded = len(manifest['superseded_ids'])
+            if not superseded:
+                return
+            # Updated after they were dumped: archive their current version too
+            self.stdout.write(f'{superseded} events changed while being archived; archiving them again')
+        self.stdout.write(self.style.WARNING('Events kept changing; the rest are left for the next run'))
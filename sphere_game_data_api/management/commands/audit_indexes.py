@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sphere_game_data_api.index_audit import audit_indexes
+
+
+def format_size(size):
+    if size is None:
+        return '-'
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the GameData queries the API issues (list, filters, retrieve, export, stats, '
+        'ingest lookups) and report which indexes they use, with index sizes and scan counts. Read only.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the full report, including SQL and plans, as JSON'
+        )
+
+    def handle(self, *args, **options):
+        report = audit_indexes()
+        if report is None:
+            raise CommandError('The game data table is empty; the audit needs rows for realistic plans')
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+
+        self.stdout.write(f"Queries ({report['database']})")
+        for query in report['queries']:
+            self.stdout.write(
+                f"  {query['name']:<28} {len(query['sql']):>2} queries  "
+                f"indexes: {', '.join(query['indexes']) or 'none (full scan)'}"
+            )
+            if options['verbosity'] > 1:
+                for plan in query['plans']:
+                    self.stdout.write('      ' + plan.replace('\n', '\n      '))
+
+        self.stdout.write('\nIndexes')
+        for index in report['indexes']:
+            scans = '-' if index['scans'] is None else index['scans']
+            self.stdout.write(
+                f"  {index['name']:<48} ({', '.join(index['columns'])})  size {format_size(index['size_bytes'])}  "
+                f"scans {scans}  used by {len(index['used_by'])}"
+            )
+
+        unused = [index['name'] for index in report['indexes'] if not index['used_by'] and not index['unique']]
+        if unused:
+            self.stdout.write(self.style.WARNING(f"\nNot used by any audited query: {', '.join(unused)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('\nEvery index is used by an audited query'))
@@ -0,0 +1,426 @@
+import json
+import random
+import subprocess
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from sphere_game_data_api.benchmarks import (
+    ThreadLocalClients,
+    benchmark_environment,
+    run_concurrent,
+    run_threaded,
+    simulated_db_latency,
+    summarize,
+)
+from sphere_game_data_api.models import GameData
+from sphere_game_data_api.renderers import READ_FIELDS, output_timezone, render_json, to_row
+from sphere_game_data_api.serializers import GameDataSerializer
+
+EVENT = {
+    "event_at": "2024-01-01T12:00:00Z",
+    "event_type": "player_selection",
+    "event_category": "gameplay",
+    "ip_address": "192.168.1.2",
+    "player_id": "player_001",
+    "session_id": "session_benchmark",
+    "game_reference": "game_ref_001",
+    "game_level": 3,
+    "game_mode": "classic",
+    "game_color": "red",
+    "correct_game_color": "red",
+    "game_sequence": ["red", "blue", "green"],
+    "game_player_input": ["red", "blue"],
+    "retry_count": 1,
+    "error_messages": [],
+}
+
+ADMIN_USERNAME = 'benchmark_admin'
+ADMIN_PASSWORD = 'benchmark-P@ssw0rd'
+
+EVENT_TYPES = ('game_start', 'player_selection', 'level_complete', 'game_end')
+GAME_MODES = ('classic', 'timed', 'multiplayer')
+COLORS = ('red', 'blue', 'green', 'yellow')
+
+
+def seed_game_data(rows, chunk_size=5000, stdout=None):
+    """
+    Bulk insert `rows` synthetic events (10 per session, 20 sessions per player)
+    spread over the last 90 days. Rollups are not maintained for seeded rows.
+    """
+    rng = random.Random(rows)
+    now = timezone.now()
+    inserted = 0
+    while inserted < rows:
+        chunk = []
+        for index in range(inserted, min(rows, inserted + chunk_size)):
+            session = index // 10
+            level = index % 10 + 1
+            sequence = [rng.choice(COLORS) for _ in range(level + 2)]
+            chunk.append(GameData(
+                event_at=now - timedelta(seconds=rng.randrange(90 * 24 * 3600)),
+                event_type=rng.choice(EVENT_TYPES),
+                event_category='gameplay',
+                ip_address=f'10.{session >> 16 & 255}.{session >> 8 & 255}.{session & 255}',
+                player_id=f'player_{session // 20}',
+                session_id=f'session_{session}',
+                game_level=level,
+                game_mode=GAME_MODES[session % len(GAME_MODES)],
+                game_color=sequence[-1],
+                correct_game_color=sequence[-1],
+                game_sequence=sequence,
+                game_player_input=sequence[:rng.randrange(len(sequence) + 1)],
+                retry_count=rng.randrange(4),
+            ))
+        GameData.objects.bulk_create(chunk)
+        inserted += len(chunk)
+        if stdout is not None:
+            stdout.write(f'Seeded {inserted}/{rows} rows')
+    return inserted
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the API hot paths against a throwaway test database and report '
+        'p50/p95/p99 latency and requests per second'
+    )
+
+    scenarios = (
+        'create', 'create_asgi', 'create_async', 'batch_create', 'list', 'retrieve', 'login', 'render', 'validate'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=self.scenarios,
+            help='Scenario to run (repeatable, default: all)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Requests per scenario (default: 500)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Worker threads (sync) or in-flight requests (async) (default: 8)'
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Seed the database up to this many GameData rows first (default: 10000)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Events per request in batch_create (default: 100)'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=100,
+            help='Page size for the list scenario (default: 100)'
+        )
+        parser.add_argument(
+            '--render-rows',
+            type=int,
+            default=10000,
+            help='Rows rendered per iteration in the render scenario (default: 10000)'
+        )
+        parser.add_argument(
+            '--render-iterations',
+            type=int,
+            default=5,
+            help='Iterations of the render and validate scenarios, which ignore --requests (default: 5)'
+        )
+        parser.add_argument(
+            '--validate-events',
+            type=int,
+            default=10000,
+            help='Events validated per iteration in the validate scenario (default: 10000)'
+        )
+        parser.add_argument(
+            '--db-latency-ms',
+            type=float,
+            default=0,
+            help='Simulated database round-trip time added to every query (default: 0)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Print the change against a previous --output JSON file'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the benchmark test database (and its seeded rows) between runs'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = options['scenario'] or self.scenarios
+        self.options = options
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = {result['scenario']: result for result in json.load(f)['results']}
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f'Cannot read --compare file: {e}')
+
+        results = []
+        with benchmark_environment(keepdb=options['keepdb']):
+            existing = GameData.objects.count()
+            if existing < options['rows']:
+                seed_game_data(options['rows'] - existing, stdout=self.stdout)
+            self.setup_admin()
+            rows = GameData.objects.count()
+
+            with simulated_db_latency(options['db_latency_ms'] / 1000):
+                for scenario in scenarios:
+                    result = getattr(self, f'run_{scenario}')(options['requests'], options['concurrency'])
+                    results.append(result)
+                    self.stdout.write(self.format_result(result, baseline))
+
+            report = {
+                'revision': git_revision(),
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'rows': rows,
+                'options': {
+                    key: options[key]
+                    for key in (
+                        'requests', 'concurrency', 'batch_size', 'page_size', 'render_rows',
+                        'validate_events', 'db_latency_ms'
+                    )
+                },
+                'results': results,
+            }
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def setup_admin(self):
+        user, created = User.objects.get_or_create(
+            username=ADMIN_USERNAME, defaults={'is_staff': True, 'is_superuser': True}
+        )
+        if created:
+            user.set_password(ADMIN_PASSWORD)
+            user.save()
+        self.token = Token.objects.get_or_create(user=user)[0].key
+
+    def format_result(self, result, baseline=None):
+        line = (
+            f"{result['scenario']:<14} {result['requests']:>7} req  {result['errors']:>4} err  "
+            f"{result['rps']:>9} req/s  p50 {result['p50_ms']:>9} ms  "
+            f"p95 {result['p95_ms']:>9} ms  p99 {result['p99_ms']:>9} ms"
+        )
+        if 'speedup' in result:
+            line += f"  (serializer p50 {result['serializer_p50_ms']} ms, {result['speedup']}x faster)"
+        if 'us_per_event' in result:
+            line += f"  ({result['us_per_event']} us/event)"
+        previous = (baseline or {}).get(result['scenario'])
+        if previous and previous.get('rps') and previous.get('p95_ms'):
+            line += (
+                f"  (req/s {(result['rps'] / previous['rps'] - 1) * 100:+.1f}%, "
+                f"p95 {(result['p95_ms'] / previous['p95_ms'] - 1) * 100:+.1f}%)"
+            )
+        return line
+
+    def admin_client(self):
+        return Client(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def run_create(self, total, concurrency):
+        url = reverse("game-data-list-create")
+        clients = ThreadLocalClients(Client)
+
+        def request(index):
+            response = clients.client.post(url, EVENT, content_type="application/json")
+            return response.status_code == 201
+
+        return summarize('create', *run_threaded(request, total, concurrency), concurrency=concurrency)
+
+    def run_create_asgi(self, total, concurrency):
+        """The sync create view served through ASGI, the baseline for create_async"""
+        url = reverse("game-data-list-create")
+        client = AsyncClient()
+
+        async def request(index):
+            response = await client.post(url, EVENT, content_type="application/json")
+            return response.status_code == 201
+
+        return summarize('create_asgi', *run_concurrent(request, total, concurrency), concurrency=concurrency)
+
+    def run_create_async(self, total, concurrency):
+        url = reverse("game-data-async-create")
+        client = AsyncClient()
+
+        async def request(index):
+            response = await client.post(url, EVENT, content_type="application/json")
+            return response.status_code == 201
+
+        return summarize('create_async', *run_concurrent(request, total, concurrency), concurrency=concurrency)
+
+    def run_batch_create(self, total, concurrency):
+        url = reverse("game-data-batch-create")
+        clients = ThreadLocalClients(Client)
+        batch_size = self.options['batch_size']
+        body = json.dumps([EVENT] * batch_size)
+
+        def request(index):
+            response = clients.client.post(url, body, content_type="application/json")
+            return response.status_code == 201
+
+        result = summarize(
+            'batch_create', *run_threaded(request, total, concurrency),
+            concurrency=concurrency, batch_size=batch_size,
+        )
+        result['events_per_s'] = round(result['rps'] * batch_size, 1) if result['rps'] else None
+        return result
+
+    def run_list(self, total, concurrency):
+        first_page = f'{reverse("game-data-list-create")}?page_size={self.options["page_size"]}'
+        clients = ThreadLocalClients(self.admin_client)
+        cursors = threading.local()
+
+        def request(index):
+            # Each worker walks the cursor chain from the newest page onwards
+            url = getattr(cursors, 'next', None) or first_page
+            response = clients.client.get(url)
+            if response.status_code != 200:
+                return False
+            cursors.next = response.json()['next']
+            return True
+
+        return summarize(
+            'list', *run_threaded(request, total, concurrency),
+            concurrency=concurrency, page_size=self.options['page_size'],
+        )
+
+    def run_retrieve(self, total, concurrency):
+        bounds = GameData.objects.aggregate(low=Min('id'), high=Max('id'))
+        clients = ThreadLocalClients(self.admin_client)
+        rng = random.Random(total)
+        pks = [rng.randint(bounds['low'], bounds['high']) for _ in range(total)]
+
+        def request(index):
+            response = clients.client.get(reverse("game-data-rud", kwargs={"pk": pks[index]}))
+            return response.status_code == 200
+
+        return summarize('retrieve', *run_threaded(request, total, concurrency), concurrency=concurrency)
+
+    def run_login(self, total, concurrency):
+        url = reverse("login")
+        clients = ThreadLocalClients(Client)
+        body = {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+
+        def request(index):
+            response = clients.client.post(url, body, content_type="application/json")
+            return response.status_code == 200
+
+        return summarize('login', *run_threaded(request, total, concurrency), concurrency=concurrency)
+
+    def run_render(self, total, concurrency):
+        """
+        Fetch and render --render-rows rows, through GameDataSerializer + JSONRenderer
+        and through values_list() + to_row + render_json. The summary is for the fast
+        path; a render whose bytes differ from the serializer's counts as an error.
+        """
+        queryset = GameData.objects.order_by('-created_at', '-id')[:self.options['render_rows']]
+        iterations = self.options['render_iterations']
+
+        def serializer_render():
+            return JSONRenderer().render(GameDataSerializer(queryset.all(), many=True).data)
+
+        def fast_render():
+            tz = output_timezone()
+            rows = [to_row(row, tz) for row in queryset.values_list(*READ_FIELDS)]
+            return render_json(rows, rows)
+
+        serializer_latencies, latencies, errors = [], [], 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            expected = serializer_render()
+            serializer_latencies.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            content = fast_render()
+            latencies.append(time.perf_counter() - started)
+            errors += content != expected
+        elapsed = time.perf_counter() - start
+
+        result = summarize('render', latencies, errors, elapsed, rows=queryset.count())
+        serializer_p50 = summarize('render', serializer_latencies, 0, elapsed)['p50_ms']
+        result['serializer_p50_ms'] = serializer_p50
+        result['speedup'] = round(serializer_p50 / result['p50_ms'], 1) if result['p50_ms'] else None
+        return result
+
+    def run_validate(self, total, concurrency):
+        """
+        Validate --validate-events new events with GameDataSerializer(data=...).is_valid(),
+        as the single-event endpoint does, with and without the precompiled validator.
+        The summary is for the fast path; an event whose validated data differs from
+        the serializer's counts as an error.
+        """
+        events = [
+            {**EVENT, 'event_id': str(uuid.uuid4()), 'game_level': index % 50, 'player_id': f'player_{index:05d}'}
+            for index in range(self.options['validate_events'])
+        ]
+        iterations = self.options['render_iterations']
+
+        def validate(fast):
+            with override_settings(GAME_DATA_FAST_VALIDATION=fast):
+                validated = []
+                for event in events:
+                    serializer = GameDataSerializer(data=event)
+                    serializer.is_valid(raise_exception=True)
+                    validated.append(serializer.validated_data)
+                return validated
+
+        serializer_latencies, latencies, errors = [], [], 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            expected = validate(fast=False)
+            serializer_latencies.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            validated = validate(fast=True)
+            latencies.append(time.perf_counter() - started)
+            errors += sum(dict(attrs) != dict(other) for attrs, other in zip(validated, expected))
+        elapsed = time.perf_counter() - start
+
+        result = summarize('validate', latencies, errors, elapsed, events=len(events))
+        serializer_p50 = summarize('validate', serializer_latencies, 0, elapsed)['p50_ms']
+        result['serializer_p50_ms'] = serializer_p50
+        result['speedup'] = round(serializer_p50 / result['p50_ms'], 1) if result['p50_ms'] else None
+        result['us_per_event'] = round(result['p50_ms'] * 1000 / len(events), 2) if events else None
+        return result
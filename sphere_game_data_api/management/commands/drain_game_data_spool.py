@@ -0,0 +1,61 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sphere_game_data_api.spool import drain_spool, get_spool
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Flush write-behind game data from the local spool into the database in bulk batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Events inserted per bulk_create batch (default: 1000)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the spool is empty (default: 1.0)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain until the spool is empty, then exit'
+        )
+
+    def handle(self, *args, **options):
+        spool = get_spool()
+        batch_size = options['batch_size']
+
+        while True:
+            # Same connection lifecycle as a request: drop connections past CONN_MAX_AGE or
+            # broken by an error (e.g. the database was suspended), reconnect on next use
+            close_old_connections()
+            try:
+                claimed, inserted = drain_spool(spool, batch_size)
+            except Exception as e:
+                # Leased events were released and will be retried
+                logger.error(f"Error draining game data spool: {e}")
+                claimed = inserted = 0
+                if options['once']:
+                    raise
+
+            if claimed:
+                self.stdout.write(
+                    f'Flushed {claimed} events ({inserted} inserted, {claimed - inserted} replays skipped), '
+                    f'queue depth {spool.depth()}'
+                )
+                continue
+
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS('Spool is empty'))
+                return
+            time.sleep(options['interval'])
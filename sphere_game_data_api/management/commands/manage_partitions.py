@@ -0,0 +1,78 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sphere_game_data_api.models import GameData
+from sphere_game_data_api.partitions import (
+    add_months,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    month_start,
+    partition_table,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Maintain the monthly event_at partitions of the game data table (PostgreSQL): '
+        'create upcoming months and detach or drop months past the retention. Run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=getattr(settings, 'GAME_DATA_PARTITION_MONTHS_AHEAD', 3),
+            help='Months after the current one to create partitions for (default: GAME_DATA_PARTITION_MONTHS_AHEAD)'
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=getattr(settings, 'GAME_DATA_PARTITION_RETENTION_MONTHS', None),
+            help=(
+                'Detach partitions that ended more than this many months ago '
+                '(default: GAME_DATA_PARTITION_RETENTION_MONTHS, unset keeps everything)'
+            )
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop detached partitions instead of keeping them as standalone tables'
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Partition the table first if it is not partitioned yet (locks it while rows are copied)'
+        )
+        parser.add_argument(
+            '--months-back',
+            type=int,
+            default=24,
+            help='With --convert, oldest month to get its own partition; older rows go to the default partition (default: 24)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'Partitioning needs PostgreSQL, the database is {connection.vendor}')
+        table = GameData._meta.db_table
+
+        if not is_partitioned(connection, table):
+            if not options['convert']:
+                raise CommandError(f'{table} is not partitioned; run with --convert to partition it')
+            partition_table(connection, table, months_back=options['months_back'], months_ahead=options['months_ahead'])
+            self.stdout.write(self.style.SUCCESS(f'Partitioned {table} by month on event_at'))
+
+        now = month_start(datetime.datetime.now(datetime.timezone.utc))
+        created = ensure_partitions(connection, table, now, add_months(now, options['months_ahead']))
+        for name in created:
+            self.stdout.write(f'Created partition {name}')
+
+        if options['retention_months']:
+            cutoff = add_months(now, -options['retention_months'])
+            for name in detach_partitions(connection, table, cutoff, drop=options['drop']):
+                self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} partition {name}")
+
+        self.stdout.write(self.style.SUCCESS('Partitions are up to date'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from sphere_game_data_api.rollups import rebuild_player_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-player stats (highest level, sessions, accuracy, last seen) from scratch out of GameData'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows read and inserted per round trip (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_player_stats(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} player stats rows'))
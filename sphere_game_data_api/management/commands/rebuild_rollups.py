@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from sphere_game_data_api.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly and per-session rollup tables from scratch out of GameData'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows read and inserted per round trip (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        hourly_count, session_count = rebuild_rollups(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt {hourly_count} hourly rollup rows and {session_count} session level rollup rows'
+            )
+        )
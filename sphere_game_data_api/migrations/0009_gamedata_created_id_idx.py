@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0008_rename_mac_address_to_player_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamedata',
+            index=models.Index(fields=['created_at', 'id'], name='gd_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0009_gamedata_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameDataHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('event_type', models.CharField(max_length=255)),
+                ('event_category', models.CharField(max_length=255)),
+                ('game_mode', models.CharField(max_length=255)),
+                ('game_level', models.IntegerField()),
+                ('event_count', models.BigIntegerField(default=0)),
+                ('retry_total', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'event_type', 'event_category', 'game_mode', 'game_level'), name='gd_hourly_rollup_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GameSessionLevelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(max_length=255)),
+                ('game_mode', models.CharField(max_length=255)),
+                ('game_level', models.IntegerField()),
+                ('player_id', models.CharField(blank=True, default='', max_length=255)),
+                ('first_event_at', models.DateTimeField()),
+                ('last_event_at', models.DateTimeField()),
+                ('event_count', models.BigIntegerField(default=0)),
+                ('retry_total', models.BigIntegerField(default=0)),
+                ('completed', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game_mode', 'game_level'], name='gd_sl_rollup_mode_level_idx')],
+                'constraints': [models.UniqueConstraint(fields=('session_id', 'game_mode', 'game_level'), name='gd_session_level_rollup_key')],
+            },
+        ),
+    ]
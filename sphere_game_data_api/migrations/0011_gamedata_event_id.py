@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0010_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamedata',
+            name='event_id',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
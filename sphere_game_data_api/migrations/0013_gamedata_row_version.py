@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0012_gamedata_client_event_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamedata',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='gamedata',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
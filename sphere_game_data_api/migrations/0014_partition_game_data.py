@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_game_data(apps, schema_editor):
+    # Opt-in (GAME_DATA_PARTITIONED=True) and PostgreSQL only; see partitions.partition_table
+    if not getattr(settings, 'GAME_DATA_PARTITIONED', False) or schema_editor.connection.vendor != 'postgresql':
+        return
+    from sphere_game_data_api.partitions import partition_table
+
+    GameData = apps.get_model('sphere_game_data_api', 'GameData')
+    partition_table(
+        schema_editor.connection,
+        GameData._meta.db_table,
+        months_ahead=getattr(settings, 'GAME_DATA_PARTITION_MONTHS_AHEAD', 3),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0013_gamedata_row_version'),
+    ]
+
+    operations = [
+        # Unapplying leaves the table partitioned; the ORM works the same on both
+        migrations.RunPython(partition_game_data, migrations.RunPython.noop),
+    ]
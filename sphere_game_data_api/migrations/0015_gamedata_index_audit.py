@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0014_partition_game_data'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamedata',
+            name='event_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='gamedata',
+            name='event_category',
+            field=models.CharField(default='general', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='gamedata',
+            name='event_type',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='gamedata',
+            name='game_level',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='gamedata',
+            name='game_mode',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='gamedata',
+            name='ip_address',
+            field=models.GenericIPAddressField(),
+        ),
+        migrations.AlterField(
+            model_name='gamedata',
+            name='session_id',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='gamedata',
+            index=models.Index(fields=['game_mode', 'game_level'], name='gd_mode_level_idx'),
+        ),
+    ]
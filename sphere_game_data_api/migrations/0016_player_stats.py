@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0015_gamedata_index_audit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.CharField(max_length=255)),
+                ('game_mode', models.CharField(max_length=255)),
+                ('highest_level', models.IntegerField()),
+                ('sessions_played', models.BigIntegerField(default=0)),
+                ('event_count', models.BigIntegerField(default=0)),
+                ('colors_expected', models.BigIntegerField(default=0)),
+                ('colors_correct', models.BigIntegerField(default=0)),
+                ('last_seen', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='gamedata',
+            index=models.Index(fields=['player_id', 'event_at'], name='gd_player_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstats',
+            index=models.Index(fields=['game_mode', '-highest_level', 'player_id'], name='player_stats_leaderboard_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='playerstats',
+            constraint=models.UniqueConstraint(fields=('player_id', 'game_mode'), name='player_stats_key'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations, models
+
+import sphere_game_data_api.fields
+
+COLOR_FIELDS = ('game_sequence', 'game_player_input')
+BATCH_SIZE = 2000
+# The game's palette gets the first codes; other names are added in the admin
+PALETTE = ('red', 'blue', 'green', 'yellow')
+
+
+def add_palette(apps, schema_editor):
+    GameColor = apps.get_model('sphere_game_data_api', 'GameColor')
+    GameColor.objects.bulk_create([GameColor(name=name) for name in PALETTE])
+
+
+def copy_colors(apps, source_suffix, target_suffix):
+    GameData = apps.get_model('sphere_game_data_api', 'GameData')
+    sources = [field + source_suffix for field in COLOR_FIELDS]
+    targets = [field + target_suffix for field in COLOR_FIELDS]
+    rows = GameData.objects.order_by('pk').values_list('pk', *sources)
+    last = 0
+    while True:
+        # Keyset pages by pk rather than iterator(): server-side cursors are off on the pooled connection
+        batch = [GameData(pk=pk, **dict(zip(targets, values))) for pk, *values in rows.filter(pk__gt=last)[:BATCH_SIZE]]
+        if not batch:
+            return
+        GameData.objects.bulk_update(batch, targets)
+        last = batch[-1].pk
+
+
+def pack_colors(apps, schema_editor):
+    copy_colors(apps, '', '_packed')
+
+
+def unpack_colors(apps, schema_editor):
+    copy_colors(apps, '_packed', '')
+
+
+class Migration(migrations.Migration):
+    """
+    Move game_sequence / game_player_input from JSON to packed GameColor codes:
+    add the packed columns, convert every row in batches, drop the JSON columns
+    and rename the packed ones into their place. Reversible.
+    """
+
+    dependencies = [
+        ('sphere_game_data_api', '0016_player_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameColor',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.RunPython(add_palette, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='gamedata',
+            name='game_sequence_packed',
+            field=sphere_game_data_api.fields.ColorListField(default=list),
+        ),
+        migrations.AddField(
+            model_name='gamedata',
+            name='game_player_input_packed',
+            field=sphere_game_data_api.fields.ColorListField(default=list),
+        ),
+        migrations.RunPython(pack_colors, unpack_colors),
+        migrations.RemoveField(
+            model_name='gamedata',
+            name='game_sequence',
+        ),
+        migrations.RemoveField(
+            model_name='gamedata',
+            name='game_player_input',
+        ),
+        migrations.RenameField(
+            model_name='gamedata',
+            old_name='game_sequence_packed',
+            new_name='game_sequence',
+        ),
+        migrations.RenameField(
+            model_name='gamedata',
+            old_name='game_player_input_packed',
+            new_name='game_player_input',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0017_pack_game_colors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamedata',
+            index=models.Index(fields=['event_category', 'created_at', 'id'], name='gd_cat_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamedata',
+            index=models.Index(fields=['game_level', 'game_mode'], name='gd_level_mode_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def add_event_id_ledger(apps, schema_editor):
+    # Tables partitioned by 0014 or manage_partitions --convert before the ledger existed
+    from sphere_game_data_api.partitions import add_event_id_ledger, is_partitioned
+
+    GameData = apps.get_model('sphere_game_data_api', 'GameData')
+    if is_partitioned(schema_editor.connection, GameData._meta.db_table):
+        add_event_id_ledger(schema_editor.connection, GameData._meta.db_table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphere_game_data_api', '0018_gamedata_level_category_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_event_id_ledger, migrations.RunPython.noop),
+    ]
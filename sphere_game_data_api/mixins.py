@@ -0,0 +1,147 @@
+import hashlib
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.response import Response
+
+from sphere_game_data_api.renderers import (
+    READ_FIELDS,
+    PreRenderedResponse,
+    fast_reads_enabled,
+    render_object,
+    render_page,
+)
+from sphere_game_data_api.response_cache import (
+    data_version,
+    get_response_cache,
+    page_etag,
+    response_cache_timeout,
+    row_etag,
+    set_validators,
+)
+
+# Row fields needed for validators; read without the JSON columns
+VALIDATOR_FIELDS = ('pk', 'version', 'updated_at')
+
+
+class CachedResponseMixin:
+    """
+    Conditional requests and response caching for the game data views:
+    - Retrieve: the ETag is the row's id and version, checked with a query that skips
+      the JSON columns; the rendered row is cached per version
+    - List: pages are cached per data version and normalized query (see
+      get_response_cache_key_parts), with an ETag over the page's row ids and versions.
+      Only with GAME_DATA_RESPONSE_CACHE_TIMEOUT set, which needs a shared cache (see checks.py)
+    - If-None-Match / If-Modified-Since are answered with 304 before serialization,
+      If-Match / If-Unmodified-Since on PUT, PATCH and DELETE with 412 on a mismatch
+    - Bodies are rendered straight from values_list() rows (see renderers.py) unless
+      GAME_DATA_FAST_READS is off
+    All checks run inside the view handlers, i.e. after authentication and permissions.
+    """
+
+    def get_response_cache_key_parts(self, request):
+        raise NotImplementedError
+
+    def cached_list_response(self, request):
+        timeout = response_cache_timeout()
+        fast = fast_reads_enabled(request)
+        cache = get_response_cache()
+        if timeout:
+            token, modified_at = data_version()
+            key_parts = (request.build_absolute_uri(request.path), fast, self.get_response_cache_key_parts(request))
+            key = f'game-data:response:{token}:{hashlib.sha256(repr(key_parts).encode()).hexdigest()}'
+            entry = cache.get(key)
+            if entry is not None:
+                etag, content = entry
+                response = get_conditional_response(request, etag=etag, last_modified=int(modified_at))
+                if response is None:
+                    response = PreRenderedResponse(content) if fast else Response(content)
+                return set_validators(response, etag, modified_at)
+        else:
+            # Without page caching there is no shared data version to date the page by; the ETag alone validates it
+            modified_at = None
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if fast:
+            # Plain tuples instead of model instances; named, so the paginator can read the cursor position
+            queryset = queryset.values_list(*READ_FIELDS, 'version', named=True)
+        page = self.paginate_queryset(queryset)
+        next_link, previous_link = self.paginator.get_next_link(), self.paginator.get_previous_link()
+        etag = page_etag(page, next_link, previous_link)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(modified_at) if modified_at is not None else None
+        )
+        if response is None:
+            if fast:
+                response = PreRenderedResponse(render_page(next_link, previous_link, page))
+                content = response.content_bytes
+            else:
+                response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+                content = response.data
+            if timeout:
+                cache.set(key, (etag, content), timeout)
+        return set_validators(response, etag, modified_at)
+
+    def get_lookup_filter(self):
+        return {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+
+    def get_row_validators(self, lock=False):
+        """(etag, last_modified, cache key) of the requested row, or 404"""
+        queryset = self.filter_queryset(self.get_queryset()).filter(**self.get_lookup_filter())
+        if lock:
+            queryset = queryset.select_for_update()
+        row = queryset.values(*VALIDATOR_FIELDS).first()
+        if row is None:
+            raise Http404
+        key = f"game-data:row:{row['pk']}:{row['version']}"
+        return row_etag(row['pk'], row['version']), row['updated_at'].timestamp(), key
+
+    def cached_object_response(self, request):
+        etag, last_modified, key = self.get_row_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+        if response is not None:
+            return set_validators(response, etag, last_modified)
+
+        cache = get_response_cache()
+        if fast_reads_enabled(request):
+            key += ':rendered'
+            content = cache.get(key)
+            if content is None:
+                row = self.filter_queryset(self.get_queryset()).filter(
+                    **self.get_lookup_filter()
+                ).values_list(*READ_FIELDS).first()
+                if row is None:
+                    raise Http404
+                content = render_object(row)
+            response = PreRenderedResponse(content)
+        else:
+            content = cache.get(key)
+            if content is None:
+                content = self.get_serializer(self.get_object()).data
+            response = Response(content)
+
+        if response_cache_timeout():
+            cache.set(key, content, response_cache_timeout())
+        return set_validators(response, etag, last_modified)
+
+    def check_write_preconditions(self, request):
+        """
+        412 response when If-Match / If-Unmodified-Since don't match the row.
+        Call inside a transaction: the row stays locked until the write is done.
+        """
+        if 'HTTP_IF_MATCH' not in request.META and 'HTTP_IF_UNMODIFIED_SINCE' not in request.META:
+            return None
+        etag, last_modified, _ = self.get_row_validators(lock=True)
+        if get_conditional_response(request, etag=etag, last_modified=int(last_modified)) is None:
+            return None
+        response = Response(
+            {
+                'error': True,
+                'message': 'Precondition failed',
+                'details': 'Game data was modified since it was read; fetch it again and retry'
+            },
+            status=status.HTTP_412_PRECONDITION_FAILED
+        )
+        response['ETag'] = etag
+        return response
@@ -1,30 +1,127 @@
 from django.db import models
 from django.contrib.auth.models import User
+from sphere_game_data_api.fields import ColorListField
+
+
+class GameColor(models.Model):
+    """Dictionary of the colour names in game sequences; ColorListField stores their ids"""
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
 
 
 class GameData(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
-    event_at = models.DateTimeField(db_index=True)  # Index for time-based queries
-    event_type = models.CharField(max_length=255, db_index=True)  # Index for event type filtering
-    event_category = models.CharField(max_length=255, default="general", blank=False, db_index=True)  # Index for category filtering
-    ip_address = models.GenericIPAddressField(db_index=True)  # Index for IP-based queries
+    event_at = models.DateTimeField()
+    event_type = models.CharField(max_length=255)
+    event_category = models.CharField(max_length=255, default="general", blank=False)
+    ip_address = models.GenericIPAddressField()
     player_id = models.CharField(max_length=255, blank=True, default="")  # Player identifier
-    session_id = models.CharField(max_length=255, db_index=True)  # Index for session tracking
+    session_id = models.CharField(max_length=255)
     game_reference = models.CharField(max_length=255, blank=True, default="")
-    game_level = models.IntegerField(db_index=True)  # Index for level-based analytics
-    game_mode = models.CharField(max_length=255, db_index=True)  # Index for mode filtering
+    game_level = models.IntegerField()
+    game_mode = models.CharField(max_length=255)
     game_color = models.CharField(max_length=255, blank=True, default="")
     correct_game_color = models.CharField(max_length=255, blank=True, default="")  # The correct color for this event
-    game_sequence = models.JSONField(default=list)
-    game_player_input = models.JSONField(default=list)
+    game_sequence = ColorListField(default=list)  # Colour names, stored as GameColor codes
+    game_player_input = ColorListField(default=list)
     retry_count = models.IntegerField(default=0)
     error_messages = models.JSONField(default=list)
+    event_id = models.UUIDField(null=True, blank=True, unique=True)  # Client-generated idempotency key
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)  # Bumped on every update, used for ETags
 
     class Meta:
+        # Composite indexes only: each also serves queries on its leading column, and every
+        # extra index slows down ingestion (see `python manage.py audit_indexes`)
         indexes = [
-            # Composite indexes for common query patterns
             models.Index(fields=['session_id', 'event_at'], name='gd_session_time_idx'),
             models.Index(fields=['event_type', 'event_category'], name='gd_type_cat_idx'),
-            models.Index(fields=['event_at', 'event_type'], name='gd_time_type_idx'),
+            models.Index(fields=['event_category', 'created_at', 'id'], name='gd_cat_created_idx'),  # Category filter, in list order
+            models.Index(fields=['event_at', 'event_type'], name='gd_time_type_idx'),  # event_at ranges, export order
             models.Index(fields=['ip_address', 'event_at'], name='gd_ip_time_idx'),
+            models.Index(fields=['created_at', 'id'], name='gd_created_id_idx'),  # Default list ordering / cursor pagination
+            models.Index(fields=['game_mode', 'game_level'], name='gd_mode_level_idx'),  # Mode/level filters and completion stats
+            models.Index(fields=['game_level', 'game_mode'], name='gd_level_mode_idx'),  # Level filters and ranges without a mode
+            models.Index(fields=['player_id', 'event_at'], name='gd_player_time_idx'),  # Per-player filters, player stats rebuild
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        # Incremented in the database, so concurrent saves can't hand out the same version
+        self.version = models.F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version', 'updated_at'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
+
+class GameDataHourlyRollup(models.Model):
+    """Event counts per hour and per (event_type, event_category, game_mode, game_level)"""
+    bucket = models.DateTimeField()  # event_at truncated to the hour
+    event_type = models.CharField(max_length=255)
+    event_category = models.CharField(max_length=255)
+    game_mode = models.CharField(max_length=255)
+    game_level = models.IntegerField()
+    event_count = models.BigIntegerField(default=0)
+    retry_total = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves bucket range scans, since bucket leads the index
+            models.UniqueConstraint(
+                fields=['bucket', 'event_type', 'event_category', 'game_mode', 'game_level'],
+                name='gd_hourly_rollup_key',
+            ),
         ]
+
+
+class GameSessionLevelRollup(models.Model):
+    """Per-session summary for each (game_mode, game_level) the session played"""
+    session_id = models.CharField(max_length=255)
+    game_mode = models.CharField(max_length=255)
+    game_level = models.IntegerField()
+    player_id = models.CharField(max_length=255, blank=True, default="")
+    first_event_at = models.DateTimeField()
+    last_event_at = models.DateTimeField()
+    event_count = models.BigIntegerField(default=0)
+    retry_total = models.BigIntegerField(default=0)
+    completed = models.BooleanField(default=False)  # Logged GAME_DATA_COMPLETION_EVENT at this level
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session_id', 'game_mode', 'game_level'],
+                name='gd_session_level_rollup_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['game_mode', 'game_level'], name='gd_sl_rollup_mode_level_idx'),
+        ]
+
+
+class PlayerStats(models.Model):
+    """Per-player totals for each game_mode, kept up to date on ingest (see rollups.py)"""
+    player_id = models.CharField(max_length=255)
+    game_mode = models.CharField(max_length=255)
+    highest_level = models.IntegerField()
+    sessions_played = models.BigIntegerField(default=0)
+    event_count = models.BigIntegerField(default=0)
+    colors_expected = models.BigIntegerField(default=0)  # Colours in the game sequences
+    colors_correct = models.BigIntegerField(default=0)  # Of those, input at the right position
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['player_id', 'game_mode'], name='player_stats_key'),
+        ]
+        indexes = [
+            # Top-N per mode is a range scan of this index; it leaves out the columns
+            # every event updates, so ingest rarely has to touch it
+            models.Index(fields=['game_mode', '-highest_level', 'player_id'], name='player_stats_leaderboard_idx'),
+        ]
+
+    @property
+    def accuracy(self):
+        return round(self.colors_correct / self.colors_expected, 4) if self.colors_expected else None
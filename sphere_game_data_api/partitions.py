@@ -0,0 +1,258 @@
+import datetime
+import re
+
+from django.conf import settings
+from django.db import transaction
+
+PARTITION_KEY = 'event_at'
+
+
+def partitioning_enabled():
+    return getattr(settings, 'GAME_DATA_PARTITIONED', False)
+
+
+def month_start(value):
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def partition_month(table, name):
+    # Inverse of partition_name(); None for the default partition or foreign tables
+    match = re.fullmatch(re.escape(table) + r'_p(\d{4})(\d{2})', name)
+    if match is None:
+        return None
+    return datetime.datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=datetime.timezone.utc)
+
+
+def is_partitioned(connection, table):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [table])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def list_partitions(connection, table):
+    """{month: partition name} of the monthly partitions attached to `table`"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            ''',
+            [table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        month = partition_month(table, name)
+        if month is not None:
+            months[month] = name
+    return months
+
+
+def event_id_ledger_name(table):
+    return f'{table}_event_ids'
+
+
+def add_event_id_ledger(connection, table):
+    """
+    Keep event_id unique across all partitions. PostgreSQL only enforces unique
+    indexes that include the partition key, so on the partitioned table the
+    unique index is on (event_id, event_at) and a replay with another event_at
+    would get in. A plain (non-partitioned) ledger table with event_id as its
+    primary key is kept in step by a row trigger on the partitioned table: an
+    insert of a stored event_id fails on the ledger with an IntegrityError, as
+    it did on the unpartitioned table. Costs one extra index insert per event.
+    Idempotent; event_ids already stored more than once (possible before the
+    ledger existed) are kept, but no further copies can be added.
+    """
+    qn = connection.ops.quote_name
+    ledger = event_id_ledger_name(table)
+    function, trigger = f'{ledger}_sync', f'{ledger}_trigger'
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {qn(ledger)} (event_id uuid PRIMARY KEY)')
+        cursor.execute(
+            f'INSERT INTO {qn(ledger)} (event_id) SELECT DISTINCT event_id FROM {qn(table)} '
+            f'WHERE event_id IS NOT NULL ON CONFLICT DO NOTHING'
+        )
+        cursor.execute(
+            f'''
+            CREATE OR REPLACE FUNCTION {qn(function)}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    IF NEW.event_id IS NOT NULL THEN
+                        INSERT INTO {qn(ledger)} (event_id) VALUES (NEW.event_id);
+                    END IF;
+                ELSIF TG_OP = 'DELETE' THEN
+                    IF OLD.event_id IS NOT NULL THEN
+                        DELETE FROM {qn(ledger)} WHERE event_id = OLD.event_id;
+                    END IF;
+                ELSIF NEW.event_id IS DISTINCT FROM OLD.event_id THEN
+                    IF OLD.event_id IS NOT NULL THEN
+                        DELETE FROM {qn(ledger)} WHERE event_id = OLD.event_id;
+                    END IF;
+                    IF NEW.event_id IS NOT NULL THEN
+                        INSERT INTO {qn(ledger)} (event_id) VALUES (NEW.event_id);
+                    END IF;
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            '''
+        )
+        cursor.execute(f'DROP TRIGGER IF EXISTS {qn(trigger)} ON {qn(table)}')
+        cursor.execute(
+            f'CREATE TRIGGER {qn(trigger)} AFTER INSERT OR DELETE OR UPDATE OF event_id ON {qn(table)} '
+            f'FOR EACH ROW EXECUTE FUNCTION {qn(function)}()'
+        )
+
+
+def _forget_event_ids(cursor, qn, table, source):
+    # Rows that leave the table without a DELETE through it (detach, or a move between partitions)
+    cursor.execute(
+        f'DELETE FROM {qn(event_id_ledger_name(table))} WHERE event_id IN '
+        f'(SELECT event_id FROM {qn(source)} WHERE event_id IS NOT NULL)'
+    )
+
+
+def _bound(value):
+    return f"'{value:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def create_partition(connection, table, month):
+    """
+    Attach the partition for `month`. Rows already routed to the default
+    partition for that month are moved into it. Returns False if it exists.
+    """
+    if month in list_partitions(connection, table):
+        return False
+    qn = connection.ops.quote_name
+    name, default = partition_name(table, month), default_partition_name(table)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    in_range = f'{PARTITION_KEY} >= {lower} AND {PARTITION_KEY} < {upper}'
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE {in_range})')
+        moving = cursor.fetchone()[0]
+        if moving:
+            # A new partition may not overlap rows in the default one
+            cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(default)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM ({lower}) TO ({upper})'
+        )
+        if moving:
+            moved = f'{name}_moving'
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {qn(moved)} ON COMMIT DROP AS SELECT * FROM {qn(default)} WHERE {in_range}'
+            )
+            cursor.execute(f'DELETE FROM {qn(default)} WHERE {in_range}')
+            # Re-inserting the rows through the parent adds their event_ids to the ledger again
+            _forget_event_ids(cursor, qn, table, moved)
+            cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(moved)}')
+            cursor.execute(f'DROP TABLE {qn(moved)}')
+            cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(default)} DEFAULT')
+    return True
+
+
+def ensure_partitions(connection, table, first_month, last_month):
+    """Create the monthly partitions from first_month to last_month; returns the ones created"""
+    created = []
+    month = first_month
+    while month <= last_month:
+        if create_partition(connection, table, month):
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(connection, table, before_month, drop=False):
+    """
+    Detach the monthly partitions that end on or before `before_month`. Detached
+    partitions stay around as ordinary tables (e.g. for archiving) unless `drop`.
+    Returns the names of the partitions detached.
+    """
+    qn = connection.ops.quote_name
+    detached = []
+    for month, name in sorted(list_partitions(connection, table).items()):
+        if add_months(month, 1) > before_month:
+            continue
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+            # The detached events are gone from the table; their event_ids may be ingested again
+            _forget_event_ids(cursor, qn, table, name)
+            if drop:
+                cursor.execute(f'DROP TABLE {qn(name)}')
+        detached.append(name)
+    return detached
+
+
+def partition_table(connection, table, months_back=24, months_ahead=3):
+    """
+    Turn `table` into a table range-partitioned by month on event_at, in one
+    transaction (the table is locked while rows are copied):
+    - Monthly partitions from the oldest row (at most `months_back` months ago)
+      to `months_ahead` months from now, plus a default partition for the rest
+    - The primary key becomes (id, event_at) and unique indexes get event_at
+      appended, since PostgreSQL requires the partition key in both. On its own
+      that would make event_id unique only per event_at, so event_id uniqueness
+      moves to a ledger table (see add_event_id_ledger)
+    - id keeps counting from the current maximum
+    """
+    qn = connection.ops.quote_name
+    legacy = f'{table}_unpartitioned'
+    sequence = f'{table}_pk_seq'
+    now = month_start(datetime.datetime.now(datetime.timezone.utc))
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT pg_get_indexdef(pg_index.indexrelid), pg_index.indisunique
+            FROM pg_index
+            WHERE pg_index.indrelid = to_regclass(%s) AND NOT pg_index.indisprimary
+            ''',
+            [table]
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(f'SELECT MIN({PARTITION_KEY}), MAX(id) FROM {qn(table)}')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ({PARTITION_KEY})'
+        )
+        # Identity columns aren't supported on partitioned tables before PostgreSQL 17
+        cursor.execute(f'CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id')
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute('SELECT setval(%s, %s, %s)', [sequence, max_id or 1, max_id is not None])
+
+        cursor.execute(f'CREATE TABLE {qn(default_partition_name(table))} PARTITION OF {qn(table)} DEFAULT')
+        first_month = now if oldest is None else max(month_start(oldest), add_months(now, -months_back))
+        ensure_partitions(connection, table, min(first_month, now), add_months(now, months_ahead))
+
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}')
+        cursor.execute(f'DROP TABLE {qn(legacy)}')
+
+        # Built after the copy, on the parent (and so on every partition), under the original names
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, {PARTITION_KEY})')
+        for definition, unique in indexes:
+            if unique and not re.search(rf'\b{PARTITION_KEY}\b', definition):
+                definition = re.sub(r'\)$', f', {PARTITION_KEY})', definition)
+            cursor.execute(definition)
+        add_event_id_ledger(connection, table)
@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -15,3 +18,17 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         
         # For all other methods, require admin authentication
         return request.user and request.user.is_authenticated and request.user.is_staff
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """
+    Lets a scraper in with `Authorization: Bearer <METRICS_TOKEN>`; never matches
+    while METRICS_TOKEN is unset
+    """
+
+    def has_permission(self, request, view):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if not token:
+            return False
+        keyword, _, value = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        return keyword == 'Bearer' and hmac.compare_digest(value.encode(), token.encode())
@@ -0,0 +1,231 @@
+import logging
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Queries of the code being inspected; None (the default) keeps the wrapper a no-op
+current_inspection = ContextVar('game_data_query_inspection', default=None)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES\s*(?:\((?:[^()]|\([^()]*\))*\)\s*,?\s*)+', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def inspector_enabled():
+    return getattr(settings, 'GAME_DATA_QUERY_INSPECTOR', False)
+
+
+def query_shape(sql):
+    """`sql` with literals and IN/VALUES lists collapsed, so an N+1 loop maps to one shape"""
+    shape = _IN_LIST.sub('IN (...)', sql)
+    shape = _VALUES_LIST.sub('VALUES (...) ', shape)
+    shape = _STRING.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    return ' '.join(shape.split())
+
+
+def caller_stack():
+    """Frames of this project's code (not Django or tests' plumbing) that led to the query"""
+    return [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(PACKAGE_DIR) and frame.filename != _THIS_FILE
+    ]
+
+
+def format_stack(stack):
+    return '\n'.join(
+        f'  {os.path.relpath(frame.filename, os.path.dirname(PACKAGE_DIR))}:{frame.lineno} in {frame.name}'
+        for frame in stack
+    )
+
+
+class QueryRecord:
+    __slots__ = ('alias', 'sql', 'duration', 'stack')
+
+    def __init__(self, alias, sql, duration, stack):
+        self.alias = alias
+        self.sql = sql
+        self.duration = duration
+        self.stack = stack
+
+
+class QueryInspection:
+    """Queries run while an inspection is current, with their duration and call stack"""
+
+    def __init__(self):
+        self.queries = []
+
+    def issues(self, budget=None, slow_ms=None, duplicate_threshold=None):
+        """
+        Problems in the recorded queries, worst first. Each issue is a dict with:
+        - kind: 'budget' (more queries than `budget`), 'duplicate' (the same SELECT
+          shape run `duplicate_threshold` times or more: an N+1) or 'slow' (slower
+          than `slow_ms`)
+        - message, and the sql and stack of the query it points at
+        Limits default to the GAME_DATA_QUERY_* settings.
+        """
+        if budget is None:
+            budget = getattr(settings, 'GAME_DATA_QUERY_BUDGET', 20)
+        if slow_ms is None:
+            slow_ms = getattr(settings, 'GAME_DATA_SLOW_QUERY_MS', 100)
+        if duplicate_threshold is None:
+            duplicate_threshold = getattr(settings, 'GAME_DATA_DUPLICATE_QUERY_THRESHOLD', 3)
+
+        issues = []
+        if len(self.queries) > budget:
+            issues.append({
+                'kind': 'budget',
+                'message': f'{len(self.queries)} queries, over the budget of {budget}',
+                'sql': None,
+                'stack': [],
+            })
+
+        shapes = Counter()
+        first = {}
+        for query in self.queries:
+            if query.sql.lstrip()[:6].upper() != 'SELECT':
+                continue
+            shape = query_shape(query.sql)
+            shapes[shape] += 1
+            first.setdefault(shape, query)
+        for shape, count in shapes.most_common():
+            if count < duplicate_threshold:
+                break
+            issues.append({
+                'kind': 'duplicate',
+                'message': f'Same query run {count} times (N+1?)',
+                'sql': shape,
+                'stack': first[shape].stack,
+            })
+
+        for query in sorted(self.queries, key=lambda query: -query.duration):
+            if query.duration * 1000 < slow_ms:
+                break
+            issues.append({
+                'kind': 'slow',
+                'message': f'Query took {query.duration * 1000:.1f} ms (over {slow_ms} ms)',
+                'sql': query.sql,
+                'stack': query.stack,
+            })
+        return issues
+
+
+def format_issues(issues):
+    blocks = []
+    for issue in issues:
+        lines = [f"[{issue['kind']}] {issue['message']}"]
+        if issue['sql']:
+            lines.append(f"  {issue['sql']}")
+        if issue['stack']:
+            lines.append(format_stack(issue['stack']))
+        blocks.append('\n'.join(lines))
+    return '\n'.join(blocks)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper recording each query for the current inspection, if any"""
+    inspection = current_inspection.get()
+    if inspection is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        inspection.queries.append(
+            QueryRecord(context['connection'].alias, sql, time.perf_counter() - started, caller_stack())
+        )
+
+
+def install_query_recorder(connection):
+    # Like instrumentation.install_query_timer: once per connection, see signals.py
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def inspect_queries():
+    """Record the queries run inside the block: `with inspect_queries() as inspection: ...`"""
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+    inspection = QueryInspection()
+    token = current_inspection.set(inspection)
+    try:
+        yield inspection
+    finally:
+        current_inspection.reset(token)
+
+
+class QueryInspectorMiddleware:
+    """
+    Opt-in (GAME_DATA_QUERY_INSPECTOR) runtime guard for tests and staging: logs a
+    warning for every request that goes over the query budget, repeats a query
+    shape (N+1) or runs a slow query, with the stack in this project's code.
+    Queries run while a streamed body (exports) is consumed are not covered.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not inspector_enabled():
+            return self.get_response(request)
+        with inspect_queries() as inspection:
+            response = self.get_response(request)
+        self.report(request, inspection)
+        return response
+
+    async def __acall__(self, request):
+        if not inspector_enabled():
+            return await self.get_response(request)
+        with inspect_queries() as inspection:
+            response = await self.get_response(request)
+        self.report(request, inspection)
+        return response
+
+    def report(self, request, inspection):
+        issues = inspection.issues()
+        if issues:
+            logger.warning(f"Query issues in {request.method} {request.path}:\n{format_issues(issues)}")
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin for query budgets per endpoint:
+
+        with self.assertQueryBudget(3):
+            self.client.get(url)
+
+    Fails on more than `max_queries` queries or on a repeated query shape (N+1),
+    listing the queries and where in this project's code they were run.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, duplicate_threshold=None):
+        with inspect_queries() as inspection:
+            yield inspection
+        issues = inspection.issues(
+            budget=max_queries, slow_ms=float('inf'), duplicate_threshold=duplicate_threshold
+        )
+        if issues:
+            queries = '\n'.join(f'  {index}. {query.sql}' for index, query in enumerate(inspection.queries, 1))
+            self.fail(f'{format_issues(issues)}\nQueries:\n{queries}')
@@ -0,0 +1,159 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from sphere_game_data_api.instrumentation import timed_serialization
+from sphere_game_data_api.serializers import GameDataSerializer
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder produces the same bytes, just slower
+    orjson = None
+
+READ_FIELDS = tuple(GameDataSerializer.Meta.fields)
+JSON_FIELDS = tuple(
+    name for name, field in GameDataSerializer().fields.items() if isinstance(field, serializers.JSONField)
+)
+
+# Serializer fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.IPAddressField,
+    serializers.JSONField,
+)
+
+def output_timezone():
+    # The timezone DRF's DateTimeField renders in
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def format_datetime(value, tz):
+    # Same representation as the DRF DateTimeField used by GameDataSerializer
+    if tz is not None and value.tzinfo is not None:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def compile_row_function(serializer_class):
+    """
+    Build `to_row(values, tz)`, which turns a values_list() tuple in serializer
+    field order into the dict the serializer's to_representation() returns, as
+    one generated dict literal instead of a loop over field objects. `tz` is
+    output_timezone(), looked up once per response rather than per value.
+    Raises ImproperlyConfigured for fields it can't reproduce exactly.
+    """
+    entries = []
+    for index, (name, field) in enumerate(serializer_class().fields.items()):
+        value = f'row[{index}]'
+        if field.source != name:
+            raise ImproperlyConfigured(f'{serializer_class.__name__}.{name}: sourced fields are not supported')
+        if type(field) is serializers.DateTimeField:
+            if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() != ISO_8601 or hasattr(field, 'timezone'):
+                raise ImproperlyConfigured(f'{serializer_class.__name__}.{name}: only ISO 8601 datetimes are supported')
+            entries.append(f'{name!r}: None if {value} is None else format_datetime({value}, tz)')
+        elif type(field) is serializers.UUIDField and field.uuid_format == 'hex_verbose':
+            entries.append(f'{name!r}: None if {value} is None else str({value})')
+        elif type(field) in PASSTHROUGH_FIELDS and not getattr(field, 'binary', False):
+            entries.append(f'{name!r}: {value}')
+        else:
+            raise ImproperlyConfigured(f'{serializer_class.__name__}.{name}: {type(field).__name__} is not supported')
+
+    source = 'def to_row(row, tz):\n    return {\n' + ''.join(f'        {entry},\n' for entry in entries) + '    }\n'
+    namespace = {'format_datetime': format_datetime}
+    exec(compile(source, f'<{serializer_class.__name__} row>', 'exec'), namespace)
+    return namespace['to_row']
+
+
+to_row = compile_row_function(GameDataSerializer)
+
+
+def fast_reads_enabled(request=None):
+    if not getattr(settings, 'GAME_DATA_FAST_READS', True):
+        return False
+    # ?indent / Accept: application/json; indent=4 need DRF's renderer
+    return request is None or 'indent' not in (request.accepted_media_type or '')
+
+
+def _orjson_safe(value):
+    # orjson writes some floats differently (1e16 vs 1e+16); ints beyond 64 bits make it raise
+    kind = type(value)
+    if kind is str or kind is int or kind is bool or value is None:
+        return True
+    if kind is list:
+        return all(type(item) is str or _orjson_safe(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and _orjson_safe(item) for key, item in value.items())
+    return False
+
+
+def render_json(data, rows=()):
+    """
+    Render `data` to the exact bytes JSONRenderer would produce (compact, UTF-8,
+    strict), using orjson when it is installed and every value in `rows` (the
+    dicts from to_row) is one it encodes identically.
+    """
+    if orjson is not None and all(_orjson_safe(row[field]) for row in rows for field in JSON_FIELDS):
+        try:
+            content = orjson.dumps(data)
+        except TypeError:  # Ints beyond 64 bits, or lone surrogates
+            content = None
+        if content is not None:
+            return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    content = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+def render_page(next_link, previous_link, rows):
+    """Body of a cursor-paginated list response, from values_list() rows"""
+    with timed_serialization():
+        tz = output_timezone()
+        results = [to_row(row, tz) for row in rows]
+        return render_json({'next': next_link, 'previous': previous_link, 'results': results}, results)
+
+
+def render_object(row):
+    """Body of a single-object response, from one values_list() row"""
+    with timed_serialization():
+        data = to_row(row, output_timezone())
+        return render_json(data, (data,))
+
+
+def render_instance(instance):
+    """Body of a single-object response, from a GameData instance (e.g. one just created)"""
+    return render_object(tuple(getattr(instance, field) for field in READ_FIELDS))
+
+
+class PreRenderedResponse(Response):
+    """
+    Response with a body rendered up front (see render_page / render_object).
+    `.data` is only decoded from the body when something asks for it.
+    """
+
+    def __init__(self, content, status=None, headers=None):
+        self.content_bytes = content
+        super().__init__(None, status=status, headers=headers)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.content_bytes)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        self['Content-Type'] = 'application/json'
+        return self.content_bytes
@@ -0,0 +1,81 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+VERSION_KEY = 'game-data:version'
+
+# Backends whose entries live in one process (or nowhere): each worker would
+# keep its own data version, and serve pages another worker has invalidated
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def response_cache_alias():
+    return getattr(settings, 'GAME_DATA_RESPONSE_CACHE_ALIAS', 'default')
+
+
+def get_response_cache():
+    return caches[response_cache_alias()]
+
+
+def response_cache_timeout():
+    return getattr(settings, 'GAME_DATA_RESPONSE_CACHE_TIMEOUT', 0)
+
+
+def response_cache_is_shared():
+    backend = settings.CACHES.get(response_cache_alias(), {}).get('BACKEND')
+    return backend is not None and backend not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def data_version():
+    """
+    (token, modified_at) of the current game data version. Every cached list
+    response is tied to a version, so bumping it invalidates all of them at once.
+    """
+    cache = get_response_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, (uuid.uuid4().hex, time.time()), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """
+    Start a new version right away and again once the current transaction has
+    committed, so a reader can't keep pre-commit rows cached under the new version
+    """
+    def bump():
+        get_response_cache().set(VERSION_KEY, (uuid.uuid4().hex, time.time()), None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def row_etag(pk, version):
+    """Strong ETag of one row: its identity plus its version"""
+    return f'"{pk}-{version}"'
+
+
+def page_etag(rows, *links):
+    """Strong ETag of a page: the identity and version of every row, plus its links"""
+    state = repr(([(row.id, row.version) for row in rows], links))
+    return f'"{hashlib.sha256(state.encode()).hexdigest()[:32]}"'
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Clients revalidate every time; the response differs per credentials
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
@@ -0,0 +1,351 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from sphere_game_data_api.models import GameData, GameDataHourlyRollup, GameSessionLevelRollup, PlayerStats
+from sphere_game_data_api.pagination import keyset_values
+
+
+def rollups_enabled():
+    return getattr(settings, 'GAME_DATA_ROLLUPS_ENABLED', True)
+
+
+def completion_event():
+    return getattr(settings, 'GAME_DATA_COMPLETION_EVENT', 'level_complete')
+
+
+def hour_bucket(value):
+    # Same bucket as Trunc('event_at', 'hour') in the current timezone
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def score_input(sequence, player_input):
+    """(colours in the sequence, colours the player input at the right position)"""
+    if not isinstance(sequence, list) or not isinstance(player_input, list):
+        return 0, 0
+    return len(sequence), sum(1 for expected, given in zip(sequence, player_input) if expected == given)
+
+
+SESSION_COLUMNS = ('player_id', 'first_event_at', 'last_event_at', 'event_count', 'retry_total', 'completed')
+PLAYER_COLUMNS = ('highest_level', 'sessions_played', 'event_count', 'colors_expected', 'colors_correct', 'last_seen')
+
+
+def _sort_key(item):
+    # Rollup keys in one total order, so concurrent writers lock rows in the same order; None sorts last
+    return tuple((value is None, value) for value in item[0])
+
+
+def _added(table, column):
+    return f'{column} = {table}.{column} + EXCLUDED.{column}'
+
+
+def _greatest(table, column):
+    return f'{column} = CASE WHEN EXCLUDED.{column} > {table}.{column} THEN EXCLUDED.{column} ELSE {table}.{column} END'
+
+
+def _least(table, column):
+    return f'{column} = CASE WHEN EXCLUDED.{column} < {table}.{column} THEN EXCLUDED.{column} ELSE {table}.{column} END'
+
+
+def _known_player(table, column):
+    # A session's player_id is kept once known
+    return f"{column} = CASE WHEN EXCLUDED.{column} <> '' THEN EXCLUDED.{column} ELSE {table}.{column} END"
+
+
+def _either(table, column):
+    return f'{column} = {table}.{column} OR EXCLUDED.{column}'
+
+
+def _bulk_upsert(model, key_columns, value_columns, rows, merge):
+    """
+    Write `rows` ((key tuple, values tuple), in key order) to `model` with
+    multi-row INSERT ... ON CONFLICT (key) DO UPDATE statements (PostgreSQL,
+    SQLite 3.24+), as few as the database's parameter limit allows. `merge(table,
+    column)` gives each value column's SET clause. Rows are locked in the order
+    given, which callers keep sorted so concurrent batches can't deadlock.
+    """
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = (*key_columns, *value_columns)
+    fields = [model._meta.get_field(column) for column in columns]
+    sets = ', '.join(merge[column](table, qn(column)) for column in value_columns)
+    sql = (
+        f'INSERT INTO {table} ({", ".join(qn(column) for column in columns)}) VALUES {{values}} '
+        f'ON CONFLICT ({", ".join(qn(column) for column in key_columns)}) DO UPDATE SET {sets}'
+    )
+    row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    batch_size = min(
+        connection.ops.bulk_batch_size(fields, rows),
+        getattr(settings, 'GAME_DATA_BULK_CREATE_BATCH_SIZE', 500),
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = [
+                field.get_db_prep_save(value, connection)
+                for key, values in batch
+                for field, value in zip(fields, (*key, *values))
+            ]
+            cursor.execute(sql.format(values=', '.join([row_sql] * len(batch))), params)
+
+
+def record_game_data(instances):
+    """
+    Fold newly inserted GameData rows into the rollup tables and PlayerStats.
+    Events are grouped in memory first, then each table is written with a few
+    multi-row upserts, in key order. A session counts towards sessions_played the
+    first time it is seen for a player and mode; two requests carrying a session's
+    first events at the same moment can both count it, which rebuild_player_stats
+    corrects.
+    """
+    if not rollups_enabled() or not instances:
+        return
+
+    completed_type = completion_event()
+    hourly = defaultdict(lambda: {'event_count': 0, 'retry_total': 0})
+    sessions = {}
+    players = {}
+
+    for instance in instances:
+        hourly_key = (
+            hour_bucket(instance.event_at),
+            instance.event_type,
+            instance.event_category,
+            instance.game_mode,
+            instance.game_level,
+        )
+        hourly[hourly_key]['event_count'] += 1
+        hourly[hourly_key]['retry_total'] += instance.retry_count
+
+        session_key = (instance.session_id, instance.game_mode, instance.game_level)
+        summary = sessions.get(session_key)
+        if summary is None:
+            summary = sessions[session_key] = {
+                'player_id': instance.player_id,
+                'first_event_at': instance.event_at,
+                'last_event_at': instance.event_at,
+                'event_count': 0,
+                'retry_total': 0,
+                'completed': False,
+            }
+        summary['player_id'] = summary['player_id'] or instance.player_id
+        summary['first_event_at'] = min(summary['first_event_at'], instance.event_at)
+        summary['last_event_at'] = max(summary['last_event_at'], instance.event_at)
+        summary['event_count'] += 1
+        summary['retry_total'] += instance.retry_count
+        summary['completed'] = summary['completed'] or instance.event_type == completed_type
+
+        if instance.player_id:
+            player_key = (instance.player_id, instance.game_mode)
+            totals = players.get(player_key)
+            if totals is None:
+                totals = players[player_key] = {
+                    'highest_level': instance.game_level,
+                    'sessions': set(),
+                    'event_count': 0,
+                    'colors_expected': 0,
+                    'colors_correct': 0,
+                    'last_seen': instance.event_at,
+                }
+            expected, correct = score_input(instance.game_sequence, instance.game_player_input)
+            totals['highest_level'] = max(totals['highest_level'], instance.game_level)
+            totals['sessions'].add(instance.session_id)
+            totals['event_count'] += 1
+            totals['colors_expected'] += expected
+            totals['colors_correct'] += correct
+            totals['last_seen'] = max(totals['last_seen'], instance.event_at)
+
+    with transaction.atomic():
+        # Looked up before the session rows below are written: a session is new to a
+        # player if none of its rows was stored for them before this batch
+        new_sessions = _new_player_sessions(players) if players else {}
+
+        _bulk_upsert(
+            GameDataHourlyRollup,
+            ('bucket', 'event_type', 'event_category', 'game_mode', 'game_level'),
+            ('event_count', 'retry_total'),
+            [(key, (totals['event_count'], totals['retry_total'])) for key, totals in sorted(hourly.items(), key=_sort_key)],
+            {'event_count': _added, 'retry_total': _added},
+        )
+        _bulk_upsert(
+            GameSessionLevelRollup,
+            ('session_id', 'game_mode', 'game_level'),
+            SESSION_COLUMNS,
+            [
+                (key, tuple(summary[column] for column in SESSION_COLUMNS))
+                for key, summary in sorted(sessions.items(), key=_sort_key)
+            ],
+            {
+                'player_id': _known_player,
+                'first_event_at': _least,
+                'last_event_at': _greatest,
+                'event_count': _added,
+                'retry_total': _added,
+                'completed': _either,
+            },
+        )
+        _bulk_upsert(
+            PlayerStats,
+            ('player_id', 'game_mode'),
+            PLAYER_COLUMNS,
+            [
+                (key, (
+                    totals['highest_level'],
+                    new_sessions.get(key, 0),
+                    totals['event_count'],
+                    totals['colors_expected'],
+                    totals['colors_correct'],
+                    totals['last_seen'],
+                ))
+                for key, totals in sorted(players.items(), key=_sort_key)
+            ],
+            {
+                'highest_level': _greatest,
+                'sessions_played': _added,
+                'event_count': _added,
+                'colors_expected': _added,
+                'colors_correct': _added,
+                'last_seen': _greatest,
+            },
+        )
+
+
+def _new_player_sessions(players):
+    """{(player_id, game_mode): sessions in `players` with no session level row for that player yet}"""
+    candidates = {
+        (player_id, game_mode, session_id)
+        for (player_id, game_mode), totals in players.items()
+        for session_id in totals['sessions']
+    }
+    candidates -= set(
+        GameSessionLevelRollup.objects.filter(
+            session_id__in={session_id for _, _, session_id in candidates},
+            game_mode__in={game_mode for _, game_mode, _ in candidates},
+            player_id__in={player_id for player_id, _, _ in candidates},
+        ).values_list('player_id', 'game_mode', 'session_id')
+    )
+    new_sessions = defaultdict(int)
+    for player_id, game_mode, _ in candidates:
+        new_sessions[player_id, game_mode] += 1
+    return new_sessions
+
+
+def rebuild_rollups(chunk_size=2000):
+    """
+    Recompute every rollup row from GameData, inside one transaction so readers
+    never see half-built tables. Returns (hourly rows, session level rows).
+    """
+    completed_type = completion_event()
+    hourly_rows = (
+        GameData.objects.annotate(bucket=Trunc('event_at', 'hour'))
+        .values('bucket', 'event_type', 'event_category', 'game_mode', 'game_level')
+        .annotate(event_count=Count('id'), retry_total=Sum('retry_count'))
+        .order_by()
+    )
+    session_rows = (
+        GameData.objects.values('session_id', 'game_mode', 'game_level')
+        .annotate(
+            player=Max('player_id'),
+            first_event_at=Min('event_at'),
+            last_event_at=Max('event_at'),
+            event_count=Count('id'),
+            retry_total=Sum('retry_count'),
+            completions=Count('id', filter=Q(event_type=completed_type)),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        GameDataHourlyRollup.objects.all().delete()
+        GameSessionLevelRollup.objects.all().delete()
+
+        hourly_count = _bulk_insert(
+            GameDataHourlyRollup,
+            (GameDataHourlyRollup(**row) for row in hourly_rows.iterator(chunk_size=chunk_size)),
+            chunk_size,
+        )
+        session_count = _bulk_insert(
+            GameSessionLevelRollup,
+            (
+                GameSessionLevelRollup(
+                    session_id=row['session_id'],
+                    game_mode=row['game_mode'],
+                    game_level=row['game_level'],
+                    player_id=row['player'],
+                    first_event_at=row['first_event_at'],
+                    last_event_at=row['last_event_at'],
+                    event_count=row['event_count'],
+                    retry_total=row['retry_total'],
+                    completed=row['completions'] > 0,
+                )
+                for row in session_rows.iterator(chunk_size=chunk_size)
+            ),
+            chunk_size,
+        )
+    return hourly_count, session_count
+
+
+def rebuild_player_stats(chunk_size=2000):
+    """
+    Recompute PlayerStats from GameData in one pass over the events with a
+    player_id, in (player_id, game_mode) order, inside one transaction.
+    Events already archived out of GameData are no longer counted.
+    Returns the number of PlayerStats rows.
+    """
+    rows = keyset_values(
+        GameData.objects.exclude(player_id='').order_by('player_id', 'game_mode', 'id'),
+        ('player_id', 'game_mode', 'session_id', 'game_level', 'event_at', 'game_sequence', 'game_player_input'),
+        chunk_size,
+    )
+
+    def player_stats():
+        current, stats, sessions = None, None, set()
+        for player_id, game_mode, session_id, game_level, event_at, sequence, player_input in rows:
+            if (player_id, game_mode) != current:
+                if stats is not None:
+                    stats.sessions_played = len(sessions)
+                    yield stats
+                current, sessions = (player_id, game_mode), set()
+                stats = PlayerStats(player_id=player_id, game_mode=game_mode, highest_level=game_level, last_seen=event_at)
+            expected, correct = score_input(sequence, player_input)
+            stats.highest_level = max(stats.highest_level, game_level)
+            stats.event_count += 1
+            stats.colors_expected += expected
+            stats.colors_correct += correct
+            stats.last_seen = max(stats.last_seen, event_at)
+            sessions.add(session_id)
+        if stats is not None:
+            stats.sessions_played = len(sessions)
+            yield stats
+
+    with transaction.atomic():
+        PlayerStats.objects.all().delete()
+        return _bulk_insert(PlayerStats, player_stats(), chunk_size)
+
+
+def leaderboard(game_mode, limit):
+    """Top `limit` players of a mode by highest level, read off player_stats_leaderboard_idx"""
+    return PlayerStats.objects.filter(game_mode=game_mode).order_by('-highest_level', 'player_id')[:limit]
+
+
+def _bulk_insert(model, instances, chunk_size):
+    count = 0
+    chunk = []
+    for instance in instances:
+        chunk.append(instance)
+        if len(chunk) >= chunk_size:
+            model.objects.bulk_create(chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        model.objects.bulk_create(chunk)
+        count += len(chunk)
+    return count
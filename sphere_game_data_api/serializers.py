@@ -1,7 +1,14 @@
 from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.validators import UniqueValidator
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 
-from sphere_game_data_api.models import GameData
+from sphere_game_data_api.fields import ColorListField
+from sphere_game_data_api.ingest import insert_game_data_batch
+from sphere_game_data_api.ingest_validation import compile_event_validator, fast_validation_enabled
+from sphere_game_data_api.models import GameData, PlayerStats
+from sphere_game_data_api.rollups import record_game_data
 
 
 class LoginSerializer(serializers.Serializer):
@@ -19,9 +26,55 @@ class LogoutSerializer(serializers.Serializer):
     pass
 
 
+class GameDataListSerializer(serializers.ListSerializer):
+    """
+    List serializer used for batch ingestion:
+    - Each item is validated on its own, so one bad event doesn't reject the batch
+    - Per-item errors are collected in `item_errors` as {"index", "errors"}
+    - Valid items are written with a single bulk_create inside one transaction
+    - Items whose event_id is already stored resolve to the original row; the number
+      of rows actually inserted is kept in `created_count`
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError(
+                {'non_field_errors': ['Expected a list of items.']}, code='not_a_list'
+            )
+        if not data and not self.allow_empty:
+            raise serializers.ValidationError(
+                {'non_field_errors': ['This list may not be empty.']}, code='empty'
+            )
+        if self.max_length is not None and len(data) > self.max_length:
+            raise serializers.ValidationError(
+                {'non_field_errors': [f'Ensure this field has no more than {self.max_length} elements.']},
+                code='max_length'
+            )
+
+        valid_items = []
+        self.item_errors = []
+        for index, item in enumerate(data):
+            try:
+                valid_items.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.item_errors.append({'index': index, 'errors': exc.detail})
+        return valid_items
+
+    def create(self, validated_data):
+        rows, self.created_count = insert_game_data_batch([GameData(**attrs) for attrs in validated_data])
+        return rows
+
+
 class GameDataSerializer(serializers.ModelSerializer):
+    # Colour lists are stored packed (ColorListField) but read and written as JSON
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        ColorListField: serializers.JSONField,
+    }
+
     class Meta:
         model = GameData
+        list_serializer_class = GameDataListSerializer
         fields = [
             "id", 
             "created_at", 
@@ -39,7 +92,8 @@ class GameDataSerializer(serializers.ModelSerializer):
             "game_sequence", 
             "game_player_input",
             "retry_count",
-            "error_messages"
+            "error_messages",
+            "event_id"
         ]
         extra_kwargs = {
             'event_at': {
@@ -91,5 +145,66 @@ class GameDataSerializer(serializers.ModelSerializer):
             },
             'error_messages': {
                 'help_text': 'Array of error messages with timestamps'
+            },
+            'event_id': {
+                'help_text': (
+                    'Client-generated UUID (optional). Resending an event with the same '
+                    'event_id returns the original row instead of inserting a duplicate'
+                ),
+                'required': False,
+                'allow_null': True,
             }
         }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is None:
+            # On create a stored event_id is a replay (see create()); updates keep the unique check
+            event_id = fields['event_id']
+            event_id.validators = [
+                validator for validator in event_id.validators if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+    def run_validation(self, data=empty):
+        # Well-formed new events skip the field stack; anything else gets its errors from it
+        if self.instance is None and not self.partial and validate_event is not None and fast_validation_enabled():
+            attrs = validate_event(data)
+            if attrs is not None:
+                return attrs
+        return super().run_validation(data)
+
+    def create(self, validated_data):
+        # `created` is False when event_id matched an already stored event
+        event_id = validated_data.get('event_id')
+        if event_id is not None:
+            existing = GameData.objects.filter(event_id=event_id).first()
+            if existing is not None:
+                self.created = False
+                return existing
+
+        try:
+            with transaction.atomic():
+                instance = GameData.objects.create(**validated_data)
+                record_game_data([instance])
+        except IntegrityError:
+            # Lost a race against a concurrent retry of the same event
+            if event_id is None:
+                raise
+            self.created = False
+            return GameData.objects.get(event_id=event_id)
+
+        self.created = True
+        return instance
+
+
+# Precompiled validation of new events (single and batch ingest), see ingest_validation
+validate_event = compile_event_validator(GameDataSerializer)
+
+
+class PlayerStatsSerializer(serializers.ModelSerializer):
+    accuracy = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = PlayerStats
+        fields = ['player_id', 'highest_level', 'sessions_played', 'event_count', 'accuracy', 'last_seen']
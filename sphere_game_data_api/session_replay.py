@@ -0,0 +1,102 @@
+from django.conf import settings
+
+from sphere_game_data_api.models import GameData
+from sphere_game_data_api.pagination import keyset_values
+from sphere_game_data_api.renderers import READ_FIELDS, format_datetime, output_timezone, render_json, to_row
+from sphere_game_data_api.rollups import score_input
+
+EVENT_AT = READ_FIELDS.index('event_at')
+EVENT_TYPE = READ_FIELDS.index('event_type')
+GAME_MODE = READ_FIELDS.index('game_mode')
+GAME_LEVEL = READ_FIELDS.index('game_level')
+GAME_SEQUENCE = READ_FIELDS.index('game_sequence')
+GAME_PLAYER_INPUT = READ_FIELDS.index('game_player_input')
+RETRY_COUNT = READ_FIELDS.index('retry_count')
+
+
+def session_events(session_id):
+    """A session's events in play order, read straight off gd_session_time_idx (session_id, event_at)"""
+    return GameData.objects.filter(session_id=session_id).order_by('event_at', 'id')
+
+
+class SessionSummary:
+    """
+    Running summary of one session, fed one values_list() row at a time:
+    - levels reached (and completed, by GAME_DATA_COMPLETION_EVENT) and game modes
+    - accuracy: colours the player input at the right position of the sequence,
+      out of every colour in the sequences, plus how many inputs matched exactly
+    - total retries and the duration from the first event to the last
+    """
+
+    def __init__(self):
+        self.completion_event = getattr(settings, 'GAME_DATA_COMPLETION_EVENT', 'level_complete')
+        self.events = 0
+        self.first_event_at = None
+        self.last_event_at = None
+        self.levels = set()
+        self.levels_completed = set()
+        self.game_modes = set()
+        self.colors_expected = 0
+        self.colors_correct = 0
+        self.sequences_matched = 0
+        self.retries = 0
+
+    def add(self, values):
+        self.events += 1
+        event_at = values[EVENT_AT]
+        if self.first_event_at is None:
+            self.first_event_at = event_at
+        self.last_event_at = event_at
+        self.levels.add(values[GAME_LEVEL])
+        if values[EVENT_TYPE] == self.completion_event:
+            self.levels_completed.add(values[GAME_LEVEL])
+        self.game_modes.add(values[GAME_MODE])
+        self.retries += values[RETRY_COUNT]
+
+        sequence, player_input = values[GAME_SEQUENCE], values[GAME_PLAYER_INPUT]
+        expected, correct = score_input(sequence, player_input)
+        self.colors_expected += expected
+        self.colors_correct += correct
+        if expected and player_input == sequence:
+            self.sequences_matched += 1
+
+    def as_dict(self):
+        tz = output_timezone()
+        return {
+            'events': self.events,
+            'started_at': format_datetime(self.first_event_at, tz),
+            'ended_at': format_datetime(self.last_event_at, tz),
+            'duration_seconds': (self.last_event_at - self.first_event_at).total_seconds(),
+            'game_modes': sorted(self.game_modes),
+            'levels_reached': sorted(self.levels),
+            'highest_level': max(self.levels),
+            'levels_completed': sorted(self.levels_completed),
+            'colors_expected': self.colors_expected,
+            'colors_correct': self.colors_correct,
+            'accuracy': round(self.colors_correct / self.colors_expected, 4) if self.colors_expected else None,
+            'sequences_matched': self.sequences_matched,
+            'total_retries': self.retries,
+        }
+
+
+def session_rows(session_id, chunk_size):
+    """values_list() rows of the session in keyset pages of `chunk_size`, so memory stays flat"""
+    return keyset_values(session_events(session_id), READ_FIELDS, chunk_size)
+
+
+def session_body(session_id, rows):
+    """
+    Stream `{"session_id", "events": [...], "summary": {...}}` in one pass over
+    `rows`: each event is rendered as it is read and folded into the summary,
+    which is written once the last event is out.
+    """
+    summary = SessionSummary()
+    tz = output_timezone()
+    yield b'{"session_id":' + render_json(session_id) + b',"events":['
+    separator = b''
+    for values in rows:
+        summary.add(values)
+        row = to_row(values, tz)
+        yield separator + render_json(row, (row,))
+        separator = b','
+    yield b'],"summary":' + render_json(summary.as_dict()) + b'}'
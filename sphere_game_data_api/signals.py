@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from sphere_game_data_api.authentication import token_cache
+from sphere_game_data_api.db_connections import connection_stats
+from sphere_game_data_api.fields import clear_color_dictionaries
+from sphere_game_data_api.instrumentation import install_query_timer
+from sphere_game_data_api.models import GameColor, GameData
+from sphere_game_data_api.query_inspector import install_query_recorder
+from sphere_game_data_api.response_cache import bump_data_version
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # Logout, or a cascade from a deleted user
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Deactivation, or a permission change such as is_staff
+    if not created:
+        token_cache.delete_user(instance.pk)
+
+
+@receiver(post_save, sender=GameData)
+@receiver(post_delete, sender=GameData)
+def invalidate_game_data_responses(sender, instance, **kwargs):
+    # Bulk inserts don't send signals; ingest.py bumps the version for those
+    bump_data_version()
+
+
+@receiver(post_save, sender=GameColor)
+def reload_color_codes(sender, instance, using, **kwargs):
+    # A colour admitted through the admin; other processes pick it up within GAME_DATA_COLOR_DICTIONARY_TTL
+    clear_color_dictionaries()
+    transaction.on_commit(clear_color_dictionaries, using=using)
+
+
+@receiver(connection_created)
+def count_opened_connection(sender, connection, **kwargs):
+    connection_stats.connection_opened(connection.alias)
+    install_query_timer(connection)
+    install_query_recorder(connection)
+
+
+@receiver(request_finished)
+def count_finished_request(sender, **kwargs):
+    connection_stats.request_finished()
+
+
+@receiver(post_migrate)
+def reset_color_codes(sender, **kwargs):
+    # Also sent after flush, which empties GameColor
+    clear_color_dictionaries()
@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from sphere_game_data_api.ingest import insert_game_data_idempotent
+from sphere_game_data_api.models import GameData
+
+
+def write_behind_enabled():
+    return getattr(settings, 'GAME_DATA_WRITE_BEHIND', False)
+
+
+def to_payload(validated_data):
+    """Turn serializer validated_data into a JSON-safe spool payload with an event_id"""
+    payload = {}
+    for field, value in validated_data.items():
+        payload[field] = value.isoformat() if isinstance(value, datetime) else value
+    payload['event_id'] = str(validated_data.get('event_id') or uuid.uuid4())
+    return payload
+
+
+def from_payload(payload):
+    """Build an unsaved GameData instance from a spool payload"""
+    attrs = dict(payload)
+    attrs['event_at'] = parse_datetime(attrs['event_at'])
+    attrs['event_id'] = uuid.UUID(attrs['event_id'])
+    return GameData(**attrs)
+
+
+class GameDataSpool:
+    """
+    Durable local queue for write-behind ingestion, stored in an SQLite file:
+    - enqueue() commits before returning, so an accepted event survives a crash
+    - claim() leases the oldest events to one drainer for `lease_seconds`
+    - ack() deletes events once they are in the database; events that are never
+      acked are claimed again after the lease expires (at-least-once delivery)
+    """
+
+    def __init__(self, path, lease_seconds=300):
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS spool ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' payload TEXT NOT NULL,'
+                ' enqueued_at REAL NOT NULL,'
+                ' leased_until REAL'
+                ')'
+            )
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute('PRAGMA synchronous=FULL')
+        return _Connection(connection)
+
+    def enqueue(self, payloads):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany(
+                'INSERT INTO spool (payload, enqueued_at) VALUES (?, ?)',
+                [(json.dumps(payload, separators=(',', ':')), now) for payload in payloads]
+            )
+            connection.execute('COMMIT')
+
+    def claim(self, limit):
+        """Lease up to `limit` of the oldest unleased events; returns [(spool id, payload)]"""
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            rows = connection.execute(
+                'SELECT id, payload FROM spool'
+                ' WHERE leased_until IS NULL OR leased_until < ?'
+                ' ORDER BY id LIMIT ?',
+                (now, limit)
+            ).fetchall()
+            connection.executemany(
+                'UPDATE spool SET leased_until = ? WHERE id = ?',
+                [(now + self.lease_seconds, spool_id) for spool_id, _ in rows]
+            )
+            connection.execute('COMMIT')
+        return [(spool_id, json.loads(payload)) for spool_id, payload in rows]
+
+    def ack(self, spool_ids):
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('DELETE FROM spool WHERE id = ?', [(spool_id,) for spool_id in spool_ids])
+            connection.execute('COMMIT')
+
+    def release(self, spool_ids):
+        """Hand leased events back right away, e.g. after a failed flush"""
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany(
+                'UPDATE spool SET leased_until = NULL WHERE id = ?', [(spool_id,) for spool_id in spool_ids]
+            )
+            connection.execute('COMMIT')
+
+    def stats(self):
+        with self._connect() as connection:
+            depth, oldest = connection.execute('SELECT COUNT(*), MIN(enqueued_at) FROM spool').fetchone()
+        return {
+            'depth': depth,
+            'oldest_age_seconds': round(time.time() - oldest, 3) if oldest is not None else None,
+        }
+
+    def depth(self):
+        return self.stats()['depth']
+
+
+class _Connection:
+    """Context manager that closes the sqlite3 connection (sqlite3's own only ends transactions)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.connection.in_transaction:
+            self.connection.execute('ROLLBACK')
+        self.connection.close()
+        return False
+
+
+_spools = {}
+_spools_lock = threading.Lock()
+
+
+def get_spool():
+    path = str(getattr(settings, 'GAME_DATA_SPOOL_PATH', 'game_data_spool.sqlite3'))
+    lease_seconds = getattr(settings, 'GAME_DATA_SPOOL_LEASE_SECONDS', 300)
+    with _spools_lock:
+        spool = _spools.get(path)
+        if spool is None or spool.lease_seconds != lease_seconds:
+            spool = _spools[path] = GameDataSpool(path, lease_seconds=lease_seconds)
+    return spool
+
+
+def drain_spool(spool, batch_size):
+    """
+    Move one claimed batch from the spool into the database.
+    Replays of already stored events are skipped by event_id.
+    Returns (claimed, inserted).
+    """
+    claimed = spool.claim(batch_size)
+    if not claimed:
+        return 0, 0
+    spool_ids = [spool_id for spool_id, _ in claimed]
+    try:
+        inserted = insert_game_data_idempotent([from_payload(payload) for _, payload in claimed])
+    except Exception:
+        spool.release(spool_ids)
+        raise
+    spool.ack(spool_ids)
+    return len(claimed), len(inserted)
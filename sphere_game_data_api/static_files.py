@@ -0,0 +1,41 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also runs natively under ASGI. WhiteNoise's own
+    middleware is sync-only, so Django would adapt the chain around it and send
+    every request, async views included, through a worker thread. Here other
+    requests cost a dict lookup on the event loop; only static files are looked
+    up on disk and opened in a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    def may_be_static(self, url):
+        # With autorefresh (DEBUG) files are found on disk per request, under these prefixes only
+        return url.startswith(self.static_prefix) or any(url.startswith(prefix) for _, prefix in self.directories)
+
+    async def __acall__(self, request):
+        url = request.path_info
+        if not self.autorefresh:
+            static_file = self.files.get(url)
+        elif self.may_be_static(url):
+            static_file = await sync_to_async(self.find_file)(url)
+        else:
+            static_file = None
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,155 @@
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import Trunc
+
+from sphere_game_data_api.models import GameDataHourlyRollup, GameSessionLevelRollup
+from sphere_game_data_api.rollups import hour_bucket
+
+HISTOGRAM_BUCKETS = ('hour', 'day', 'week', 'month')
+STATS_SOURCES = ('events', 'rollups')
+
+# Filters that only exist on raw events and can't be answered from the rollups
+ROLLUP_UNSUPPORTED_FILTERS = ('session_id', 'ip_address', 'player_id')
+
+# GameData lookup -> GameSessionLevelRollup lookup (a session level overlaps the time range)
+SESSION_ROLLUP_LOOKUPS = {
+    'event_at__gte': 'last_event_at__gte',
+    'event_at__lt': 'first_event_at__lt',
+    'game_mode': 'game_mode',
+    'game_mode__in': 'game_mode__in',
+    'game_level': 'game_level',
+    'game_level__in': 'game_level__in',
+    'game_level__gte': 'game_level__gte',
+    'game_level__lte': 'game_level__lte',
+}
+
+
+def _rate(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _average(value):
+    return round(value, 4) if value is not None else None
+
+
+def compute_game_data_stats(queryset, bucket='day', completion_event='level_complete'):
+    """
+    Aggregate game data in the database and return only the small result set:
+    - totals: events, distinct sessions and average retry_count
+    - by_event_type / by_event_category: event counts per value
+    - levels: per (game_mode, game_level) events, sessions, sessions that logged
+      `completion_event`, completion rate and average retry_count
+    - histogram: event counts per `bucket` of event_at
+    """
+    queryset = queryset.order_by()
+
+    totals = queryset.aggregate(
+        events=Count('id'),
+        sessions=Count('session_id', distinct=True),
+        avg_retry_count=Avg('retry_count'),
+    )
+    totals['avg_retry_count'] = _average(totals['avg_retry_count'])
+
+    by_event_type = list(
+        queryset.values('event_type').annotate(count=Count('id')).order_by('-count', 'event_type')
+    )
+    by_event_category = list(
+        queryset.values('event_category').annotate(count=Count('id')).order_by('-count', 'event_category')
+    )
+
+    levels = []
+    level_rows = (
+        queryset.values('game_mode', 'game_level')
+        .annotate(
+            events=Count('id'),
+            sessions=Count('session_id', distinct=True),
+            completions=Count('session_id', distinct=True, filter=Q(event_type=completion_event)),
+            avg_retry_count=Avg('retry_count'),
+        )
+        .order_by('game_mode', 'game_level')
+    )
+    for row in level_rows:
+        row['completion_rate'] = _rate(row['completions'], row['sessions'])
+        row['avg_retry_count'] = _average(row['avg_retry_count'])
+        levels.append(row)
+
+    histogram = list(
+        queryset.annotate(bucket=Trunc('event_at', bucket))
+        .values('bucket')
+        .annotate(count=Count('id'))
+        .order_by('bucket')
+    )
+
+    return {
+        'totals': totals,
+        'by_event_type': by_event_type,
+        'by_event_category': by_event_category,
+        'levels': levels,
+        'histogram': {'bucket': bucket, 'counts': histogram},
+    }
+
+
+def compute_rollup_stats(filters, bucket='day'):
+    """
+    Same result shape as compute_game_data_stats, read from the rollup tables.
+    `filters` are GameDataFilterBackend lookups; event_at bounds are applied at hour
+    granularity, and the session and level figures ignore event_type/event_category.
+    """
+    hourly_filters = {}
+    for lookup, value in filters.items():
+        if lookup.startswith('event_at__'):
+            lookup, value = lookup.replace('event_at', 'bucket', 1), hour_bucket(value)
+        hourly_filters[lookup] = value
+    session_filters = {
+        SESSION_ROLLUP_LOOKUPS[lookup]: value
+        for lookup, value in filters.items() if lookup in SESSION_ROLLUP_LOOKUPS
+    }
+    hourly = GameDataHourlyRollup.objects.filter(**hourly_filters).order_by()
+    session_levels = GameSessionLevelRollup.objects.filter(**session_filters).order_by()
+
+    hourly_totals = hourly.aggregate(events=Sum('event_count'), retry_total=Sum('retry_total'))
+    events = hourly_totals['events'] or 0
+    totals = {
+        'events': events,
+        'sessions': session_levels.values('session_id').distinct().count(),
+        'avg_retry_count': _rate(hourly_totals['retry_total'] or 0, events),
+    }
+
+    by_event_type = list(
+        hourly.values('event_type').annotate(count=Sum('event_count')).order_by('-count', 'event_type')
+    )
+    by_event_category = list(
+        hourly.values('event_category').annotate(count=Sum('event_count')).order_by('-count', 'event_category')
+    )
+
+    levels = []
+    level_rows = (
+        session_levels.values('game_mode', 'game_level')
+        .annotate(
+            events=Sum('event_count'),
+            sessions=Count('id'),
+            completions=Count('id', filter=Q(completed=True)),
+            retry_total=Sum('retry_total'),
+        )
+        .order_by('game_mode', 'game_level')
+    )
+    for row in level_rows:
+        retry_total = row.pop('retry_total')
+        row['avg_retry_count'] = _rate(retry_total, row['events'])
+        row['completion_rate'] = _rate(row['completions'], row['sessions'])
+        levels.append(row)
+
+    histogram = [
+        {'bucket': row['period'], 'count': row['count']}
+        for row in hourly.annotate(period=Trunc('bucket', bucket))
+        .values('period')
+        .annotate(count=Sum('event_count'))
+        .order_by('period')
+    ]
+
+    return {
+        'totals': totals,
+        'by_event_type': by_event_type,
+        'by_event_category': by_event_category,
+        'levels': levels,
+        'histogram': {'bucket': bucket, 'counts': histogram},
+    }
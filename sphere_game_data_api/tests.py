@@ -1,12 +1,43 @@
 # tests.py
+import csv
+import io
+import json
+import os
+import tempfile
+import uuid
+from importlib import import_module
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.backends.signals import connection_created
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
 from django.utils import timezone
-from sphere_game_data_api.models import GameData
+from sphere_game_data_api import archive as game_data_archive, ingest
+from sphere_game_data_api.archive import list_archives
+from sphere_game_data_api.authentication import token_cache
+from sphere_game_data_api.checks import check_response_cache_is_shared
+from sphere_game_data_api.db_connections import connection_stats
+from sphere_game_data_api.instrumentation import request_metrics
+from sphere_game_data_api.models import GameColor, GameData, GameDataHourlyRollup, GameSessionLevelRollup, PlayerStats
+from sphere_game_data_api.partitions import add_months, create_partition, detach_partitions, is_partitioned, month_start
+from sphere_game_data_api.query_inspector import QueryBudgetTestMixin
+from sphere_game_data_api.serializers import GameDataSerializer
+from sphere_game_data_api.spool import get_spool
 
 
 class AuthAPITestCase(APITestCase):
@@ -109,7 +140,7 @@ class GameDataAPITestCase(APITestCase):
         url = reverse("game-data-list-create")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_retrieve_game_data_anonymous_denied(self):
         """Test that anonymous users cannot retrieve game data"""
@@ -279,4 +310,1785 @@ class GameDataAPITestCase(APITestCase):
         url = reverse("game-data-rud", kwargs={"pk": game_data.pk})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(GameData.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(GameData.objects.count(), 0)
+
+class GameDataBatchAPITestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse("game-data-batch-create")
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "level_complete",
+            "event_category": "gameplay",
+            "ip_address": "192.168.1.2",
+            "player_id": "player_001",
+            "session_id": "session_456",
+            "game_reference": "game_ref_002",
+            "game_level": 2,
+            "game_mode": "classic",
+            "game_color": "red",
+            "game_sequence": ["blue", "red", "yellow"],
+            "game_player_input": ["blue", "red", "yellow"],
+            "retry_count": 0,
+            "error_messages": []
+        }
+
+    def test_batch_create_anonymous(self):
+        """Test that a batch of valid events is inserted in one request"""
+        data = [dict(self.event, game_level=level) for level in range(1, 6)]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 5)
+        self.assertEqual(response.data["failed"], 0)
+        self.assertEqual(len(response.data["ids"]), 5)
+        self.assertEqual(GameData.objects.count(), 5)
+
+    def test_batch_create_keeps_valid_rows(self):
+        """Test that invalid events are reported per index without dropping valid ones"""
+        data = [
+            self.event,
+            dict(self.event, game_level="not-a-level"),
+            dict(self.event, ip_address="not-an-ip"),
+            dict(self.event, session_id="session_789"),
+        ]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertIn("game_level", response.data["errors"][0]["errors"])
+        self.assertEqual(GameData.objects.count(), 2)
+
+    def test_batch_create_all_invalid(self):
+        """Test that a batch without any valid event is rejected"""
+        data = [dict(self.event, game_level="not-a-level")]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(GameData.objects.count(), 0)
+
+    def test_batch_create_requires_list(self):
+        """Test that a non-list body is rejected"""
+        response = self.client.post(self.url, self.event, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(GameData.objects.count(), 0)
+
+
+class GameDataPaginationTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.url = reverse("game-data-list-create")
+        # Same created_at for every row, so ordering has to fall back to id
+        created_at = timezone.now()
+        GameData.objects.bulk_create([
+            GameData(
+                event_at=created_at,
+                event_type="level_complete",
+                ip_address="192.168.1.1",
+                session_id="session_123",
+                game_level=level,
+                game_mode="classic",
+            )
+            for level in range(1, 8)
+        ])
+        GameData.objects.update(created_at=created_at)
+
+    def test_list_is_paginated(self):
+        """Test that the list endpoint returns one page with an opaque next cursor"""
+        response = self.client.get(self.url, {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_cursor_walks_all_rows_once(self):
+        """Test that following next cursors visits every row exactly once, newest first"""
+        seen = []
+        url = f"{self.url}?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        expected = list(GameData.objects.order_by("-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_page_size_is_capped(self):
+        """Test that page_size above the configured maximum is capped"""
+        with self.settings(GAME_DATA_MAX_PAGE_SIZE=2):
+            response = self.client.get(self.url, {"page_size": 50})
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+class GameDataExportTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.url = reverse("game-data-export")
+        for index, event_type in enumerate(["game_start", "level_complete", "game_end"]):
+            GameData.objects.create(
+                event_at=datetime(2024, 1, 1, 12, index, tzinfo=dt_timezone.utc),
+                event_type=event_type,
+                ip_address="192.168.1.1",
+                player_id="player_001",
+                session_id="session_123" if index < 2 else "session_456",
+                game_level=1,
+                game_mode="classic",
+                game_sequence=["red", "blue"],
+                game_player_input=["red"],
+                error_messages=["14:30:20 - Test error message"]
+            )
+
+    def export(self, **params):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_anonymous_denied(self):
+        """Test that anonymous users cannot export game data"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_ndjson_matches_serializer(self):
+        """Test that NDJSON export streams one serializer-shaped object per line, oldest first"""
+        lines = self.export().splitlines()
+        expected = GameDataSerializer(GameData.objects.order_by("event_at"), many=True).data
+        self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_export_csv(self):
+        """Test that CSV export has a header row and JSON-encoded list columns"""
+        rows = list(csv.DictReader(io.StringIO(self.export(output="csv"))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(json.loads(rows[0]["game_sequence"]), ["red", "blue"])
+
+    def test_export_filters(self):
+        """Test that export accepts the list view filters"""
+        lines = self.export(session_id="session_123", event_type="game_start,game_end").splitlines()
+        self.assertEqual([json.loads(line)["event_type"] for line in lines], ["game_start"])
+        lines = self.export(event_at_after="2024-01-01T12:01:00Z").splitlines()
+        self.assertEqual(len(lines), 2)
+
+    @override_settings(GAME_DATA_EXPORT_CHUNK_SIZE=2)
+    def test_export_pages_with_keyset_queries(self):
+        """Test that export reads page by page without skipping or repeating rows that share event_at"""
+        for _ in range(3):
+            GameData.objects.create(
+                event_at=datetime(2024, 1, 1, 12, 0, tzinfo=dt_timezone.utc),
+                event_type="retry",
+                ip_address="192.168.1.1",
+                session_id="session_123",
+                game_level=1,
+                game_mode="classic",
+            )
+        lines = self.export().splitlines()
+        expected = list(GameData.objects.order_by("event_at", "id").values_list("id", flat=True))
+        self.assertEqual([json.loads(line)["id"] for line in lines], expected)
+        self.assertEqual(len(expected), 6)
+
+    def test_export_invalid_parameters(self):
+        """Test that unknown formats and malformed filters are rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.assertEqual(self.client.get(self.url, {"output": "xml"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"event_at_after": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GameDataFilterTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.url = reverse("game-data-list-create")
+        events = [
+            ("game_start", "system", "classic", 1, "192.168.1.1", "player_001", "session_123"),
+            ("level_complete", "gameplay", "classic", 1, "192.168.1.1", "player_001", "session_123"),
+            ("level_complete", "gameplay", "timed", 2, "10.0.0.5", "player_002", "session_456"),
+            ("game_end", "system", "timed", 3, "10.0.0.5", "player_002", "session_456"),
+        ]
+        for minute, (event_type, category, mode, level, ip, player, session) in enumerate(events):
+            GameData.objects.create(
+                event_at=datetime(2024, 1, 1, 12, minute, tzinfo=dt_timezone.utc),
+                event_type=event_type,
+                event_category=category,
+                ip_address=ip,
+                player_id=player,
+                session_id=session,
+                game_level=level,
+                game_mode=mode,
+            )
+
+    def filtered_types(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(item["event_type"] for item in response.data["results"])
+
+    def test_filter_exact_and_in(self):
+        """Test exact and comma-separated (IN) filters on the categorical columns"""
+        self.assertEqual(self.filtered_types(game_mode="timed"), ["game_end", "level_complete"])
+        self.assertEqual(self.filtered_types(event_category="system,gameplay", game_level="1"),
+                         ["game_start", "level_complete"])
+        self.assertEqual(self.filtered_types(game_level="1,3"), ["game_end", "game_start", "level_complete"])
+        self.assertEqual(self.filtered_types(ip_address="10.0.0.5", event_type="game_end"), ["game_end"])
+        self.assertEqual(self.filtered_types(player_id="player_001", session_id="session_123"),
+                         ["game_start", "level_complete"])
+
+    def test_filter_ranges(self):
+        """Test event_at and game_level ranges"""
+        self.assertEqual(
+            self.filtered_types(event_at_after="2024-01-01T12:01:00Z", event_at_before="2024-01-01T12:03:00Z"),
+            ["level_complete", "level_complete"]
+        )
+        self.assertEqual(self.filtered_types(game_level_min=2, game_level_max=2), ["level_complete"])
+
+    def test_filter_invalid_values(self):
+        """Test that malformed filter values are rejected with the offending parameter"""
+        response = self.client.get(self.url, {"game_level": "1,two", "ip_address": "not-an-ip"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("game_level", response.data["details"])
+        self.assertIn("ip_address", response.data["details"])
+
+
+class GameDataStatsTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.url = reverse("game-data-stats")
+        events = [
+            # (hour, session, event_type, level, retries)
+            (12, "session_1", "game_start", 1, 0),
+            (12, "session_1", "level_complete", 1, 2),
+            (12, "session_2", "game_start", 1, 0),
+            (13, "session_2", "game_end", 1, 4),
+            (13, "session_1", "level_complete", 2, 0),
+        ]
+        for hour, session, event_type, level, retries in events:
+            GameData.objects.create(
+                event_at=datetime(2024, 1, 1, hour, 30, tzinfo=dt_timezone.utc),
+                event_type=event_type,
+                event_category="system" if event_type != "level_complete" else "gameplay",
+                ip_address="192.168.1.1",
+                session_id=session,
+                game_level=level,
+                game_mode="classic",
+                retry_count=retries,
+            )
+
+    def get_stats(self, **params):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_stats_anonymous_denied(self):
+        """Test that anonymous users cannot read stats"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_counts_and_levels(self):
+        """Test grouped counts, completion rates and averages"""
+        stats = self.get_stats()
+        self.assertEqual(stats["totals"], {"events": 5, "sessions": 2, "avg_retry_count": 1.2})
+        self.assertEqual(stats["by_event_type"][0], {"event_type": "game_start", "count": 2})
+        self.assertEqual(
+            {row["event_category"]: row["count"] for row in stats["by_event_category"]},
+            {"system": 3, "gameplay": 2}
+        )
+        level_1, level_2 = stats["levels"]
+        self.assertEqual((level_1["game_level"], level_1["sessions"], level_1["completions"]), (1, 2, 1))
+        self.assertEqual(level_1["completion_rate"], 0.5)
+        self.assertEqual(level_2["completion_rate"], 1.0)
+
+    def test_stats_histogram_and_filters(self):
+        """Test the event_at histogram and that list filters narrow the aggregation"""
+        stats = self.get_stats(bucket="hour")
+        self.assertEqual([bucket["count"] for bucket in stats["histogram"]["counts"]], [3, 2])
+        stats = self.get_stats(session_id="session_2")
+        self.assertEqual(stats["totals"]["events"], 2)
+
+    def test_stats_invalid_bucket(self):
+        """Test that unknown histogram buckets are rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(self.url, {"bucket": "minute"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GameDataRollupTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.event = {
+            "event_at": "2024-01-01T12:10:00Z",
+            "event_type": "game_start",
+            "event_category": "system",
+            "ip_address": "192.168.1.2",
+            "player_id": "player_001",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+            "game_sequence": ["red"],
+            "game_player_input": ["red"],
+            "retry_count": 1,
+        }
+        self.client.post(reverse("game-data-list-create"), self.event, format="json")
+        self.client.post(reverse("game-data-batch-create"), [
+            dict(self.event, event_at="2024-01-01T12:40:00Z", event_type="level_complete",
+                 event_category="gameplay", retry_count=3),
+            dict(self.event, event_at="2024-01-01T13:05:00Z", game_level=2),
+            dict(self.event, event_at="2024-01-01T13:15:00Z", session_id="session_2", player_id=""),
+        ], format="json")
+
+    def get_stats(self, **params):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(reverse("game-data-stats"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def rollup_rows(self):
+        return (
+            sorted(GameDataHourlyRollup.objects.values_list(
+                "bucket", "event_type", "event_category", "game_mode", "game_level", "event_count", "retry_total")),
+            sorted(GameSessionLevelRollup.objects.values_list(
+                "session_id", "game_mode", "game_level", "player_id", "first_event_at", "last_event_at",
+                "event_count", "retry_total", "completed")),
+        )
+
+    def test_ingest_updates_rollups(self):
+        """Test that single and batch creates fold events into the rollup tables"""
+        twelve = datetime(2024, 1, 1, 12, tzinfo=dt_timezone.utc)
+        rollup = GameDataHourlyRollup.objects.get(bucket=twelve, event_type="game_start")
+        self.assertEqual((rollup.event_count, rollup.retry_total), (1, 1))
+        summary = GameSessionLevelRollup.objects.get(session_id="session_1", game_level=1)
+        self.assertEqual((summary.event_count, summary.retry_total, summary.completed), (2, 4, True))
+        self.assertEqual(summary.last_event_at, datetime(2024, 1, 1, 12, 40, tzinfo=dt_timezone.utc))
+
+    def test_rebuild_matches_incremental(self):
+        """Test that rebuild_rollups recomputes exactly what ingest maintained"""
+        incremental = self.rollup_rows()
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def test_batch_upserts_rollups_in_few_statements(self):
+        """Test that a batch over many sessions writes the rollups in a few multi-row upserts"""
+        events = [
+            dict(self.event, session_id=f"bulk_{index}", player_id=f"player_{index % 20}", game_level=index % 7,
+                 event_type="level_complete" if index % 3 else "game_start")
+            for index in range(300)
+        ]
+        url = reverse("game-data-batch-create")
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.post(url, events, format="json").status_code, status.HTTP_201_CREATED)
+        self.assertLess(len(context.captured_queries), 30)
+
+        # Again, now merging into existing rows
+        self.client.post(url, [dict(event, event_at="2024-01-01T12:50:00Z") for event in events], format="json")
+        incremental = self.rollup_rows()
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertEqual(self.rollup_rows(), incremental)
+        player_fields = ("player_id", "game_mode", "highest_level", "sessions_played", "event_count", "last_seen")
+        incremental = sorted(PlayerStats.objects.values_list(*player_fields))
+        call_command("rebuild_player_stats", stdout=io.StringIO())
+        self.assertEqual(sorted(PlayerStats.objects.values_list(*player_fields)), incremental)
+
+    def test_stats_from_rollups_match_events(self):
+        """Test that source=rollups answers like the raw event aggregation"""
+        for params in ({}, {"game_mode": "classic", "bucket": "hour"}, {"game_level_min": 2}):
+            self.assertEqual(self.get_stats(source="rollups", **params), self.get_stats(**params))
+
+    def test_stats_from_rollups_rejects_event_filters(self):
+        """Test that filters the rollups can't answer are rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(reverse("game-data-stats"), {"source": "rollups", "session_id": "session_1"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GameDataWriteBehindTestCase(APITestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool_dir.cleanup)
+        settings_override = self.settings(
+            GAME_DATA_WRITE_BEHIND=True,
+            GAME_DATA_SPOOL_PATH=os.path.join(self.spool_dir.name, "spool.sqlite3"),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.event = {
+            "event_at": "2024-01-01T12:00:00.123456Z",
+            "event_type": "game_start",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+            "game_sequence": ["red"],
+        }
+
+    def drain(self):
+        call_command("drain_game_data_spool", "--once", stdout=io.StringIO())
+
+    def test_create_is_queued_then_drained(self):
+        """Test that write-behind creates return 202 and land in the database after a drain"""
+        response = self.client.post(reverse("game-data-list-create"), self.event, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(GameData.objects.count(), 0)
+        self.assertEqual(get_spool().depth(), 1)
+
+        self.drain()
+        game_data = GameData.objects.get()
+        self.assertEqual(str(game_data.event_id), response.data["event_id"])
+        self.assertEqual(game_data.event_at, datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=dt_timezone.utc))
+        self.assertEqual(get_spool().depth(), 0)
+
+    def test_batch_is_queued(self):
+        """Test that valid batch items are queued and invalid ones reported"""
+        data = [self.event, dict(self.event, game_level="bad"), dict(self.event, session_id="session_2")]
+        response = self.client.post(reverse("game-data-batch-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual((response.data["queued"], response.data["failed"]), (2, 1))
+        self.drain()
+        self.assertEqual(GameData.objects.count(), 2)
+
+    def test_replayed_events_are_inserted_once(self):
+        """Test that an event delivered twice (e.g. after a crash before ack) is stored once"""
+        self.client.post(reverse("game-data-list-create"), self.event, format="json")
+        with self.settings(GAME_DATA_SPOOL_LEASE_SECONDS=0):
+            # Claimed but never acked, then enqueued again by a client retry
+            payload = get_spool().claim(10)[0][1]
+            get_spool().enqueue([payload])
+            self.drain()
+        self.assertEqual(get_spool().depth(), 0)
+        self.assertEqual(GameData.objects.count(), 1)
+        self.assertEqual(GameDataHourlyRollup.objects.get().event_count, 1)
+
+    def test_spool_stats_endpoint(self):
+        """Test that admins can read the queue depth"""
+        self.client.post(reverse("game-data-list-create"), self.event, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(reverse("game-data-spool"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["depth"], 1)
+        self.assertTrue(response.data["write_behind"])
+
+
+class GameDataIdempotencyTestCase(APITestCase):
+    def setUp(self):
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "game_start",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+            "event_id": "5f0c6a2e-1b7e-4c4e-9a51-2d6f1f0b8a11",
+        }
+
+    def test_single_create_retry_returns_original(self):
+        """Test that resending an event_id returns the stored row without inserting"""
+        url = reverse("game-data-list-create")
+        first = self.client.post(url, self.event, format="json")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data["event_id"], self.event["event_id"])
+
+        retry = self.client.post(url, dict(self.event, retry_count=5), format="json")
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(retry.data["retry_count"], 0)
+        self.assertEqual(GameData.objects.count(), 1)
+        self.assertEqual(GameDataHourlyRollup.objects.get().event_count, 1)
+
+    def test_event_id_is_optional(self):
+        """Test that events without event_id are never deduplicated"""
+        url = reverse("game-data-list-create")
+        event = {key: value for key, value in self.event.items() if key != "event_id"}
+        self.assertEqual(self.client.post(url, event, format="json").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(url, event, format="json").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(GameData.objects.count(), 2)
+
+    def test_batch_retry_is_idempotent(self):
+        """Test that duplicate event_ids in and across batches resolve to the original rows"""
+        url = reverse("game-data-batch-create")
+        other = dict(self.event, event_id="0b7d1a4c-6f43-4a7e-8d1c-3e2b9f5a7c20")
+        no_id = {key: value for key, value in self.event.items() if key != "event_id"}
+
+        first = self.client.post(url, [self.event, other, self.event, no_id], format="json")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((first.data["created"], first.data["duplicates"]), (3, 1))
+        self.assertEqual(first.data["ids"][0], first.data["ids"][2])
+
+        retry = self.client.post(url, [self.event, other], format="json")
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual((retry.data["created"], retry.data["duplicates"]), (0, 2))
+        self.assertEqual(retry.data["ids"], first.data["ids"][:2])
+        self.assertEqual(GameData.objects.count(), 3)
+
+    def test_batch_race_counts_only_inserted_rows(self):
+        """Test that an event_id stored after the duplicate lookup is neither inserted nor counted again"""
+        url = reverse("game-data-batch-create")
+        self.assertEqual(self.client.post(url, [self.event], format="json").status_code, status.HTTP_201_CREATED)
+        other = dict(self.event, event_id="0b7d1a4c-6f43-4a7e-8d1c-3e2b9f5a7c20", player_id="player_1")
+
+        # The first lookup misses the stored row, as when a concurrent replay commits right after it
+        real_lookup = ingest._stored_event_ids
+        lookups = iter([lambda event_ids, batch_size: set()])
+        with mock.patch.object(
+            ingest, "_stored_event_ids",
+            side_effect=lambda *args: next(lookups, real_lookup)(*args)
+        ):
+            response = self.client.post(url, [dict(self.event, player_id="player_1"), other], format="json")
+
+        self.assertEqual((response.data["created"], response.data["duplicates"]), (1, 1))
+        self.assertEqual(GameData.objects.count(), 2)
+        self.assertEqual(GameDataHourlyRollup.objects.get().event_count, 2)
+        self.assertEqual(PlayerStats.objects.get(player_id="player_1").event_count, 1)
+
+    def test_update_to_taken_event_id_rejected(self):
+        """Test that PUT/PATCH can't give a row another row's event_id"""
+        url = reverse("game-data-list-create")
+        self.client.post(url, self.event, format="json")
+        other = self.client.post(url, dict(self.event, event_id="0b7d1a4c-6f43-4a7e-8d1c-3e2b9f5a7c20"), format="json")
+        admin = User.objects.create_user(username="admin_test", password="adminpass123", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=admin).key}")
+        detail_url = reverse("game-data-rud", kwargs={"pk": other.data["id"]})
+
+        response = self.client.put(detail_url, self.event, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("event_id", response.data["details"])
+        response = self.client.patch(detail_url, {"event_id": self.event["event_id"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(str(GameData.objects.get(pk=other.data["id"]).event_id), "0b7d1a4c-6f43-4a7e-8d1c-3e2b9f5a7c20")
+
+    def test_invalid_event_id(self):
+        """Test that a malformed event_id is a validation error"""
+        response = self.client.post(
+            reverse("game-data-list-create"), dict(self.event, event_id="not-a-uuid"), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GameDataAsyncIngestTestCase(TransactionTestCase):
+    # The async views write on ingest worker threads, through their own connections
+    serialized_rollback = True
+
+    def setUp(self):
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "game_start",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+            "event_id": "5f0c6a2e-1b7e-4c4e-9a51-2d6f1f0b8a11",
+        }
+
+    async def test_async_create(self):
+        """Test that the async view creates like the sync one, including idempotent retries"""
+        url = reverse("game-data-async-create")
+        first = await self.async_client.post(url, self.event, content_type="application/json")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        retry = await self.async_client.post(url, self.event, content_type="application/json")
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.json()["id"], first.json()["id"])
+        self.assertEqual(await GameData.objects.acount(), 1)
+
+    async def test_async_create_invalid(self):
+        """Test that validation and JSON errors use the API error shape"""
+        url = reverse("game-data-async-create")
+        response = await self.async_client.post(
+            url, dict(self.event, game_level="bad"), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("game_level", response.json()["details"])
+        response = await self.async_client.post(url, "{not json", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.json()["error"])
+
+    async def test_async_batch_create(self):
+        """Test that the async batch view keeps valid rows and reports invalid ones"""
+        response = await self.async_client.post(
+            reverse("game-data-async-batch-create"),
+            [{key: value for key, value in self.event.items() if key != "event_id"},
+             dict(self.event, ip_address="bad")],
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.json()["created"], response.json()["failed"]), (1, 1))
+        self.assertEqual(await GameData.objects.acount(), 1)
+
+    def test_middleware_runs_natively_under_asgi(self):
+        """Test that no middleware makes Django adapt the ASGI chain through a worker thread"""
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), "async_capable", False), path)
+
+    async def test_async_security_headers_and_sessions(self):
+        """Test that the async middleware still sets security headers and saves sessions"""
+        response = await self.async_client.post(
+            reverse("game-data-async-create"), self.event, content_type="application/json"
+        )
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+        await sync_to_async(User.objects.create_superuser)("admin_test", password="adminpass123")
+        response = await self.async_client.post(
+            reverse("admin:login"), {"username": "admin_test", "password": "adminpass123"}
+        )
+        self.assertEqual(response.status_code, 302)
+        response = await self.async_client.get(reverse("admin:index"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_async_ingest_is_throttled(self):
+        """Test that the async ingestion view shares the ingest limit and error shape"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        rates = {"anon": "1/min", "user": "100/min", "ingest": "3/min"}
+        event = {key: value for key, value in self.event.items() if key != "event_id"}
+        url = reverse("game-data-async-create")
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}):
+            for _ in range(3):
+                self.assertEqual(
+                    self.client.post(url, event, content_type="application/json").status_code,
+                    status.HTTP_201_CREATED
+                )
+            response = self.client.post(url, event, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(response.json()["error"])
+        self.assertIn("Retry-After", response)
+
+
+@override_settings(GAME_DATA_RESPONSE_CACHE_TIMEOUT=0)  # Count the queries of every request
+class CachedTokenAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.game_data = GameData.objects.create(
+            event_at=timezone.now(),
+            event_type="test_event",
+            ip_address="192.168.1.1",
+            session_id="test_session_123",
+            game_level=1,
+            game_mode="test",
+        )
+        self.url = reverse("game-data-rud", kwargs={"pk": self.game_data.pk})
+
+    def test_cache_hit_skips_auth_query(self):
+        """Test that a repeated token costs no authentication query"""
+        with self.assertNumQueries(3):  # Token + User lookup, then the row's ETag and the row
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(2):  # Only the row's ETag and the row
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_logout_invalidates_token(self):
+        """Test that a logged out token is rejected even after being cached"""
+        self.client.get(self.url)
+        self.assertEqual(self.client.post(reverse("logout")).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivating or demoting a user takes effect right away"""
+        self.client.get(self.url)
+        self.admin_user.is_staff = False
+        self.admin_user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.admin_user.is_active = False
+        self.admin_user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_shared_cache_backend(self):
+        """Test that a shared cache serves tokens resolved by another process"""
+        with self.settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "tokens": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tokens"},
+            },
+            TOKEN_AUTH_CACHE_ALIAS="tokens",
+        ):
+            self.client.get(self.url)
+            token_cache.clear()  # Drop the in-process copy, as in a fresh process
+            with self.assertNumQueries(2):
+                self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+
+class IngestThrottleTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "game_start",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+        }
+        rates = {"anon": "1/min", "user": "100/min", "ingest": "3/min"}
+        settings_override = self.settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_ingest_has_its_own_limit(self):
+        """Test that event posts count against the ingest rate, not the anon rate"""
+        url = reverse("game-data-list-create")
+        statuses = [self.client.post(url, self.event, format="json").status_code for _ in range(2)]
+        statuses.append(
+            self.client.post(reverse("game-data-batch-create"), [self.event], format="json").status_code
+        )
+        self.assertEqual(statuses, [status.HTTP_201_CREATED] * 3)
+
+        response = self.client.post(url, self.event, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.data["message"], "Too many requests")
+        self.assertIn("Retry-After", response)
+
+        # Reads are still limited per user
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+
+@override_settings(GAME_DATA_RESPONSE_CACHE_TIMEOUT=60)
+class GameDataResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.game_data = GameData.objects.create(
+            event_at=timezone.now(),
+            event_type="game_start",
+            ip_address="192.168.1.1",
+            session_id="session_1",
+            game_level=1,
+            game_mode="classic",
+        )
+        self.list_url = reverse("game-data-list-create")
+        self.detail_url = reverse("game-data-rud", kwargs={"pk": self.game_data.pk})
+
+    def test_repeated_reads_are_cached(self):
+        """Test that equivalent list queries skip the database and retrieves only check the version"""
+        first = self.client.get(self.list_url, {"game_mode": "classic,timed", "page_size": 10})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", first)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(self.list_url, {"game_mode": "classic, timed,", "page_size": "10"})
+        with self.assertNumQueries(1):  # id, version and updated_at only
+            self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_conditional_requests_return_304(self):
+        """Test that an unchanged ETag or date is answered with 304 and no body"""
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], first["ETag"])
+
+        detail = self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_invalidate_cached_reads(self):
+        """Test that creates, updates, batches and deletes are visible on the next read"""
+        first = self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "level_complete",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_2",
+            "game_level": 2,
+            "game_mode": "classic",
+        }
+        self.assertEqual(self.client.post(self.list_url, event, format="json").status_code, status.HTTP_201_CREATED)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        self.client.post(reverse("game-data-batch-create"), [event], format="json")
+        self.assertEqual(len(self.client.get(self.list_url).data["results"]), 3)
+
+        self.client.put(self.detail_url, dict(event, game_level=7), format="json")
+        self.assertEqual(self.client.get(self.detail_url).data["game_level"], 7)
+
+        self.client.delete(self.detail_url)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_caching_needs_a_shared_cache(self):
+        """Test that the system check rejects response caching on a process-local cache"""
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+        self.assertEqual(
+            [error.id for error in check_response_cache_is_shared(None)], ["sphere_game_data_api.E001"]
+        )
+        with self.settings(CACHES=redis):
+            self.assertEqual(check_response_cache_is_shared(None), [])
+        with self.settings(GAME_DATA_RESPONSE_CACHE_TIMEOUT=0):
+            self.assertEqual(check_response_cache_is_shared(None), [])
+
+    @override_settings(GAME_DATA_RESPONSE_CACHE_TIMEOUT=0)
+    def test_uncached_list_is_validated_by_etag_only(self):
+        """Test that without caching, pages aren't dated by the process-local data version"""
+        first = self.client.get(self.list_url)
+        self.assertNotIn("Last-Modified", first)
+        self.client.post(reverse("game-data-batch-create"), [{
+            "event_at": "2024-01-01T12:00:00Z", "event_type": "game_start", "ip_address": "192.168.1.2",
+            "session_id": "session_2", "game_level": 1, "game_mode": "classic",
+        }], format="json")
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+class GameDataConditionalRequestTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "game_start",
+            "ip_address": "192.168.1.1",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+        }
+        self.game_data = GameData.objects.create(**self.event)
+        self.detail_url = reverse("game-data-rud", kwargs={"pk": self.game_data.pk})
+
+    def test_row_etag_tracks_version(self):
+        """Test that the retrieve ETag is the row id and version, and updates bump it"""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["ETag"], f'"{self.game_data.pk}-1"')
+        with self.assertNumQueries(1):  # No full row fetch, no serialization
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=f'"{self.game_data.pk}-1"')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.put(self.detail_url, dict(self.event, game_level=2), format="json")
+        self.assertEqual(response["ETag"], f'"{self.game_data.pk}-2"')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=f'"{self.game_data.pk}-1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["game_level"], 2)
+
+    def test_list_etag_survives_unrelated_writes(self):
+        """Test that a page whose rows didn't change still gets 304 after other inserts"""
+        url = reverse("game-data-list-create")
+        first = self.client.get(url, {"session_id": "session_1"})
+        self.client.post(url, dict(self.event, session_id="session_2"), format="json")
+        response = self.client.get(url, {"session_id": "session_1"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.put(self.detail_url, dict(self.event, game_level=2), format="json")
+        response = self.client.get(url, {"session_id": "session_1"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_match_guards_writes(self):
+        """Test that PUT and DELETE with a stale If-Match fail with 412 and change nothing"""
+        stale = f'"{self.game_data.pk}-1"'
+        response = self.client.put(
+            self.detail_url, dict(self.event, game_level=2), format="json", HTTP_IF_MATCH=stale
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.put(
+            self.detail_url, dict(self.event, game_level=3), format="json", HTTP_IF_MATCH=stale
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response["ETag"], f'"{self.game_data.pk}-2"')
+        self.assertEqual(self.client.delete(self.detail_url, HTTP_IF_MATCH=stale).status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+        self.game_data.refresh_from_db()
+        self.assertEqual((self.game_data.game_level, self.game_data.version), (2, 2))
+
+        response = self.client.delete(self.detail_url, HTTP_IF_MATCH=f'"{self.game_data.pk}-2"')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class GameDataFastReadTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        base = {
+            "event_at": datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            "event_type": "player_selection",
+            "ip_address": "2001:db8::1",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+        }
+        self.rows = [
+            GameData.objects.create(**base, game_sequence=["red", "blue"], game_player_input=["red"]),
+            GameData.objects.create(
+                **base,
+                player_id="jöker \u2028 😀",
+                event_id="5f0c6a2e-1b7e-4c4e-9a51-2d6f1f0b8a11",
+                error_messages=[{"at": "2024-01-01T12:00:00Z", "message": "line\nbreak \u2029"}],
+            ),
+            GameData.objects.create(**base, game_sequence=[1.5, 1e16, 2 ** 70], error_messages=[None, True]),
+        ]
+
+    def get_both(self, url, params=None):
+        with self.settings(GAME_DATA_FAST_READS=False):
+            expected = self.client.get(url, params)
+        with mock.patch("sphere_game_data_api.renderers.orjson", None):
+            stdlib = self.client.get(url, params)
+        fast = self.client.get(url, params)
+        return expected, stdlib, fast
+
+    def test_list_is_byte_identical(self):
+        """Test that the fast list path renders exactly the serializer's bytes"""
+        for params in ({"page_size": 2}, {"page_size": 10}):
+            expected, stdlib, fast = self.get_both(reverse("game-data-list-create"), params)
+            self.assertEqual(expected.status_code, status.HTTP_200_OK)
+            self.assertEqual(fast.content, expected.content)
+            self.assertEqual(stdlib.content, expected.content)
+            self.assertEqual(fast["Content-Type"], expected["Content-Type"])
+
+    def test_retrieve_is_byte_identical(self):
+        """Test that the fast retrieve path renders exactly the serializer's bytes"""
+        for row in self.rows:
+            expected, stdlib, fast = self.get_both(reverse("game-data-rud", kwargs={"pk": row.pk}))
+            self.assertEqual(fast.content, expected.content)
+            self.assertEqual(stdlib.content, expected.content)
+        self.assertEqual(fast.data["game_sequence"], [1.5, 1e16, 2 ** 70])
+
+
+class GameDataFastValidationTestCase(APITestCase):
+    def setUp(self):
+        self.event = {
+            "event_at": "2024-01-01T12:00:00.123456+02:00",
+            "event_type": " player_selection ",
+            "event_category": "gameplay",
+            "ip_address": "192.168.1.2",
+            "player_id": "jöker 😀",
+            "session_id": "session_1",
+            "game_reference": "",
+            "game_level": 3,
+            "game_mode": "classic",
+            "game_color": None,
+            "game_sequence": ["red", {"at": 1.5, "n": None}],
+            "game_player_input": [],
+            "error_messages": [],
+            "event_id": "5f0c6a2e-1b7e-4c4e-9a51-2d6f1f0b8a11",
+            "id": 99,
+            "unknown": "ignored",
+        }
+
+    def validate_both(self, data):
+        with self.settings(GAME_DATA_FAST_VALIDATION=False):
+            expected = GameDataSerializer(data=data)
+            expected.is_valid()
+        fast = GameDataSerializer(data=data)
+        fast.is_valid()
+        return expected, fast
+
+    def test_valid_events_match_serializer(self):
+        """Test that the precompiled validator returns the serializer's validated data"""
+        variants = [
+            {},
+            {"event_id": None},
+            {"game_level": -5, "retry_count": 0, "correct_game_color": "  "},
+        ]
+        for changes in variants:
+            data = {**self.event, **changes}
+            expected, fast = self.validate_both(data)
+            self.assertEqual(expected.errors, {})
+            self.assertEqual(dict(fast.validated_data), dict(expected.validated_data))
+        minimal = {key: value for key, value in self.event.items() if key not in ("game_color", "event_id", "player_id")}
+        expected, fast = self.validate_both(minimal)
+        self.assertEqual(dict(fast.validated_data), dict(expected.validated_data))
+
+    def test_other_events_fall_back_to_serializer(self):
+        """Test that events the fast path doesn't accept get the serializer's result and errors"""
+        variants = [
+            {"event_type": ""},
+            {"event_type": None},
+            {"session_id": "x" * 256},
+            {"game_level": True},
+            {"game_level": "3"},
+            {"game_level": 2 ** 70},
+            {"ip_address": "2001:DB8::1"},
+            {"ip_address": "999.1.1.1"},
+            {"event_at": "2024-01-01T12:00:00"},
+            {"event_at": "2024-13-01T12:00:00Z"},
+            {"event_id": "not-a-uuid"},
+            {"player_id": "a\x00b"},
+            {"player_id": "\ud800"},
+            {"game_sequence": None},
+        ]
+        for changes in variants:
+            data = {**self.event, **changes}
+            with self.subTest(changes=changes):
+                expected, fast = self.validate_both(data)
+                self.assertEqual(fast.errors, expected.errors)
+                if not expected.errors:
+                    self.assertEqual(dict(fast.validated_data), dict(expected.validated_data))
+        data = dict(self.event)
+        del data["event_type"]
+        expected, fast = self.validate_both(data)
+        self.assertEqual(fast.errors, expected.errors)
+
+    def test_batch_item_errors_unchanged(self):
+        """Test that batch ingest reports the same per-item errors with the fast path"""
+        items = [self.event, {**self.event, "game_level": "x", "event_id": None}, ["not", "an", "object"]]
+        with self.settings(GAME_DATA_FAST_VALIDATION=False):
+            expected = GameDataSerializer(data=items, many=True)
+            expected.is_valid()
+        fast = GameDataSerializer(data=items, many=True)
+        fast.is_valid()
+        self.assertEqual(fast.item_errors, expected.item_errors)
+        self.assertEqual(len(fast.validated_data), 1)
+        self.assertEqual(dict(fast.validated_data[0]), dict(expected.validated_data[0]))
+
+    def test_create_response_matches_serializer(self):
+        """Test that a created event is rendered exactly as the serializer renders it"""
+        url = reverse("game-data-list-create")
+        response = self.client.post(url, {**self.event, "game_color": "red"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        instance = GameData.objects.get(pk=response.data["id"])
+        self.assertEqual(response.content, JSONRenderer().render(GameDataSerializer(instance).data))
+        self.assertEqual(instance.event_type, "player_selection")
+
+
+class DatabaseConnectionStatsTestCase(APITestCase):
+    def setUp(self):
+        connection_stats.reset()
+        self.addCleanup(connection_stats.reset)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.url = reverse("game-data-connections")
+
+    def test_requires_admin(self):
+        """Test that connection statistics are admin only"""
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_counts_requests_and_opened_connections(self):
+        """Test that requests and newly opened connections are counted per alias"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        for _ in range(3):
+            self.client.get(reverse("game-data-list-create"))
+        connection_created.send(sender=connection.__class__, connection=connection)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["requests"], 3)
+        default = response.data["databases"]["default"]
+        self.assertEqual(default["connections_opened"], 1)
+        self.assertEqual(default["reuse_ratio"], round(1 - 1 / 3, 4))
+        self.assertFalse(default["pooled"])
+        self.assertIsNone(default["pool"])
+        # The report's own request is counted once it has finished
+        self.assertEqual(connection_stats.snapshot()[0], 4)
+
+
+class GameDataArchiveTestCase(APITestCase):
+    def setUp(self):
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        self.archive_dir = archive_dir.name
+        overrides = self.settings(GAME_DATA_ARCHIVE_DIR=self.archive_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.url = reverse("game-data-export")
+        event_ats = [datetime(2020, 1, day, 12, tzinfo=dt_timezone.utc) for day in (3, 1, 2)] + [timezone.now()]
+        for index, event_at in enumerate(event_ats):
+            GameData.objects.create(
+                event_at=event_at,
+                event_type="game_start" if index % 2 else "game_end",
+                ip_address="192.168.1.1",
+                session_id=f"session_{index}",
+                game_level=index,
+                game_mode="classic",
+                game_sequence=["red", {"at": 1.5}],
+                error_messages=["ünïcode  "],
+            )
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content)
+
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command("archive_game_data", "--older-than-days", "30", "--delete-batch-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_archive_moves_old_rows(self):
+        """Test that old events are written to an archive, verified and deleted"""
+        before = self.export(event_at_before="2021-01-01T00:00:00Z")
+        output = self.archive("--format", "ndjson")
+        self.assertIn("Archived 3 events", output)
+        self.assertEqual(GameData.objects.count(), 1)
+
+        (manifest,) = list_archives(self.archive_dir)
+        self.assertEqual((manifest["rows"], manifest["deleted"]), (3, 3))
+        # The archive reads back as exactly what the export returned before archiving
+        self.assertEqual(self.export(source="archive"), before)
+        self.assertEqual(self.export(source="archive", event_at_before="2021-01-01T00:00:00Z"), before)
+
+    def test_rows_updated_while_archiving_are_kept(self):
+        """Test that a row updated after it was dumped isn't deleted, and its current version is archived"""
+        updated = GameData.objects.get(session_id="session_0")
+        delete_rows = game_data_archive._delete_rows
+
+        def update_then_delete(ids, versions):
+            if GameData.objects.filter(pk=updated.pk, version=1).exists():
+                GameData.objects.filter(pk=updated.pk).update(version=F("version") + 1, game_level=99)
+            return delete_rows(ids, versions)
+
+        with mock.patch.object(game_data_archive, "_delete_rows", side_effect=update_then_delete):
+            output = self.archive("--format", "ndjson")
+        self.assertIn("1 events changed while being archived", output)
+        self.assertEqual(GameData.objects.count(), 1)
+
+        first, second = list_archives(self.archive_dir)
+        self.assertEqual((first["rows"], first["deleted"], first["superseded_ids"]), (3, 2, [updated.pk]))
+        self.assertEqual((second["rows"], second["deleted"], second["superseded_ids"]), (1, 1, []))
+        lines = self.export(source="archive", output="ndjson").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["session_id"] for row in rows], ["session_1", "session_2", "session_0"])
+        self.assertEqual(rows[-1]["game_level"], 99)
+
+    def test_archive_export_filters(self):
+        """Test that archived exports accept the list view filters"""
+        self.archive("--format", "ndjson")
+        lines = self.export(source="archive", event_type="game_start", output="ndjson").splitlines()
+        self.assertEqual([json.loads(line)["session_id"] for line in lines], ["session_1"])
+        self.assertEqual(self.export(source="archive", event_at_after="2021-01-01T00:00:00Z"), b"")
+        rows = list(csv.DictReader(io.StringIO(self.export(source="archive", output="csv").decode())))
+        self.assertEqual([row["session_id"] for row in rows], ["session_1", "session_2", "session_0"])
+        self.assertEqual(self.client.get(self.url, {"source": "s3"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keep_leaves_rows(self):
+        """Test that --keep writes the archive without deleting anything"""
+        self.archive("--format", "ndjson", "--keep")
+        self.assertEqual(GameData.objects.count(), 4)
+        self.assertEqual(list_archives(self.archive_dir)[0]["deleted"], 0)
+        self.assertIn("No events", self.archive("--older-than-days", "100000"))
+
+    def test_kept_rows_archived_again_are_exported_once(self):
+        """Test that rows archived with --keep and then again export once, as their newest copy"""
+        before = self.export(event_at_before="2021-01-01T00:00:00Z")
+        self.archive("--format", "ndjson", "--keep")
+        GameData.objects.filter(session_id="session_1").update(game_level=42)
+        self.archive("--format", "ndjson")
+        self.assertEqual(len(list_archives(self.archive_dir)), 2)
+
+        rows = [json.loads(line) for line in self.export(source="archive", output="ndjson").splitlines()]
+        self.assertEqual([row["session_id"] for row in rows], ["session_1", "session_2", "session_0"])
+        self.assertEqual(rows[0]["game_level"], 42)
+        self.assertEqual(len(self.export(source="archive").splitlines()), len(before.splitlines()))
+
+    @skipUnless(game_data_archive.pyarrow, "pyarrow is not installed")
+    def test_parquet_archive(self):
+        """Test that a Parquet archive reads back as the same export"""
+        before = self.export(event_at_before="2021-01-01T00:00:00Z")
+        self.archive("--format", "parquet")
+        self.assertEqual(list_archives(self.archive_dir)[0]["format"], "parquet")
+        self.assertEqual(self.export(source="archive"), before)
+
+
+class IndexAuditTestCase(TestCase):
+    def test_audit_reports_plans_and_indexes(self):
+        """Test that the index audit explains the API's queries and maps them to indexes"""
+        with self.assertRaises(CommandError):
+            call_command("audit_indexes", stdout=io.StringIO())
+
+        GameData.objects.create(
+            event_at=timezone.now(),
+            event_type="game_start",
+            ip_address="192.168.1.1",
+            session_id="session_1",
+            game_level=1,
+            game_mode="classic",
+        )
+        out = io.StringIO()
+        call_command("audit_indexes", "--json", stdout=out)
+        report = json.loads(out.getvalue())
+
+        queries = {query["name"]: query for query in report["queries"]}
+        self.assertIn("gd_created_id_idx", queries["list"]["indexes"])
+        self.assertIn("gd_session_time_idx", queries["list session_id"]["indexes"])
+        self.assertIn("gd_session_time_idx", queries["session replay"]["indexes"])
+        self.assertIn("gd_cat_created_idx", queries["list event_category"]["indexes"])
+        self.assertIn("gd_level_mode_idx", queries["list game_level"]["indexes"])
+        self.assertIn("gd_level_mode_idx", queries["list game_level range"]["indexes"])
+        self.assertTrue(all(query["sql"] for query in report["queries"]))
+        self.assertIn("gd_mode_level_idx", [index["name"] for index in report["indexes"]])
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+class GameDataPartitioningTestCase(TestCase):
+    # DDL is transactional on PostgreSQL, so each test's rollback also undoes the conversion
+    def setUp(self):
+        self.event_id = uuid.uuid4()
+        self.event_at = add_months(month_start(timezone.now()), -2)
+        self.stored = self.create(event_at=self.event_at, event_id=self.event_id)
+        self.table = GameData._meta.db_table
+        apps = MigrationLoader(connection).project_state().apps
+        with self.settings(GAME_DATA_PARTITIONED=True), connection.schema_editor() as schema_editor:
+            import_module("sphere_game_data_api.migrations.0014_partition_game_data").partition_game_data(
+                apps, schema_editor
+            )
+            import_module("sphere_game_data_api.migrations.0019_game_data_event_id_ledger").add_event_id_ledger(
+                apps, schema_editor
+            )
+
+    def create(self, **fields):
+        return GameData.objects.create(**{
+            "event_type": "game_start",
+            "ip_address": "192.168.1.1",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+            **fields,
+        })
+
+    def assertEventIdTaken(self, event_at):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create(event_at=event_at, event_id=self.event_id)
+
+    def test_event_id_unique_across_partitions(self):
+        """Test that the migration partitions the table and event_id stays unique whatever the event_at"""
+        self.assertTrue(is_partitioned(connection, self.table))
+        self.assertEqual(GameData.objects.get(event_id=self.event_id).pk, self.stored.pk)
+        self.assertEventIdTaken(timezone.now())
+
+        replay = GameData(event_at=timezone.now(), event_id=self.event_id, event_type="game_start",
+                          ip_address="192.168.1.1", session_id="session_1", game_level=1, game_mode="classic")
+        with mock.patch.object(ingest, "_stored_event_ids", return_value=set()):  # Lost the race to the lookup
+            with self.assertRaises(IntegrityError):
+                ingest.insert_game_data_idempotent([replay])
+        self.assertEqual(ingest.insert_game_data_idempotent([replay]), [])
+
+        other = self.create(event_at=timezone.now())
+        other.event_id = self.event_id
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            other.save()
+
+    def test_ledger_follows_deletes_and_partition_changes(self):
+        """Test that deleted, moved and detached rows keep the ledger in step"""
+        # Beyond the monthly partitions: lands in the default partition, then moves to its own
+        far = add_months(month_start(timezone.now()), 12)
+        moved = self.create(event_at=far, event_id=uuid.uuid4())
+        self.assertTrue(create_partition(connection, self.table, far))
+        self.assertEqual(GameData.objects.get(event_id=moved.event_id).pk, moved.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create(event_at=timezone.now(), event_id=moved.event_id)
+
+        detach_partitions(connection, self.table, add_months(self.event_at, 1), drop=True)
+        self.assertFalse(GameData.objects.filter(pk=self.stored.pk).exists())
+        replayed = self.create(event_at=timezone.now(), event_id=self.event_id)
+        replayed.delete()
+        self.create(event_at=far, event_id=self.event_id)
+
+
+class RequestInstrumentationTestCase(APITestCase):
+    def setUp(self):
+        request_metrics.reset()
+        self.addCleanup(request_metrics.reset)
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.url = reverse("metrics")
+
+    def test_server_timing_header(self):
+        """Test that responses carry total, DB and serialization timings"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(reverse("game-data-list-create"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries", serialize;dur=[\d.]+$'
+        )
+
+        with self.settings(GAME_DATA_SERVER_TIMING=False):
+            response = self.client.get(reverse("game-data-list-create"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_metrics_requires_token_or_admin(self):
+        """Test that /metrics takes the metrics bearer token or an admin token"""
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+        with self.settings(METRICS_TOKEN="scrape-secret"):
+            self.client.credentials(HTTP_AUTHORIZATION="Bearer wrong")
+            response = self.client.get(self.url)
+            self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+            self.client.credentials(HTTP_AUTHORIZATION="Bearer scrape-secret")
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    def test_metrics_histograms_by_view(self):
+        """Test that request histograms are labelled by view and method"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        for _ in range(2):
+            self.client.get(reverse("game-data-list-create"))
+
+        body = self.client.get(self.url).content.decode()
+        labels = 'view="game-data-list-create",method="GET"'
+        self.assertIn(f'game_data_http_responses_total{{{labels},status="200"}} 2', body)
+        self.assertIn(f'game_data_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f'game_data_http_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'game_data_http_request_queries_count{{{labels}}} 2', body)
+        self.assertIn(f'game_data_http_response_size_bytes_count{{{labels}}} 2', body)
+        self.assertIn("# TYPE game_data_http_request_db_seconds histogram", body)
+
+    def test_disabled(self):
+        """Test that nothing is recorded with GAME_DATA_METRICS_ENABLED off"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        with self.settings(GAME_DATA_METRICS_ENABLED=False):
+            response = self.client.get(reverse("game-data-list-create"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(request_metrics.responses.series, {})
+
+
+class QueryBudgetTestCase(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "level_complete",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_456",
+            "game_level": 2,
+            "game_mode": "classic",
+            "game_color": "red",
+            "game_sequence": ["blue", "red"],
+            "game_player_input": ["blue", "red"],
+        }
+        for level in range(1, 21):
+            GameData.objects.create(
+                event_at=timezone.now(),
+                event_type="level_complete",
+                ip_address="192.168.1.1",
+                session_id="session_1",
+                game_level=level,
+                game_mode="classic",
+                game_color="red",
+            )
+
+    def test_read_budgets(self):
+        """Test that reads run a fixed, small number of queries"""
+        with self.assertQueryBudget(3):
+            self.client.get(reverse("game-data-list-create"))
+        with self.assertQueryBudget(3):
+            self.client.get(reverse("game-data-rud", kwargs={"pk": GameData.objects.first().pk}))
+        with self.assertQueryBudget(6):
+            self.client.get(reverse("game-data-stats"), {"source": "events"})
+        with self.assertQueryBudget(2):
+            response = self.client.get(reverse("game-data-export"))
+            b"".join(response.streaming_content)
+
+    def test_write_budgets(self):
+        """Test that ingest queries don't grow with the batch size"""
+        with self.assertQueryBudget(14):
+            self.client.post(reverse("game-data-list-create"), self.event, format="json")
+        with self.assertQueryBudget(14):
+            self.client.post(reverse("game-data-batch-create"), [self.event] * 50, format="json")
+
+    def test_detects_n_plus_one(self):
+        """Test that a repeated query shape fails the budget with the offending stack"""
+        with self.assertRaises(AssertionError) as raised:
+            with self.assertQueryBudget(100):
+                for event in GameData.objects.all()[:5]:
+                    GameData.objects.get(pk=event.pk)
+        self.assertIn("[duplicate] Same query run 5 times", str(raised.exception))
+
+    def test_middleware_logs_issues_with_view_stack(self):
+        """Test that the opt-in middleware logs slow queries with the stack into views.py"""
+        with self.settings(GAME_DATA_QUERY_INSPECTOR=True, GAME_DATA_SLOW_QUERY_MS=0, GAME_DATA_QUERY_BUDGET=0):
+            with self.assertLogs("sphere_game_data_api.query_inspector", "WARNING") as logs:
+                self.client.get(reverse("game-data-stats"), {"source": "events"})
+        output = "\n".join(logs.output)
+        self.assertIn("[budget]", output)
+        self.assertIn("[slow]", output)
+        self.assertIn("sphere_game_data_api/views.py", output)
+
+
+class GameSessionTestCase(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.url = reverse("game-session", kwargs={"session_id": "session_1"})
+        events = [
+            # (minute, event_type, level, sequence, player input, retries)
+            (0, "game_start", 1, [], [], 0),
+            (1, "level_complete", 1, ["red", "blue"], ["red", "blue"], 0),
+            (3, "level_failed", 2, ["red", "blue", "green"], ["red", "green", "green"], 1),
+            (5, "level_complete", 2, ["red", "blue", "green"], ["red", "blue", "green"], 2),
+        ]
+        # Inserted out of order; the replay follows event_at
+        for minute, event_type, level, sequence, player_input, retries in reversed(events):
+            GameData.objects.create(
+                event_at=datetime(2024, 1, 1, 12, minute, tzinfo=dt_timezone.utc),
+                event_type=event_type,
+                ip_address="192.168.1.1",
+                session_id="session_1",
+                game_level=level,
+                game_mode="classic",
+                game_color="red",
+                game_sequence=sequence,
+                game_player_input=player_input,
+                retry_count=retries,
+            )
+        GameData.objects.create(
+            event_at=datetime(2024, 1, 1, 12, 2, tzinfo=dt_timezone.utc),
+            event_type="level_complete",
+            ip_address="192.168.1.1",
+            session_id="session_2",
+            game_level=9,
+            game_mode="classic",
+        )
+
+    def replay(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_requires_admin(self):
+        """Test that session replays are admin only"""
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_replay_events_in_order(self):
+        """Test that only the session's events are streamed, oldest first, as the API represents them"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        body = self.replay()
+        self.assertEqual(body["session_id"], "session_1")
+        self.assertEqual([event["event_type"] for event in body["events"]],
+                         ["game_start", "level_complete", "level_failed", "level_complete"])
+        expected = GameDataSerializer(GameData.objects.get(pk=body["events"][0]["id"])).data
+        self.assertEqual(body["events"][0], json.loads(JSONRenderer().render(expected)))
+
+    def test_summary(self):
+        """Test that the summary covers levels, accuracy, retries and duration"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        summary = self.replay()["summary"]
+        self.assertEqual(summary["events"], 4)
+        self.assertEqual(summary["started_at"], "2024-01-01T12:00:00Z")
+        self.assertEqual(summary["duration_seconds"], 300.0)
+        self.assertEqual(summary["levels_reached"], [1, 2])
+        self.assertEqual(summary["highest_level"], 2)
+        self.assertEqual(summary["levels_completed"], [1, 2])
+        self.assertEqual(summary["colors_expected"], 8)
+        self.assertEqual(summary["colors_correct"], 7)
+        self.assertEqual(summary["accuracy"], 0.875)
+        self.assertEqual(summary["sequences_matched"], 2)
+        self.assertEqual(summary["total_retries"], 3)
+
+    def test_single_query(self):
+        """Test that the replay and its summary come from one query"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.replay()
+        with self.assertQueryBudget(1):
+            self.replay()
+
+    def test_unknown_session(self):
+        """Test that a session without events is a 404"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(reverse("game-session", kwargs={"session_id": "missing"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PlayerStatsTestCase(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "level_complete",
+            "ip_address": "192.168.1.2",
+            "player_id": "player_001",
+            "session_id": "session_1",
+            "game_level": 1,
+            "game_mode": "classic",
+            "game_color": "red",
+            "game_sequence": ["red", "blue"],
+            "game_player_input": ["red", "blue"],
+        }
+
+    def ingest(self):
+        self.client.post(reverse("game-data-list-create"), self.event, format="json")
+        self.client.post(reverse("game-data-batch-create"), [
+            dict(self.event, game_level=3, event_at="2024-01-01T12:05:00Z",
+                 game_sequence=["red", "blue", "green"], game_player_input=["red", "green", "green"]),
+            dict(self.event, game_level=2, session_id="session_2", event_at="2024-01-02T09:00:00Z"),
+            dict(self.event, player_id="player_002", game_level=5),
+            dict(self.event, player_id="player_003", game_level=3, game_mode="speed"),
+            dict(self.event, player_id="", game_level=9),
+        ], format="json")
+        self.client.post(reverse("game-data-list-create"), dict(self.event, game_level=2), format="json")
+
+    def test_updated_on_ingest(self):
+        """Test that player stats are maintained incrementally as events arrive"""
+        self.ingest()
+        stats = PlayerStats.objects.get(player_id="player_001", game_mode="classic")
+        self.assertEqual(stats.highest_level, 3)
+        self.assertEqual(stats.sessions_played, 2)
+        self.assertEqual(stats.event_count, 4)
+        self.assertEqual((stats.colors_expected, stats.colors_correct), (9, 8))
+        self.assertEqual(stats.accuracy, round(8 / 9, 4))
+        self.assertEqual(stats.last_seen, datetime(2024, 1, 2, 9, tzinfo=dt_timezone.utc))
+        # Events without a player_id aren't attributed to anyone
+        self.assertEqual(PlayerStats.objects.count(), 3)
+
+    def test_rebuild_matches_incremental(self):
+        """Test that rebuild_player_stats recomputes the same rows"""
+        self.ingest()
+        fields = ("player_id", "game_mode", "highest_level", "sessions_played", "event_count",
+                  "colors_expected", "colors_correct", "last_seen")
+        incremental = list(PlayerStats.objects.order_by("player_id", "game_mode").values_list(*fields))
+        PlayerStats.objects.update(highest_level=0)
+
+        out = io.StringIO()
+        call_command("rebuild_player_stats", stdout=out)
+        self.assertIn("Rebuilt 3 player stats rows", out.getvalue())
+        self.assertEqual(list(PlayerStats.objects.order_by("player_id", "game_mode").values_list(*fields)), incremental)
+
+    def test_leaderboard(self):
+        """Test that the leaderboard ranks a mode's players by highest level in one query"""
+        self.ingest()
+        url = reverse("leaderboard", kwargs={"game_mode": "classic"})
+        response = self.client.get(url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        self.client.get(url)
+        with self.assertQueryBudget(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(player["rank"], player["player_id"], player["highest_level"]) for player in response.data["players"]],
+            [(1, "player_002", 5), (2, "player_001", 3)]
+        )
+
+        response = self.client.get(url, {"limit": 1})
+        self.assertEqual([player["player_id"] for player in response.data["players"]], ["player_002"])
+        for limit in ("0", "1000", "ten"):
+            response = self.client.get(url, {"limit": limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GameColorEncodingTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin_test",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin_user)
+        self.event = {
+            "event_at": "2024-01-01T12:00:00Z",
+            "event_type": "level_complete",
+            "ip_address": "192.168.1.2",
+            "session_id": "session_1",
+            "game_level": 3,
+            "game_mode": "classic",
+            "game_color": "red",
+            "game_sequence": ["red", "blue", "green"],
+            "game_player_input": ["red", "blue"],
+        }
+
+    def stored(self, pk, field="game_sequence"):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {field} FROM {GameData._meta.db_table} WHERE id = %s", [pk])
+            return bytes(cursor.fetchone()[0])
+
+    def create(self, **changes):
+        response = self.client.post(reverse("game-data-list-create"), dict(self.event, **changes), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def test_colours_stored_as_codes(self):
+        """Test that colour lists are stored as one byte per colour and read back unchanged"""
+        pk = self.create()
+        codes = dict(GameColor.objects.values_list("name", "id"))
+        self.assertEqual(self.stored(pk), bytes([1, codes["red"], codes["blue"], codes["green"]]))
+        self.assertEqual(self.stored(pk, "game_player_input"), bytes([1, codes["red"], codes["blue"]]))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token.key}")
+        response = self.client.get(reverse("game-data-rud", kwargs={"pk": pk}))
+        self.assertEqual(response.data["game_sequence"], ["red", "blue", "green"])
+        self.assertEqual(response.data["game_player_input"], ["red", "blue"])
+        self.assertEqual(GameData.objects.values_list("game_sequence", flat=True).get(pk=pk), ["red", "blue", "green"])
+
+    def test_unknown_colours_stored_as_json(self):
+        """Test that ingest never adds colours: unknown names are stored as JSON until an admin adds them"""
+        colours = GameColor.objects.count()
+        pk = self.create(game_sequence=["red", "purple"])
+        self.assertEqual(self.stored(pk), b'\x00["red","purple"]')
+        self.assertEqual(GameColor.objects.count(), colours)
+        self.assertEqual(GameData.objects.get(pk=pk).game_sequence, ["red", "purple"])
+
+        purple = GameColor.objects.create(name="purple")
+        pk = self.create(game_sequence=["red", "purple"])
+        self.assertEqual(self.stored(pk), bytes([1, GameColor.objects.get(name="red").pk, purple.pk]))
+        self.assertEqual(GameData.objects.get(pk=pk).game_sequence, ["red", "purple"])
+
+    def test_colours_added_elsewhere_are_picked_up(self):
+        """Test that codes written by another process are decoded, and new names used after the TTL"""
+        self.create()
+        GameColor.objects.bulk_create([GameColor(name="teal")])  # No signal, as in another process
+        teal = GameColor.objects.get(name="teal")
+        GameData.objects.filter(event_type="level_complete").update(game_sequence=bytes([1, teal.pk]))
+        self.assertEqual(GameData.objects.get().game_sequence, ["teal"])
+
+        with self.settings(GAME_DATA_COLOR_DICTIONARY_TTL=0):
+            pk = self.create(game_sequence=["teal"])
+        self.assertEqual(self.stored(pk), bytes([1, teal.pk]))
+
+    def test_comparison_lookups_are_refused(self):
+        """Test that lookups on colour lists fail loudly, since the stored bytes depend on the dictionary"""
+        pk = self.create(game_sequence=["red", "teal"])
+        colours = GameColor.objects.count()
+        for lookup in ("game_sequence", "game_sequence__in", "game_player_input__exact"):
+            with self.assertRaises(FieldError):
+                list(GameData.objects.filter(**{lookup: [["red", "teal"]] if lookup.endswith("in") else ["red"]}))
+        self.assertEqual(list(GameData.objects.filter(game_sequence__isnull=False).values_list("pk", flat=True)), [pk])
+        self.assertEqual(GameColor.objects.count(), colours)
+
+    def test_admin_adds_colours_but_cannot_change_them(self):
+        """Test that colours are admitted in the admin, and can't be renamed or deleted there"""
+        self.client.force_login(self.admin_user)
+        response = self.client.post(reverse("admin:sphere_game_data_api_gamecolor_add"), {"name": "purple"})
+        self.assertEqual(response.status_code, 302)
+        purple = GameColor.objects.get(name="purple")
+
+        url = reverse("admin:sphere_game_data_api_gamecolor_change", args=[purple.pk])
+        self.client.post(url, {"name": "violet"})
+        self.assertEqual(GameColor.objects.get(pk=purple.pk).name, "purple")
+        response = self.client.post(reverse("admin:sphere_game_data_api_gamecolor_delete", args=[purple.pk]), {"post": "yes"})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(GameColor.objects.filter(pk=purple.pk).exists())
+
+    def test_other_json_stored_as_json(self):
+        """Test that values that aren't colour lists keep round-tripping as JSON"""
+        pk = self.create(game_sequence=[1, {"colour": "red"}], game_player_input={"a": None})
+        self.assertEqual(self.stored(pk)[0], 0)
+        instance = GameData.objects.get(pk=pk)
+        self.assertEqual(instance.game_sequence, [1, {"colour": "red"}])
+        self.assertEqual(instance.game_player_input, {"a": None})
+
+    def test_json_fallback(self):
+        """Test that GAME_DATA_PACKED_COLORS=False stores JSON instead"""
+        with self.settings(GAME_DATA_PACKED_COLORS=False):
+            pk = self.create()
+        self.assertEqual(self.stored(pk), b'\x00["red","blue","green"]')
+        self.assertEqual(GameData.objects.get(pk=pk).game_sequence, ["red", "blue", "green"])
+
+    def test_api_schema_unchanged(self):
+        """Test that the serializer still exposes the colour lists as JSON fields"""
+        fields = GameDataSerializer().fields
+        for name in ("game_sequence", "game_player_input"):
+            self.assertEqual(type(fields[name]).__name__, "JSONField")
+            self.assertFalse(fields[name].required)
+            self.assertFalse(fields[name].read_only)
@@ -1,8 +1,18 @@
+import io
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.test import RequestFactory, TestCase
 from unittest.mock import patch, MagicMock
 from rest_framework.test import force_authenticate
 from rest_framework import status
 
+from sphere_game_data_api.benchmarks import summarize
+from sphere_game_data_api.query_inspector import QueryInspection, QueryRecord, query_shape
+from sphere_game_data_api.partitions import add_months, month_start, partition_month, partition_name
+from sphere_game_data_api.throttling import IngestRateThrottle
 from sphere_game_data_api.views import LoginAPIView  # Replace with your actual path
 
 class LoginAPIViewUnitTest(TestCase):
@@ -69,3 +79,87 @@ class LoginAPIViewUnitTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('username', response.data)
+
+
+class BenchmarkSummaryUnitTest(TestCase):
+    def test_percentiles(self):
+        latencies = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+        result = summarize('create', latencies, errors=2, elapsed=2.0)
+        self.assertEqual(result['requests'], 100)
+        self.assertEqual(result['errors'], 2)
+        self.assertEqual(result['rps'], 50.0)
+        self.assertEqual((result['p50_ms'], result['p95_ms'], result['p99_ms']), (50.0, 95.0, 99.0))
+
+    def test_empty_run(self):
+        result = summarize('list', [], errors=0, elapsed=0)
+        self.assertIsNone(result['p50_ms'])
+        self.assertIsNone(result['rps'])
+
+
+class SlidingWindowThrottleUnitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.request = RequestFactory().post('/api/game-data/', REMOTE_ADDR='10.0.0.1')
+        self.now = 600.0  # Start of a one-minute window
+
+    def allow(self):
+        throttle = IngestRateThrottle()
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_previous_window_is_weighted(self):
+        rates = {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'ingest': '4/min'}
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}):
+            self.assertEqual([self.allow()[0] for _ in range(4)], [True] * 4)
+            allowed, throttle = self.allow()
+            self.assertFalse(allowed)
+            self.assertEqual(throttle.wait(), 60.0)  # Full window; only the next one has room
+
+            # Halfway through the next window only half of the previous 4 still count
+            self.now += 90
+            self.assertEqual([self.allow()[0] for _ in range(3)], [True, True, False])
+
+    def test_no_rate_allows_everything(self):
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}):
+            self.assertTrue(all(self.allow()[0] for _ in range(10)))
+
+
+class PartitionHelpersUnitTest(TestCase):
+    def test_month_arithmetic(self):
+        month = month_start(datetime(2024, 11, 17, 8, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(month, datetime(2024, 11, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(add_months(month, 2), datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(add_months(month, -11), datetime(2023, 12, 1, tzinfo=dt_timezone.utc))
+
+    def test_partition_names_round_trip(self):
+        month = datetime(2025, 3, 1, tzinfo=dt_timezone.utc)
+        name = partition_name('game_data', month)
+        self.assertEqual(name, 'game_data_p202503')
+        self.assertEqual(partition_month('game_data', name), month)
+        self.assertIsNone(partition_month('game_data', 'game_data_default'))
+
+    def test_command_needs_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('manage_partitions', stdout=io.StringIO())
+
+
+class QueryInspectorUnitTest(TestCase):
+    def test_query_shape_collapses_literals_and_lists(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "mode" = \'x\' LIMIT 21'),
+            'SELECT * FROM "t" WHERE "id" IN (...) AND "mode" = ? LIMIT ?'
+        )
+        self.assertEqual(
+            query_shape('INSERT INTO "t" ("a", "b") VALUES (%s, %s), (%s, %s) RETURNING "t"."id"'),
+            'INSERT INTO "t" ("a", "b") VALUES (...) RETURNING "t"."id"'
+        )
+
+    def test_issues(self):
+        inspection = QueryInspection()
+        inspection.queries = [
+            QueryRecord('default', f'SELECT * FROM "t" WHERE "id" = {pk}', 0.001, []) for pk in range(3)
+        ] + [QueryRecord('default', 'UPDATE "t" SET "a" = %s', 0.5, [])]
+        kinds = [issue['kind'] for issue in inspection.issues(budget=3, slow_ms=100, duplicate_threshold=3)]
+        self.assertEqual(kinds, ['budget', 'duplicate', 'slow'])
+        self.assertEqual(inspection.issues(budget=4, slow_ms=1000, duplicate_threshold=4), [])
@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding window counter throttle:
+    - Each key keeps two integer counters, the current and the previous fixed window
+    - The previous window is weighted by how much of it still overlaps the sliding window
+    - Counters are bumped with cache.incr, so the state per key is O(1) and updates are
+      atomic on shared backends (Redis); the default LocMemCache is the local stand-in
+    The cache is THROTTLE_CACHE_ALIAS and rates are read from DEFAULT_THROTTLE_RATES on
+    every request; a rate of None disables the throttle.
+    """
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key = f'{self.key}:{window}'
+        previous_key = f'{self.key}:{window - 1}'
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current_count = counts.get(current_key, 0)
+        self.previous_count = counts.get(previous_key, 0)
+        self.elapsed = self.now - window * self.duration
+
+        if self.estimate(self.elapsed) >= self.num_requests:
+            return self.throttle_failure()
+
+        # The counter outlives its window by one more, while it is the "previous" one
+        self.cache.add(current_key, 0, timeout=int(2 * self.duration) + 1)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            self.cache.set(current_key, 1, timeout=int(2 * self.duration) + 1)
+        return self.throttle_success()
+
+    def estimate(self, elapsed):
+        overlap = max(0.0, 1 - elapsed / self.duration)
+        return self.previous_count * overlap + self.current_count
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        remaining_in_window = self.duration - self.elapsed
+        if self.current_count >= self.num_requests or not self.previous_count:
+            # Only the next window brings room back
+            return remaining_in_window
+        # Time until the previous window's weight has dropped enough
+        needed = self.duration * (1 - (self.num_requests - self.current_count) / self.previous_count) - self.elapsed
+        return min(remaining_in_window, max(needed, 0.0))
+
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle):
+    """Limits unauthenticated requests per IP address (scope: anon)"""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserSlidingWindowThrottle(SlidingWindowRateThrottle):
+    """Limits requests per user, or per IP address when unauthenticated (scope: user)"""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class IngestRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits event ingestion per IP address (scope: ingest), separately from the
+    anon/user limits so heavy event posting doesn't use up the anon budget.
+    A batch request counts as one request.
+    """
+    scope = 'ingest'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
@@ -1,5 +1,13 @@
 from django.urls import path
+from .async_views import GameDataAsyncBatchCreateView, GameDataAsyncCreateView
 from .views import (
+    GameDataBatchCreateView,
+    GameDataConnectionsView,
+    GameSessionView,
+    LeaderboardView,
+    GameDataExportView,
+    GameDataSpoolView,
+    GameDataStatsView,
     GameDataListCreateView,
     GameDataRetrieveUpdateDestroyView,
     LoginAPIView,
@@ -10,5 +18,14 @@ urlpatterns = [
     path("login/", LoginAPIView.as_view(), name="login"),
     path("logout/", LogoutAPIView.as_view(), name="logout"),
     path("game-data/", GameDataListCreateView.as_view(), name="game-data-list-create"),
+    path("game-data/async/", GameDataAsyncCreateView.as_view(), name="game-data-async-create"),
+    path("game-data/async/batch/", GameDataAsyncBatchCreateView.as_view(), name="game-data-async-batch-create"),
+    path("game-data/batch/", GameDataBatchCreateView.as_view(), name="game-data-batch-create"),
+    path("game-data/export/", GameDataExportView.as_view(), name="game-data-export"),
+    path("game-data/stats/", GameDataStatsView.as_view(), name="game-data-stats"),
+    path("game-data/spool/", GameDataSpoolView.as_view(), name="game-data-spool"),
+    path("game-data/connections/", GameDataConnectionsView.as_view(), name="game-data-connections"),
+    path("leaderboard/<str:game_mode>/", LeaderboardView.as_view(), name="leaderboard"),
+    path("sessions/<str:session_id>/", GameSessionView.as_view(), name="game-session"),
     path("game-data/<int:pk>/", GameDataRetrieveUpdateDestroyView.as_view(), name="game-data-rud"),
 ]
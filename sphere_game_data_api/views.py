@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, logout
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
@@ -5,18 +6,43 @@ from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import transaction
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
+import itertools
 import logging
 
 logger = logging.getLogger(__name__)
 
+from sphere_game_data_api.db_connections import connection_report
+from sphere_game_data_api.instrumentation import request_metrics
+from sphere_game_data_api.archive import archived_rows
+from sphere_game_data_api.exports import csv_lines, export_rows, ndjson_lines
+from sphere_game_data_api.filters import GameDataFilterBackend
 from sphere_game_data_api.models import GameData
-from sphere_game_data_api.permissions import IsAdminOrReadOnly
+from sphere_game_data_api.pagination import GameDataCursorPagination
+from sphere_game_data_api.mixins import CachedResponseMixin
+from sphere_game_data_api.permissions import HasMetricsToken, IsAdminOrReadOnly
+from sphere_game_data_api.renderers import PreRenderedResponse, fast_reads_enabled, render_instance
+from sphere_game_data_api.response_cache import row_etag
+from sphere_game_data_api.rollups import leaderboard
+from sphere_game_data_api.session_replay import session_body, session_rows
+from sphere_game_data_api.spool import get_spool, to_payload, write_behind_enabled
+from sphere_game_data_api.stats import (
+    HISTOGRAM_BUCKETS,
+    ROLLUP_UNSUPPORTED_FILTERS,
+    STATS_SOURCES,
+    compute_game_data_stats,
+    compute_rollup_stats,
+)
+from sphere_game_data_api.throttling import IngestRateThrottle
 
 from .serializers import (
     GameDataSerializer,
     LoginSerializer,
     LogoutSerializer,
+    PlayerStatsSerializer,
 )
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -79,24 +105,60 @@ class LogoutAPIView(APIView):
         )
 
 
-class GameDataListCreateView(generics.ListCreateAPIView):
-    queryset = GameData.objects.all().order_by("-created_at")
+class GameDataListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
+    queryset = GameData.objects.all().order_by("-created_at", "-id")
     serializer_class = GameDataSerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = GameDataCursorPagination
+    filter_backends = [GameDataFilterBackend]
+
+    def get_throttles(self):
+        # Ingestion has its own limit instead of sharing the anon/user budget
+        if self.request.method == 'POST':
+            return [IngestRateThrottle()]
+        return super().get_throttles()
+
+    def get_response_cache_key_parts(self, request):
+        # Normalized: parsed filter values, so equivalent query strings share an entry
+        filters = GameDataFilterBackend().get_filter_kwargs(request.query_params)
+        return (
+            'list',
+            sorted(filters.items()),
+            request.query_params.get(self.paginator.cursor_query_param),
+            self.paginator.get_page_size(request),
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_list_response(request)
 
     @swagger_auto_schema(
-        operation_description="List all game data (Admin only)",
-        responses={200: GameDataSerializer(many=True)},
+        operation_description=(
+            "List game data, newest first, one cursor page at a time (Admin only). "
+            "Filter with query parameters on event time, type, category, level, mode, "
+            "session, IP address and player. Responses carry an ETag and Last-Modified; "
+            "send If-None-Match / If-Modified-Since to get 304 while nothing has changed."
+        ),
+        responses={
+            200: GameDataSerializer(many=True),
+            304: "Not Modified - No game data written since the given ETag / date"
+        },
         security=[{"Token": []}]
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
     @swagger_auto_schema(
-        operation_description="Create a new game data entry (Anyone can create)",
+        operation_description=(
+            "Create a new game data entry (Anyone can create). "
+            "Sending an optional client-generated event_id makes retries safe: a repeated "
+            "event_id returns the stored row with 200 instead of inserting a duplicate. "
+            "In write-behind mode the event is queued and 202 is returned with its event_id."
+        ),
         request_body=GameDataSerializer,
         responses={
+            200: openapi.Response("Event with this event_id already stored; original row returned", GameDataSerializer),
             201: GameDataSerializer,
+            202: "Accepted - Event queued for write-behind insertion",
             400: "Bad Request - Invalid data",
             500: "Internal Server Error"
         },
@@ -116,16 +178,479 @@ class GameDataListCreateView(generics.ListCreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if not write_behind_enabled():
+            self.perform_create(serializer)
+            # A replayed event_id returns the original row with 200 instead of 201
+            status_code = status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
+            if fast_reads_enabled(request):
+                return PreRenderedResponse(render_instance(serializer.instance), status=status_code)
+            return Response(serializer.data, status=status_code, headers=self.get_success_headers(serializer.data))
+
+        payload = to_payload(serializer.validated_data)
+        get_spool().enqueue([payload])
+        return Response(
+            {'queued': True, 'event_id': payload['event_id']},
+            status=status.HTTP_202_ACCEPTED
+        )
+
 
-class GameDataRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class GameDataBatchCreateView(generics.GenericAPIView):
     queryset = GameData.objects.all()
     serializer_class = GameDataSerializer
     permission_classes = [IsAdminOrReadOnly]
+    throttle_classes = [IngestRateThrottle]
 
     @swagger_auto_schema(
-        operation_description="Retrieve game data by ID (Admin only)", 
+        operation_description=(
+            "Create many game data entries in one request (Anyone can create). "
+            "Valid events are inserted in a single transaction; invalid events are "
+            "reported per index without rejecting the rest of the batch. "
+            "Events whose event_id is already stored are not inserted again; 'ids' then "
+            "holds the original row id and they are counted in 'duplicates'. "
+            "In write-behind mode valid events are queued and 202 is returned with "
+            "'queued' and 'event_ids' instead of 'created' and 'ids'."
+        ),
+        request_body=GameDataSerializer(many=True),
+        responses={
+            201: openapi.Response(
+                description="Batch processed",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'created': openapi.Schema(type=openapi.TYPE_INTEGER, example=2),
+                        'failed': openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                        'duplicates': openapi.Schema(type=openapi.TYPE_INTEGER, example=0),
+                        'ids': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                            example=[101, 102]
+                        ),
+                        'errors': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                            example=[{'index': 1, 'errors': {'game_level': ['A valid integer is required.']}}]
+                        ),
+                    }
+                )
+            ),
+            400: "Bad Request - No valid events in the batch",
+        },
+        security=[]
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            max_length=getattr(settings, 'GAME_DATA_BATCH_MAX_SIZE', 5000),
+        )
+        serializer.is_valid(raise_exception=True)
+        item_errors = serializer.item_errors
+
+        if not serializer.validated_data:
+            return Response(
+                {'created': 0, 'failed': len(item_errors), 'duplicates': 0, 'ids': [], 'errors': item_errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if write_behind_enabled():
+            payloads = [to_payload(attrs) for attrs in serializer.validated_data]
+            get_spool().enqueue(payloads)
+            return Response(
+                {
+                    'queued': len(payloads),
+                    'failed': len(item_errors),
+                    'event_ids': [payload['event_id'] for payload in payloads],
+                    'errors': item_errors,
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        try:
+            instances = serializer.save()
+        except Exception as e:
+            logger.error(f"Error creating game data batch: {e}")
+            return Response(
+                {
+                    'error': True,
+                    'message': 'Failed to create game data batch',
+                    'details': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {
+                'created': serializer.created_count,
+                'failed': len(item_errors),
+                'duplicates': len(instances) - serializer.created_count,
+                'ids': [instance.pk for instance in instances],
+                'errors': item_errors,
+            },
+            status=status.HTTP_201_CREATED if serializer.created_count else status.HTTP_200_OK
+        )
+
+
+class GameDataExportView(generics.GenericAPIView):
+    queryset = GameData.objects.all().order_by("event_at", "id")
+    serializer_class = GameDataSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [GameDataFilterBackend]
+    pagination_class = None
+
+    export_formats = {
+        'ndjson': (ndjson_lines, 'application/x-ndjson'),
+        'csv': (csv_lines, 'text/csv'),
+    }
+    export_sources = ('events', 'archive')
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Stream game data as NDJSON or CSV, oldest first (Admin only). "
+            "Accepts the same filters as the list endpoint. With source=archive the "
+            "events moved out of the database by archive_game_data are exported instead."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'output', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=['ndjson', 'csv'], default='ndjson',
+                description="Export format"
+            ),
+            openapi.Parameter(
+                'source', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=list(export_sources), default='events',
+                description="Export events from the database or from the archive files"
+            ),
+        ],
+        responses={
+            200: "Streamed NDJSON (one event per line) or CSV (header row first)",
+            400: "Bad Request - Invalid filter or format",
+            401: "Authentication required"
+        },
+        security=[{"Token": []}]
+    )
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in self.export_formats:
+            raise ValidationError({'output': [f'Unsupported format "{output}". Use one of: ndjson, csv.']})
+
+        source = request.query_params.get('source', 'events')
+        if source not in self.export_sources:
+            raise ValidationError({'source': [f'Unsupported source "{source}". Use one of: events, archive.']})
+
+        lines, content_type = self.export_formats[output]
+        if source == 'archive':
+            rows = archived_rows(GameDataFilterBackend().get_filter_kwargs(request.query_params))
+        else:
+            chunk_size = getattr(settings, 'GAME_DATA_EXPORT_CHUNK_SIZE', 2000)
+            rows = export_rows(self.filter_queryset(self.get_queryset()), chunk_size)
+
+        response = StreamingHttpResponse(lines(rows), content_type=content_type)
+        filename = f"game-data-{timezone.now():%Y%m%dT%H%M%SZ}.{output}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class GameSessionView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Replay one play session (Admin only): every event of the session in event_at "
+            "order, streamed, followed by a summary computed in the same pass (levels "
+            "reached and completed, accuracy of the player input against the sequence, "
+            "total retries and duration)."
+        ),
+        responses={
+            200: openapi.Response(
+                description="Streamed JSON: {session_id, events: [...], summary: {...}}",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'session_id': openapi.Schema(type=openapi.TYPE_STRING, example='session_123'),
+                        'events': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                        'summary': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'events': openapi.Schema(type=openapi.TYPE_INTEGER, example=42),
+                                'started_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                                'ended_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                                'duration_seconds': openapi.Schema(type=openapi.TYPE_NUMBER, example=315.2),
+                                'game_modes': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING)),
+                                'levels_reached': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                                'highest_level': openapi.Schema(type=openapi.TYPE_INTEGER, example=7),
+                                'levels_completed': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                                'colors_expected': openapi.Schema(type=openapi.TYPE_INTEGER, example=120),
+                                'colors_correct': openapi.Schema(type=openapi.TYPE_INTEGER, example=111),
+                                'accuracy': openapi.Schema(type=openapi.TYPE_NUMBER, example=0.925, x_nullable=True),
+                                'sequences_matched': openapi.Schema(type=openapi.TYPE_INTEGER, example=35),
+                                'total_retries': openapi.Schema(type=openapi.TYPE_INTEGER, example=6),
+                            }
+                        ),
+                    }
+                )
+            ),
+            401: "Authentication required",
+            404: "No events for this session"
+        },
+        security=[{"Token": []}]
+    )
+    def get(self, request, session_id):
+        rows = session_rows(session_id, getattr(settings, 'GAME_DATA_EXPORT_CHUNK_SIZE', 2000))
+        first = next(rows, None)
+        if first is None:
+            return Response({
+                'error': True,
+                'message': 'Session not found',
+                'details': f'No events for session "{session_id}"'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return StreamingHttpResponse(
+            session_body(session_id, itertools.chain([first], rows)), content_type='application/json'
+        )
+
+
+class LeaderboardView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Top players of a game mode by highest level reached, from the PlayerStats table "
+            "kept up to date on ingest (Admin only). Ties are ordered by player_id."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=10,
+                description="Number of players, at most GAME_DATA_LEADERBOARD_MAX_LIMIT"
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Leaderboard",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'game_mode': openapi.Schema(type=openapi.TYPE_STRING, example='classic'),
+                        'players': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'rank': openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                                    'player_id': openapi.Schema(type=openapi.TYPE_STRING, example='player_001'),
+                                    'highest_level': openapi.Schema(type=openapi.TYPE_INTEGER, example=12),
+                                    'sessions_played': openapi.Schema(type=openapi.TYPE_INTEGER, example=8),
+                                    'event_count': openapi.Schema(type=openapi.TYPE_INTEGER, example=230),
+                                    'accuracy': openapi.Schema(type=openapi.TYPE_NUMBER, example=0.9412, x_nullable=True),
+                                    'last_seen': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            400: "Bad Request - Invalid limit",
+            401: "Authentication required"
+        },
+        security=[{"Token": []}]
+    )
+    def get(self, request, game_mode):
+        max_limit = getattr(settings, 'GAME_DATA_LEADERBOARD_MAX_LIMIT', 100)
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            raise ValidationError({'limit': [f'Must be an integer between 1 and {max_limit}.']})
+
+        players = PlayerStatsSerializer(leaderboard(game_mode, limit), many=True).data
+        return Response({
+            'game_mode': game_mode,
+            'players': [{'rank': rank, **player} for rank, player in enumerate(players, 1)],
+        }, status=status.HTTP_200_OK)
+
+
+class GameDataStatsView(generics.GenericAPIView):
+    queryset = GameData.objects.all()
+    serializer_class = GameDataSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [GameDataFilterBackend]
+    pagination_class = None
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Aggregated game data computed in the database (Admin only): counts per event type "
+            "and category, level completion rates per game mode and level, average retry count "
+            "and an event_at histogram. Accepts the same filters as the list endpoint. "
+            "With source=rollups the figures come from the pre-aggregated rollup tables; "
+            "time filters then apply per hour and session_id, ip_address and player_id "
+            "are not available."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'bucket', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=list(HISTOGRAM_BUCKETS), default='day',
+                description="Histogram bucket size"
+            ),
+            openapi.Parameter(
+                'source', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=list(STATS_SOURCES), default='events',
+                description="Aggregate raw events or read the rollup tables"
+            ),
+        ],
+        responses={
+            200: "Aggregated statistics",
+            400: "Bad Request - Invalid filter or bucket",
+            401: "Authentication required"
+        },
+        security=[{"Token": []}]
+    )
+    def get(self, request, *args, **kwargs):
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in HISTOGRAM_BUCKETS:
+            raise ValidationError({'bucket': [f'Unsupported bucket "{bucket}". Use one of: {", ".join(HISTOGRAM_BUCKETS)}.']})
+
+        source = request.query_params.get('source', 'events')
+        if source not in STATS_SOURCES:
+            raise ValidationError({'source': [f'Unsupported source "{source}". Use one of: {", ".join(STATS_SOURCES)}.']})
+
+        if source == 'rollups':
+            unsupported = [param for param in ROLLUP_UNSUPPORTED_FILTERS if request.query_params.get(param)]
+            if unsupported:
+                raise ValidationError({param: ['Not available with source=rollups.'] for param in unsupported})
+            filters = GameDataFilterBackend().get_filter_kwargs(request.query_params)
+            return Response(compute_rollup_stats(filters, bucket=bucket), status=status.HTTP_200_OK)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = compute_game_data_stats(
+            queryset,
+            bucket=bucket,
+            completion_event=getattr(settings, 'GAME_DATA_COMPLETION_EVENT', 'level_complete'),
+        )
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+class GameDataSpoolView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Write-behind queue depth and age of the oldest queued event (Admin only)",
+        responses={
+            200: openapi.Response(
+                description="Queue statistics",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'write_behind': openapi.Schema(type=openapi.TYPE_BOOLEAN, example=True),
+                        'depth': openapi.Schema(type=openapi.TYPE_INTEGER, example=120),
+                        'oldest_age_seconds': openapi.Schema(type=openapi.TYPE_NUMBER, example=1.5),
+                    }
+                )
+            ),
+            401: "Authentication required"
+        },
+        security=[{"Token": []}]
+    )
+    def get(self, request):
+        return Response(
+            {'write_behind': write_behind_enabled(), **get_spool().stats()},
+            status=status.HTTP_200_OK
+        )
+
+
+class GameDataConnectionsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Database connection settings and how often requests reuse a connection "
+            "instead of opening one, since this process started (Admin only)"
+        ),
+        responses={
+            200: openapi.Response(
+                description="Connection statistics",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'requests': openapi.Schema(type=openapi.TYPE_INTEGER, example=1200),
+                        'databases': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            additional_properties=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'vendor': openapi.Schema(type=openapi.TYPE_STRING, example='postgresql'),
+                                    'conn_max_age': openapi.Schema(type=openapi.TYPE_INTEGER, example=60),
+                                    'health_checks': openapi.Schema(type=openapi.TYPE_BOOLEAN, example=True),
+                                    'pooled': openapi.Schema(type=openapi.TYPE_BOOLEAN, example=False),
+                                    'connections_opened': openapi.Schema(type=openapi.TYPE_INTEGER, example=14),
+                                    'reuse_ratio': openapi.Schema(type=openapi.TYPE_NUMBER, example=0.9883),
+                                    'pool': openapi.Schema(type=openapi.TYPE_OBJECT, x_nullable=True),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            401: "Authentication required"
+        },
+        security=[{"Token": []}]
+    )
+    def get(self, request):
+        return Response(connection_report(), status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """
+    Prometheus metrics of this process (text exposition format):
+    - Request duration, DB time, query count, serialization time and response size by view
+    - Database connections opened
+    """
+    permission_classes = [HasMetricsToken | permissions.IsAdminUser]
+    throttle_classes = []
+    swagger_schema = None
+
+    def get(self, request):
+        return HttpResponse(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class GameDataRetrieveUpdateDestroyView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = GameData.objects.all()
+    serializer_class = GameDataSerializer
+    permission_classes = [IsAdminOrReadOnly]
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_object_response(request)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            failed = self.check_write_preconditions(request)
+            if failed is not None:
+                return failed
+            response = super().update(request, *args, **kwargs)
+        response['ETag'] = self.etag
+        return response
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        self.etag = row_etag(instance.pk, instance.version)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            failed = self.check_write_preconditions(request)
+            if failed is not None:
+                return failed
+            return super().destroy(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Retrieve game data by ID (Admin only). The ETag is the row id and version; "
+            "send If-None-Match / If-Modified-Since to get 304 while the row is unchanged."
+        ),
         responses={
             200: GameDataSerializer,
+            304: "Not Modified",
             404: "Game data not found",
             401: "Authentication required"
         },
@@ -146,17 +671,26 @@ class GameDataRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
             )
 
     @swagger_auto_schema(
-        operation_description="Update game data by ID (Admin only)",
+        operation_description=(
+            "Update game data by ID (Admin only). Send If-Match with the ETag you read "
+            "to only update if nobody changed the row since; the new ETag is returned."
+        ),
         request_body=GameDataSerializer,
-        responses={200: GameDataSerializer},
+        responses={
+            200: GameDataSerializer,
+            412: "Precondition Failed - The row was modified since the If-Match ETag"
+        },
         security=[{"Token": []}]
     )
     def put(self, request, *args, **kwargs):
         return super().put(request, *args, **kwargs)
 
     @swagger_auto_schema(
-        operation_description="Delete game data by ID (Admin only)", 
-        responses={204: "No Content"},
+        operation_description="Delete game data by ID (Admin only). Honors If-Match like PUT.",
+        responses={
+            204: "No Content",
+            412: "Precondition Failed - The row was modified since the If-Match ETag"
+        },
         security=[{"Token": []}]
     )
     def delete(self, request, *args, **kwargs):
@@ -45,16 +45,21 @@ INSTALLED_APPS = [
     "rest_framework.authtoken",
 ]
 
+# Every middleware here runs natively under ASGI: WhiteNoise's and Django's own are
+# replaced by subclasses (static_files, asgi_middleware) that don't hand each
+# request to a worker thread. Keep new entries async-capable too.
 MIDDLEWARE = [
+    "sphere_game_data_api.instrumentation.RequestTimingMiddleware",
+    "sphere_game_data_api.query_inspector.QueryInspectorMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "sphere_game_data_api.asgi_middleware.SecurityMiddleware",
+    "sphere_game_data_api.static_files.AsyncWhiteNoiseMiddleware",
+    "sphere_game_data_api.asgi_middleware.SessionMiddleware",
+    "sphere_game_data_api.asgi_middleware.CommonMiddleware",
+    "sphere_game_data_api.asgi_middleware.CsrfViewMiddleware",
+    "sphere_game_data_api.asgi_middleware.AuthenticationMiddleware",
+    "sphere_game_data_api.asgi_middleware.MessageMiddleware",
+    "sphere_game_data_api.asgi_middleware.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "sphere_game_data_api_project.urls"
@@ -88,17 +93,60 @@ WSGI_APPLICATION = "sphere_game_data_api_project.wsgi.application"
 #     }
 # }
 
+# Database connections. Opening one costs a TCP + TLS handshake with the remote
+# host, so by default a connection is kept for DB_CONN_MAX_AGE seconds (0 closes
+# it after every request) and checked before it is reused, which also covers the
+# database suspending while idle. DB_POOL=True uses psycopg 3's in-process pool
+# instead (Django 5.1+, pip install "psycopg[binary,pool]"); the pool then owns the
+# connections and persistent connections are turned off.
+# GET /api/game-data/connections/ shows how often connections are reused.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 10))
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+# HOST is Neon's -pooler endpoint (PgBouncer in transaction mode), which can hand
+# each statement to a different server connection, so a server-side cursor doesn't
+# survive between fetches. Long reads (exports, session replay, archival) page with
+# keyset queries instead; set False only when connecting to the database directly.
+DB_DISABLE_SERVER_SIDE_CURSORS = os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'True') == 'True'
+
 DATABASES = {
     'default': {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "django.db.backends.postgresql",
         "NAME": "neondb",
         "USER": "neondb_owner",
         "PASSWORD": "npg_3UVS1TgphDFk",
         "HOST": "ep-mute-shadow-a7torxmz-pooler.ap-southeast-2.aws.neon.tech",
         "PORT": "5432",
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "DISABLE_SERVER_SIDE_CURSORS": DB_DISABLE_SERVER_SIDE_CURSORS,
+        "OPTIONS": {
+            "connect_timeout": DB_CONNECT_TIMEOUT,
+        },
     }
 }
 
+if DB_POOL:
+    import django
+    from django.core.exceptions import ImproperlyConfigured
+
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured('DB_POOL=True needs Django 5.1 or later')
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 4)),
+        # Close connections idle this long (down to min_size), before the server drops them
+        'max_idle': int(os.getenv('DB_POOL_MAX_IDLE', 300)),
+        # Seconds a request waits for a free connection before failing
+        'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        # Check a connection when it is handed out, like CONN_HEALTH_CHECKS
+        'check': ConnectionPool.check_connection,
+    }
+
 if os.getenv('DJANGO_TEST_ENV'):
     DATABASES['default'] = {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -154,7 +202,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "sphere_game_data_api.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -165,15 +213,136 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "sphere_game_data_api.throttling.AnonSlidingWindowThrottle",
+        "sphere_game_data_api.throttling.UserSlidingWindowThrottle"
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "1000/hour",
-        "user": "2000/hour"
+        "user": "2000/hour",
+        "ingest": os.getenv('INGEST_THROTTLE_RATE', "20000/hour")
     }
 }
 
+# Cache backend, used by throttling (and anything else on the default alias).
+# Set REDIS_URL (e.g. redis://host:6379/0) so every process shares one set of
+# throttle counters (needs the redis package); without it each process counts
+# on its own in local memory.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', 'default')
+
+# Cached admin reads (GET /api/game-data/ and /api/game-data/<pk>/), invalidated
+# by bumping a version on every write; 0 disables caching (ETag/304 still work).
+# The version has to be shared by every process, so caching is on by default only
+# with REDIS_URL, and a system check rejects it on a process-local cache.
+GAME_DATA_RESPONSE_CACHE_ALIAS = os.getenv('GAME_DATA_RESPONSE_CACHE_ALIAS', 'default')
+GAME_DATA_RESPONSE_CACHE_TIMEOUT = int(os.getenv('GAME_DATA_RESPONSE_CACHE_TIMEOUT', 60 if REDIS_URL else 0))
+
+# Render list/retrieve bodies straight from values_list() rows (orjson when
+# installed) instead of GameDataSerializer; the bytes are the same either way
+GAME_DATA_FAST_READS = os.getenv('GAME_DATA_FAST_READS', 'True') == 'True'
+
+# Validate well-formed new events with the precompiled validator in
+# ingest_validation; invalid ones still get GameDataSerializer's errors
+GAME_DATA_FAST_VALIDATION = os.getenv('GAME_DATA_FAST_VALIDATION', 'True') == 'True'
+
+# Per-request instrumentation (RequestTimingMiddleware): wall, DB and serialization
+# time, query count and response size by view, exported as Prometheus histograms
+# on GET /metrics and, with GAME_DATA_SERVER_TIMING, as a Server-Timing header.
+# Metrics are kept per process, so scrape every worker. /metrics takes
+# `Authorization: Bearer <METRICS_TOKEN>` or an admin token.
+GAME_DATA_METRICS_ENABLED = os.getenv('GAME_DATA_METRICS_ENABLED', 'True') == 'True'
+GAME_DATA_SERVER_TIMING = os.getenv('GAME_DATA_SERVER_TIMING', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Query inspector (QueryInspectorMiddleware), for tests and staging: logs requests
+# that run more than GAME_DATA_QUERY_BUDGET queries, repeat the same SELECT
+# GAME_DATA_DUPLICATE_QUERY_THRESHOLD times or more (N+1), or run a query slower
+# than GAME_DATA_SLOW_QUERY_MS, with the stack in this project's code. Records a
+# stack per query, so keep it off in production.
+GAME_DATA_QUERY_INSPECTOR = os.getenv('GAME_DATA_QUERY_INSPECTOR', 'False') == 'True'
+GAME_DATA_QUERY_BUDGET = int(os.getenv('GAME_DATA_QUERY_BUDGET', 20))
+GAME_DATA_SLOW_QUERY_MS = int(os.getenv('GAME_DATA_SLOW_QUERY_MS', 100))
+GAME_DATA_DUPLICATE_QUERY_THRESHOLD = int(os.getenv('GAME_DATA_DUPLICATE_QUERY_THRESHOLD', 3))
+
+# Batch ingestion (POST /api/game-data/batch/)
+GAME_DATA_BATCH_MAX_SIZE = int(os.getenv('GAME_DATA_BATCH_MAX_SIZE', 5000))
+GAME_DATA_BULK_CREATE_BATCH_SIZE = int(os.getenv('GAME_DATA_BULK_CREATE_BATCH_SIZE', 500))
+
+# Threads per process for the async ingest views' database work (under ASGI); each
+# keeps its own database connection between requests
+GAME_DATA_ASYNC_INGEST_WORKERS = int(os.getenv('GAME_DATA_ASYNC_INGEST_WORKERS', 8))
+
+# Cursor pagination for GET /api/game-data/ (?page_size= is capped at the max)
+GAME_DATA_PAGE_SIZE = int(os.getenv('GAME_DATA_PAGE_SIZE', 100))
+GAME_DATA_MAX_PAGE_SIZE = int(os.getenv('GAME_DATA_MAX_PAGE_SIZE', 1000))
+
+# Streaming export (GET /api/game-data/export/): rows fetched per keyset query
+GAME_DATA_EXPORT_CHUNK_SIZE = int(os.getenv('GAME_DATA_EXPORT_CHUNK_SIZE', 2000))
+
+# Archival (`python manage.py archive_game_data`): events older than
+# GAME_DATA_ARCHIVE_AFTER_DAYS move to compressed files in GAME_DATA_ARCHIVE_DIR
+# (Parquet when pyarrow is installed, gzip NDJSON otherwise) and are then deleted;
+# GET /api/game-data/export/?source=archive reads them back
+GAME_DATA_ARCHIVE_DIR = os.getenv('GAME_DATA_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+GAME_DATA_ARCHIVE_AFTER_DAYS = int(os.getenv('GAME_DATA_ARCHIVE_AFTER_DAYS', 180))
+
+# Event type that marks a level as completed, used for completion rates
+GAME_DATA_COMPLETION_EVENT = os.getenv('GAME_DATA_COMPLETION_EVENT', 'level_complete')
+
+# Monthly range partitioning of the game data table on event_at (PostgreSQL only).
+# Applied by migration 0014 when set before migrating, or later with
+# `python manage.py manage_partitions --convert`. Run manage_partitions daily to
+# create upcoming months and, with a retention, detach (or drop) old ones.
+# PostgreSQL only enforces unique indexes that include event_at on a partitioned
+# table, so event_id uniqueness is then kept in a separate <table>_event_ids ledger
+# table, one extra index insert per event (see partitions.add_event_id_ledger).
+GAME_DATA_PARTITIONED = os.getenv('GAME_DATA_PARTITIONED', 'False') == 'True'
+GAME_DATA_PARTITION_MONTHS_AHEAD = int(os.getenv('GAME_DATA_PARTITION_MONTHS_AHEAD', 3))
+GAME_DATA_PARTITION_RETENTION_MONTHS = int(os.getenv('GAME_DATA_PARTITION_RETENTION_MONTHS', 0)) or None
+
+# Keep the hourly / per-session rollup tables and PlayerStats up to date on every
+# insert (rebuild them with `python manage.py rebuild_rollups` / `rebuild_player_stats`)
+GAME_DATA_ROLLUPS_ENABLED = os.getenv('GAME_DATA_ROLLUPS_ENABLED', 'True') == 'True'
+
+# game_sequence / game_player_input are stored as packed GameColor codes (one or
+# two bytes per colour) instead of JSON text. With GAME_DATA_PACKED_COLORS=False new
+# values are stored as JSON again; both are read back the same way. Only the seeded
+# palette and colours added in the admin get codes; lists with any other name are
+# stored as JSON too. Each process rereads the colours at most every
+# GAME_DATA_COLOR_DICTIONARY_TTL seconds to see ones added elsewhere.
+GAME_DATA_PACKED_COLORS = os.getenv('GAME_DATA_PACKED_COLORS', 'True') == 'True'
+GAME_DATA_COLOR_DICTIONARY_TTL = int(os.getenv('GAME_DATA_COLOR_DICTIONARY_TTL', 60))
+
+# Most players GET /api/leaderboard/<game_mode>/?limit= returns
+GAME_DATA_LEADERBOARD_MAX_LIMIT = int(os.getenv('GAME_DATA_LEADERBOARD_MAX_LIMIT', 100))
+
+# Write-behind ingestion: POSTs are validated, appended to a local SQLite spool and
+# answered with 202; `python manage.py drain_game_data_spool` flushes the spool.
+# The spool must live on persistent storage shared with the drainer.
+GAME_DATA_WRITE_BEHIND = os.getenv('GAME_DATA_WRITE_BEHIND', 'False') == 'True'
+GAME_DATA_SPOOL_PATH = os.getenv('GAME_DATA_SPOOL_PATH', os.path.join(BASE_DIR, 'game_data_spool.sqlite3'))
+GAME_DATA_SPOOL_LEASE_SECONDS = int(os.getenv('GAME_DATA_SPOOL_LEASE_SECONDS', 300))
+
+# Token authentication cache: resolved tokens are kept in an in-process LRU for
+# TOKEN_AUTH_CACHE_TTL seconds; set TOKEN_AUTH_CACHE_ALIAS to a CACHES alias to
+# also share them (and their invalidation) between processes
+TOKEN_AUTH_CACHE_TTL = int(os.getenv('TOKEN_AUTH_CACHE_TTL', 60))
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', 1024))
+TOKEN_AUTH_CACHE_ALIAS = os.getenv('TOKEN_AUTH_CACHE_ALIAS') or None
+
 CORS_ORIGIN_ALLOW_ALL = True
 
 SWAGGER_SETTINGS = {
@@ -21,6 +21,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from sphere_game_data_api.views import MetricsView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Sphere Game Data API",
@@ -34,6 +36,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("sphere_game_data_api.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("", schema_view.with_ui("swagger", cache_timeout=0), name="swagger"),
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="redoc"),
 ]